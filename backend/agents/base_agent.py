@@ -2,13 +2,37 @@
 Base agent class for DAVAI POC agents.
 """
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Dict, Any, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from langchain_core.language_models import BaseChatModel
 from pydantic import BaseModel
 
 from config.llm_config import LlmConfig
-from services.llm_factory import get_llm
+from services.cassette import CassetteEntry, CassetteMissError, get_cassette
+from services.coalescing import coalescer
+from services.context_builder import estimate_tokens
+from services.hedging import HedgeLeg, get_hedge_backup, hedger
+from services.llm_factory import estimate_cost, get_shared_llm
+from services.metrics import LlmCall, LlmResult, record_llm_call
+from services.rate_limiter import get_limiter
+from services.resilience import get_resilience
+from services.response_cache import response_cache
+from services.token_stream import TokenSink, get_token_sink
+from utils.fingerprint import prompt_fingerprint
 from utils.logger import logger
+from utils.tracing import start_span
 
 InputType = TypeVar('InputType', bound=BaseModel)
 OutputType = TypeVar('OutputType', bound=BaseModel)
@@ -31,18 +55,42 @@ class BaseAgent(ABC, Generic[InputType, OutputType]):
             **kwargs: Additional configuration options
         """
         self.llm_config = llm_config
-        self.llm = self._initialize_llm()
+        self._llm: Optional[BaseChatModel] = None
+        # (config, client) of the hedging backup, resolved lazily
+        self._backup: Optional[Tuple[Any, ...]] = None
 
         logger.debug(f"Initialized {self.__class__.__name__} with model {llm_config.model}")
 
+    @property
+    def llm(self) -> BaseChatModel:
+        """LLM client, created on first use and shared across agents with the same config."""
+        if self._llm is None:
+            self._llm = self._initialize_llm()
+        return self._llm
+
     def _initialize_llm(self):
         """Initialize the LLM with the provided configuration."""
         try:
-            return get_llm(self.llm_config)
+            return get_shared_llm(self.llm_config)
         except Exception as e:
             logger.error(f"Failed to initialize LLM for {self.__class__.__name__}: {e}")
             raise
 
+    def _get_hedge_backup(self) -> Optional[Tuple[LlmConfig, BaseChatModel]]:
+        """Get the (config, client) pair of the hedging backup model, if any."""
+        if self._backup is None:
+            self._backup = ()
+            backup_config = get_hedge_backup(self.llm_config)
+            if backup_config is not None:
+                try:
+                    self._backup = (backup_config, get_shared_llm(backup_config))
+                except Exception as e:
+                    logger.warning(
+                        f"Hedging disabled for {self.__class__.__name__}: "
+                        f"cannot create backup model {backup_config.model}: {e}"
+                    )
+        return self._backup or None
+
     @abstractmethod
     async def process(self, input_data: InputType) -> OutputType:
         """
@@ -79,10 +127,44 @@ class BaseAgent(ABC, Generic[InputType, OutputType]):
         """
         pass
 
-    async def _invoke_llm(self, user_prompt: str, system_prompt: Optional[str] = None) -> str:
+    def fingerprint(self, input_data: InputType) -> str:
+        """
+        Fingerprint of the prompts sent for an input (see utils.fingerprint).
+
+        It changes with the input, the system prompt and the model settings,
+        so equal fingerprints mean the agent would be asked the same thing.
+
+        Args:
+            input_data: Input data the prompts are built from
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return prompt_fingerprint(
+            self.llm_config, self.get_system_prompt(), self.get_user_prompt(input_data)
+        )
+
+    async def _invoke_llm(
+        self, user_prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
         """
         Invoke the LLM with the given prompts.
 
+        Responses are served from the response cache when an identical call
+        (same model, temperature and prompts) was made before. The model is
+        streamed; when a token sink is active (see services.token_stream),
+        every token is forwarded to the sink. Calls go through the model's
+        resilience policy (see services.resilience): per-attempt deadline,
+        retries with backoff and circuit breaker. With hedging enabled, a
+        backup model is raced against a primary that is slow to start
+        responding (see services.hedging). Every attempt waits for a slot of
+        the model's rate limiter (see services.rate_limiter). Concurrent
+        identical calls share one request (see services.coalescing). Calls
+        can be recorded to or replayed from a cassette (see
+        services.cassette). Every call's duration, time to first token,
+        token usage, estimated cost and retries are recorded in
+        services.metrics.
+
         Args:
             user_prompt: The user prompt
             system_prompt: Optional system prompt
@@ -90,20 +172,318 @@ class BaseAgent(ABC, Generic[InputType, OutputType]):
         Returns:
             LLM response
         """
-        try:
-            messages = []
+        cache_key = prompt_fingerprint(self.llm_config, system_prompt, user_prompt)
+        sink = get_token_sink()
+        agent_name = self.__class__.__name__
+        call = LlmCall(
+            agent=agent_name,
+            model=f"{self.llm_config.provider.lower()}/{self.llm_config.model}",
+        )
+        usage: Dict[str, int] = {}
+        # Model that produced the response: the backup when its hedge won
+        llm_config = self.llm_config
+        content = None
 
-            if system_prompt:
-                messages.append(("system", system_prompt))
+        def forward(token: str) -> None:
+            call.first_token()
+            if sink:
+                sink(token)
 
-            messages.append(("user", user_prompt))
+        with start_span(
+            "llm.call",
+            kind="client",
+            attributes={
+                "davai.agent": agent_name,
+                "gen_ai.system": self.llm_config.provider.lower(),
+                "gen_ai.request.model": self.llm_config.model,
+            },
+        ) as span:
+            try:
+                cassette = get_cassette()
+                if cassette is not None and cassette.mode == "replay":
+                    entry = cassette.match(agent_name, cache_key)
+                    if entry is not None:
+                        logger.debug(
+                            f"Cassette replay in {agent_name} ({cache_key[:12]})"
+                        )
+                        call.source = "replay"
+                        usage.update(entry.usage)
+                        content = await cassette.replay(entry, forward)
+                        return content
+                    if cassette.on_miss != "live":
+                        raise CassetteMissError(
+                            f"No recorded response for {agent_name} ({cache_key[:12]})"
+                        )
+                recording = cassette is not None and cassette.mode == "record"
 
-            response = await self.llm.ainvoke(messages)
-            return response.content
+                # Recording captures real traffic, so the cache is not read
+                cached = None if recording else await response_cache.get(cache_key)
+                if cached is not None:
+                    logger.debug(f"Cache hit in {agent_name} ({cache_key[:12]})")
+                    call.source = "cache"
+                    forward(cached)
+                    content = cached
+                    return content
 
-        except Exception as e:
-            logger.error(f"LLM invocation failed in {self.__class__.__name__}: {e}")
-            raise
+                messages = []
+
+                if system_prompt:
+                    messages.append(("system", system_prompt))
+
+                messages.append(("user", user_prompt))
+
+                if recording or not coalescer.enabled:
+                    result = await self._call_llm(messages, sink, call)
+                else:
+                    # Identical concurrent calls share one request
+                    async def request(shared_sink: Optional[TokenSink]) -> LlmResult:
+                        # Measured apart: the caller accounting for the shared
+                        # request may not be the one that started it
+                        measured = LlmCall(agent=agent_name, model=call.model)
+                        result = await self._call_llm(messages, shared_sink, measured)
+                        result.retries = measured.retries
+                        result.ttft = measured.ttft
+                        return result
+
+                    result, owner = await coalescer.run(
+                        agent_name,
+                        cache_key,
+                        request,
+                        forward,
+                        stream=sink is not None,
+                    )
+                    if not owner:
+                        call.source = "coalesced"
+                        # Accounted for by the caller that owns the request
+                        content = result.content
+                        return content
+                    call.retries = result.retries
+                    call.ttft = result.ttft
+                content = result.content
+                llm_config = result.llm_config
+                usage.update(result.usage)
+                call.model = f"{llm_config.provider.lower()}/{llm_config.model}"
+                if cassette is not None and recording:
+                    cassette.record(
+                        CassetteEntry(
+                            agent=agent_name,
+                            response=content,
+                            fingerprint=cache_key,
+                            provider=llm_config.provider,
+                            model=llm_config.model,
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            latency=time.perf_counter() - call.started,
+                            ttft=call.ttft,
+                            usage=usage,
+                        )
+                    )
+
+                await response_cache.set(cache_key, content)
+                return content
+
+            except asyncio.CancelledError:
+                call.success = False
+                raise
+
+            except Exception as e:
+                call.success = False
+                logger.error(f"LLM invocation failed in {agent_name}: {e}")
+                raise
+
+            finally:
+                self._account_usage(
+                    call, usage, system_prompt, user_prompt, content, llm_config
+                )
+                record_llm_call(call)
+                span.set_attributes(
+                    **{
+                        "davai.source": call.source,
+                        "davai.ttft": call.ttft,
+                        "davai.retries": call.retries,
+                        "davai.cost_usd": call.cost,
+                        "gen_ai.usage.input_tokens": call.prompt_tokens,
+                        "gen_ai.usage.output_tokens": call.completion_tokens,
+                    }
+                )
+
+    def _account_usage(
+        self,
+        call: LlmCall,
+        usage: Dict[str, int],
+        system_prompt: Optional[str],
+        user_prompt: str,
+        content: Optional[str],
+        llm_config: Optional[LlmConfig] = None,
+    ) -> None:
+        """
+        Fill in the token usage and estimated cost of a call.
+
+        Token counts reported by the provider are used when available and
+        estimated from the prompts and response otherwise. Cache hits and
+        coalesced calls cost nothing; failed calls only count reported usage.
+
+        Args:
+            call: Measured call
+            usage: Token usage reported by the provider
+            system_prompt: System prompt of the call
+            user_prompt: User prompt of the call
+            content: Response, or None if the call failed
+            llm_config: Model charged for the call (defaults to the agent's)
+        """
+        if call.source in ("cache", "coalesced"):
+            return
+        prompt_tokens = usage.get("input_tokens")
+        completion_tokens = usage.get("output_tokens")
+        if call.success:
+            if not prompt_tokens:
+                prompt_tokens = estimate_tokens(system_prompt or "")
+                prompt_tokens += estimate_tokens(user_prompt)
+            if not completion_tokens:
+                completion_tokens = estimate_tokens(content or "")
+        call.prompt_tokens = prompt_tokens or 0
+        call.completion_tokens = completion_tokens or 0
+        call.cost = estimate_cost(
+            llm_config or self.llm_config, call.prompt_tokens, call.completion_tokens
+        )
+
+    async def _call_llm(
+        self, messages: List[Tuple[str, str]], sink: Optional[TokenSink], call: LlmCall
+    ) -> LlmResult:
+        """
+        Stream the LLM through its resilience policy, hedging if enabled.
+
+        Args:
+            messages: Chat messages
+            sink: Optional callback receiving each token
+            call: Measured call receiving the time to first token and retries
+
+        Returns:
+            LLM response, with the model that produced it and its reported
+            token usage
+        """
+        resilience = get_resilience(self.llm_config)
+        backup = self._get_hedge_backup()
+        if backup:
+            backup_config, backup_llm = backup
+            return await hedger.run(
+                self.__class__.__name__,
+                self._hedge_leg(self.llm_config, self.llm, messages, bool(sink), call),
+                self._hedge_leg(backup_config, backup_llm, messages, bool(sink), call),
+                sink,
+            )
+
+        usage: Dict[str, int] = {}
+        streamed = []
+
+        def forward(token: str) -> None:
+            call.first_token()
+            if sink:
+                streamed.append(token)
+                sink(token)
+
+        limiter = get_limiter(self.llm_config)
+        prompt_tokens = self._prompt_tokens(messages)
+        # Tokens already forwarded cannot be taken back: no retry then
+        content = await resilience.call(
+            lambda: self._stream_llm(
+                messages, forward, usage=usage, on_headers=limiter.observe_headers
+            ),
+            can_retry=lambda: not streamed,
+            on_retry=call.add_retry,
+            gate=lambda: limiter.slot(prompt_tokens, usage),
+        )
+        return LlmResult(content, self.llm_config, usage)
+
+    def _hedge_leg(
+        self,
+        llm_config: LlmConfig,
+        llm: BaseChatModel,
+        messages: List[Tuple[str, str]],
+        streaming: bool,
+        call: LlmCall,
+    ) -> HedgeLeg[LlmResult]:
+        """
+        Build a hedged request leg running through its model's resilience policy.
+
+        Every leg reports its own token usage, so that only the winning leg's
+        usage and model are charged for the call.
+
+        Args:
+            llm_config: Configuration of the leg's model
+            llm: Client of the leg's model
+            messages: Chat messages
+            streaming: Whether tokens are forwarded to a token sink
+            call: Measured call receiving the time to first token and retries
+
+        Returns:
+            Leg label and coroutine factory (see services.hedging.HedgeLeg)
+        """
+
+        async def run(forward: TokenSink) -> LlmResult:
+            usage: Dict[str, int] = {}
+            emitted: List[str] = []
+
+            def track(token: str) -> None:
+                emitted.append(token)
+                call.first_token()
+                forward(token)
+
+            limiter = get_limiter(llm_config)
+            content = await get_resilience(llm_config).call(
+                lambda: self._stream_llm(
+                    messages, track, llm, usage, limiter.observe_headers
+                ),
+                can_retry=lambda: not (streaming and emitted),
+                on_retry=call.add_retry,
+                gate=lambda: limiter.slot(self._prompt_tokens(messages), usage),
+            )
+            return LlmResult(content, llm_config, usage)
+
+        return f"{llm_config.provider.lower()}/{llm_config.model}", run
+
+    @staticmethod
+    def _prompt_tokens(messages: List[Tuple[str, str]]) -> int:
+        """Estimate the prompt tokens of chat messages."""
+        return sum(estimate_tokens(text) for _, text in messages)
+
+    async def _stream_llm(
+        self,
+        messages: List[Tuple[str, str]],
+        sink: TokenSink,
+        llm: Optional[BaseChatModel] = None,
+        usage: Optional[Dict[str, int]] = None,
+        on_headers: Optional[Callable[[Mapping[str, str]], None]] = None,
+    ) -> str:
+        """
+        Stream the LLM response, forwarding each token to the sink.
+
+        Args:
+            messages: Chat messages
+            sink: Callback receiving each token
+            llm: Client to stream from (defaults to the agent's LLM)
+            usage: Optional dict receiving the reported token usage
+            on_headers: Optional callback receiving the response headers
+                exposed by the provider (e.g. rate-limit headers)
+
+        Returns:
+            Complete LLM response
+        """
+        parts: List[str] = []
+        async for chunk in (llm or self.llm).astream(messages):
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if text:
+                parts.append(text)
+                sink(text)
+            if on_headers is not None and chunk.response_metadata.get("headers"):
+                on_headers(chunk.response_metadata["headers"])
+            usage_metadata = getattr(chunk, "usage_metadata", None)
+            if usage is not None and usage_metadata:
+                # Providers may split usage across chunks: add them up
+                for key, value in usage_metadata.items():
+                    if isinstance(value, int):
+                        usage[key] = usage.get(key, 0) + value
+        return "".join(parts)
 
     async def run(self, input_data: InputType) -> OutputType:
         """
@@ -0,0 +1,101 @@
+"""
+Project Brief Agent for DAVAI POC.
+Distills context, architecture and tech stack documentation into a compact brief
+(project-brief.md) used in place of the full documents by later agents.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+from agents.base_agent import BaseAgent
+from models.project_brief import ProjectBrief
+from models.project_data import ProjectData
+
+
+class ProjectBriefAgent(BaseAgent[ProjectData, Dict[str, str]]):
+    """Agent that distills upstream documentation into a compact project brief."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prompt_file = Path(__file__).parent / "project_brief_agent_prompt.md"
+
+    def get_system_prompt(self) -> str:
+        """Load system prompt from file."""
+        try:
+            return self.prompt_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return self._get_default_system_prompt()
+
+    def _get_default_system_prompt(self) -> str:
+        """Fallback system prompt if file is not found."""
+        return """You are an expert technical lead who distills long project documentation into a compact brief.
+
+IMPORTANT: You must respond with valid JSON only. No additional text or explanations.
+
+Return your response as a JSON object with this exact structure:
+{
+  "summary": "Short project summary",
+  "key_decisions": ["Decision - reason"],
+  "components": ["Component - responsibility"],
+  "tech_stack": ["Area: Technology"],
+  "constraints": ["Constraint"]
+}"""
+
+    def get_user_prompt(self, input_data: ProjectData) -> str:
+        """Create user prompt with project data."""
+        qa_pairs = "\n".join(
+            [
+                f"Q: {q}\nA: {a}\n"
+                for q, a in zip(input_data.questions, input_data.answers)
+            ]
+        )
+
+        return f"""Project Idea and Documentation: "{input_data.project_idea}"
+
+Clarifying Questions and Answers:
+{qa_pairs}
+
+Based on this project information, produce a compact project brief with the summary, key decisions, components, tech stack and constraints.
+
+Return only the JSON object."""
+
+    async def process(self, input_data: ProjectData) -> Dict[str, str]:
+        """Generate the project brief."""
+        system_prompt = self.get_system_prompt()
+        user_prompt = self.get_user_prompt(input_data)
+
+        response = await self._invoke_llm(user_prompt, system_prompt)
+
+        try:
+            response = response.strip()
+
+            # Try to extract JSON if it's wrapped in markdown code blocks
+            if response.startswith("```json"):
+                response = response.split("```json")[1].split("```")[0].strip()
+            elif response.startswith("```"):
+                response = response.split("```")[1].split("```")[0].strip()
+
+            brief = ProjectBrief(**json.loads(response))
+
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                f"Failed to parse LLM response as JSON: {e}. Response was: {response[:200]}..."
+            ) from e
+        except Exception as e:
+            raise ValueError(f"Failed to process project brief: {e}") from e
+
+        return {"project-brief.md": self.render_brief(brief)}
+
+    @staticmethod
+    def render_brief(brief: ProjectBrief) -> str:
+        """Render a project brief as compact markdown."""
+        lines = ["# Project Brief", "", brief.summary]
+        for title, items in (
+            ("Key Decisions", brief.key_decisions),
+            ("Components", brief.components),
+            ("Tech Stack", brief.tech_stack),
+            ("Constraints", brief.constraints),
+        ):
+            if items:
+                lines += ["", f"## {title}"] + [f"- {item}" for item in items]
+        return "\n".join(lines)
@@ -2,9 +2,13 @@
 FastAPI application factory for DAVAI POC.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from typing import Any, Dict
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response
+from starlette.middleware.base import RequestResponseEndpoint
 
 from config.settings import settings
 from routes.workflow_routes import router as workflow_router
@@ -17,7 +21,20 @@ from routes.agents.task_breakdown_routes import router as task_breakdown_router
 from routes.agents.project_rules_routes import router as project_rules_router
 from routes.agents.claude_guide_routes import router as claude_guide_router
 from routes.agents.readme_routes import router as readme_router
+from routes.agents.project_brief_routes import router as project_brief_router
+from services.coalescing import coalescer
+from services.hedging import hedger
+from services.job_manager import JobManager
+from services.metrics import registry
+from services.orchestrator_registry import OrchestratorRegistry
+from services.project_catalog import project_catalog
+from services.rate_limiter import limiter_stats
+from services.resilience import resilience_stats
+from services.retention import retention_service
+from services.response_cache import response_cache
+from services.workflow_scheduler import workflow_scheduler
 from utils.logger import logger
+from utils.tracing import configure_tracing, shutdown_tracing, start_span
 
 
 @asynccontextmanager
@@ -37,6 +54,29 @@ async def lifespan(app: FastAPI):
     settings.temp_storage_path.mkdir(exist_ok=True)
     settings.cache_storage_path.mkdir(exist_ok=True)
 
+    configure_tracing(
+        settings.tracing_exporter,
+        settings.tracing_service_name,
+        settings.tracing_file_path,
+        settings.tracing_otlp_endpoint,
+    )
+
+    # Index of the saved projects, built from disk on first start
+    await asyncio.to_thread(project_catalog.open)
+
+    # Single orchestrator shared by all routers
+    app.state.orchestrators = OrchestratorRegistry()
+
+    # Asynchronous workflow jobs, run as batch workflows of the scheduler
+    app.state.jobs = JobManager(
+        app.state.orchestrators, settings.temp_storage_path / "jobs"
+    )
+    await app.state.jobs.start()
+
+    # Deletes saved projects and derived files beyond the retention limits
+    if settings.retention_enabled:
+        await retention_service.start()
+
     logger.info("🎉 DAVAI POC API server startup completed")
     logger.info(
         f"📚 Visit http://{settings.api_host}:{settings.api_port}/docs for API documentation"
@@ -46,6 +86,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("🛑 Shutting down DAVAI POC API server...")
+    await retention_service.stop()
+    await app.state.jobs.stop()
+    app.state.orchestrators.close()
+    project_catalog.close()
+    shutdown_tracing()
     logger.info("👋 DAVAI POC API server shutdown completed")
 
 
@@ -71,6 +116,43 @@ def create_app() -> FastAPI:
         allow_headers=settings.cors_headers,
     )
 
+    @app.middleware("http")
+    async def cache_control(
+        request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        """Bypass the response cache for requests sent with Cache-Control: no-cache."""
+        directives = request.headers.get("cache-control", "").lower()
+        with response_cache.bypass(
+            "no-cache" in directives or "no-store" in directives
+        ):
+            return await call_next(request)
+
+    @app.middleware("http")
+    async def trace_requests(
+        request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        """Trace every request, continuing the caller's trace from a traceparent header."""
+        method = request.method
+        with start_span(
+            method,
+            kind="server",
+            traceparent=request.headers.get("traceparent"),
+            attributes={"http.request.method": method, "url.path": request.url.path},
+        ) as span:
+            response = await call_next(request)
+            if request.scope.get("route") is not None:
+                # Low-cardinality name: path parameters replaced by their names
+                route = request.url.path
+                for name, value in request.path_params.items():
+                    route = route.replace(f"/{value}", f"/{{{name}}}", 1)
+                span.name = f"{method} {route}"
+                span.set_attribute("http.route", route)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            response.headers["X-Trace-Id"] = span.trace_id
+            return response
+
     # Include all routers
     app.include_router(workflow_router, prefix="/api", tags=["Workflow"])
     app.include_router(question_generator_router, prefix="/api", tags=["Agents"])
@@ -82,6 +164,7 @@ def create_app() -> FastAPI:
     app.include_router(project_rules_router, prefix="/api", tags=["Agents"])
     app.include_router(claude_guide_router, prefix="/api", tags=["Agents"])
     app.include_router(readme_router, prefix="/api", tags=["Agents"])
+    app.include_router(project_brief_router, prefix="/api", tags=["Agents"])
 
     # Root health and status endpoints
     @app.get("/health", tags=["System"])
@@ -93,4 +176,55 @@ def create_app() -> FastAPI:
             "version": "0.1.0",
         }
 
+    @app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+    async def metrics() -> PlainTextResponse:
+        """LLM call and workflow metrics in the Prometheus text format."""
+        return PlainTextResponse(
+            registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
+    @app.get("/cache/stats", tags=["System"])
+    async def cache_stats() -> Dict[str, float]:
+        """LLM response cache hit/miss counters."""
+        return response_cache.stats()
+
+    @app.get("/resilience/stats", tags=["System"])
+    async def llm_resilience_stats() -> Dict[str, Dict[str, Any]]:
+        """LLM retry, timeout and circuit breaker metrics per model."""
+        return resilience_stats()
+
+    @app.get("/limits/stats", tags=["System"])
+    async def llm_limits_stats() -> Dict[str, Dict[str, Any]]:
+        """LLM concurrency, rate limit and queue metrics per model."""
+        return limiter_stats()
+
+    @app.get("/scheduler/stats", tags=["System"])
+    async def scheduler_stats() -> Dict[str, Any]:
+        """Workflow queue depths, running counts and wait times per tenant."""
+        return workflow_scheduler.stats()
+
+    @app.get("/hedging/stats", tags=["System"])
+    async def hedging_stats() -> Dict[str, Dict[str, int]]:
+        """Per-agent counters of hedged LLM requests."""
+        return hedger.stats()
+
+    @app.get("/coalescing/stats", tags=["System"])
+    async def coalescing_stats() -> Dict[str, Dict[str, int]]:
+        """Per-agent counters of LLM calls sharing an identical request in flight."""
+        return coalescer.stats()
+
+    @app.get("/retention/stats", tags=["System"])
+    async def retention_stats() -> Dict[str, Any]:
+        """Storage retention limits and the report of the last run."""
+        return retention_service.stats()
+
+    @app.post("/retention/run", tags=["System"])
+    async def run_retention(dry_run: bool = True) -> Dict[str, Any]:
+        """
+        Apply the storage retention limits now.
+
+        A dry run (the default) only reports what would be deleted.
+        """
+        return await retention_service.run(dry_run)
+
     return app
@@ -0,0 +1,448 @@
+"""
+Offline benchmark suite for DAVAI POC.
+
+Drives the complete workflow, the individual agent routes, document
+persistence and the saved-projects endpoints against the fake LLM provider,
+and reports throughput, latency percentiles, event-loop lag and memory per
+operation across concurrency levels.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks --concurrency 1,4,16 --iterations 32
+    python -m benchmarks.run_benchmarks --cassette example --scenario workflow
+    python -m benchmarks.run_benchmarks --scenario workflow --document-store files
+"""
+
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import click
+import httpx
+from fastapi import FastAPI
+from rich.console import Console
+from rich.table import Table
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+ANSWERS = [
+    "A web application with a mobile companion app",
+    "Individual users and small teams",
+    "Accounts, dashboards, notifications and reporting",
+    "Real-time updates for notifications only",
+    "A few thousand users at launch",
+]
+
+Operation = Callable[[], Awaitable[Any]]
+
+# Period of the event-loop lag probe, in seconds
+LAG_PROBE_INTERVAL = 0.005
+
+
+def configure_environment(options: Dict[str, Any]) -> None:
+    """
+    Point the application at the fake provider before settings are loaded.
+
+    Args:
+        options: Command line options
+    """
+    storage = Path(tempfile.mkdtemp(prefix="davai-bench-"))
+    os.environ.update(
+        {
+            "LLM_PROVIDER": "fake",
+            "FAKE_LLM_LATENCY": options["latency"],
+            "FAKE_LLM_TOKENS_PER_SECOND": str(options["tokens_per_second"]),
+            "FAKE_LLM_ERROR_RATE": str(options["error_rate"]),
+            "FAKE_LLM_RESPONSE_TOKENS": str(options["response_tokens"]),
+            "FAKE_LLM_SEED": str(options["seed"]),
+            "LLM_BACKOFF_BASE": "0.01",
+            "STORAGE_FSYNC": options["storage_fsync"],
+            "DOCUMENT_STORE": options["document_store"],
+            "LLM_COALESCING_ENABLED": str(options["coalesce"]).lower(),
+            "CACHE_ENABLED": "false",
+            "TEMP_STORAGE_PATH": str(storage / "temp"),
+            "CACHE_STORAGE_PATH": str(storage / "cache"),
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    if options["cassette"]:
+        # Replay recorded traffic; calls missing from it go to the fake provider
+        os.environ.update(
+            {
+                "LLM_CASSETTE_MODE": "replay",
+                "LLM_CASSETTE_PATH": str(resolve_cassette(options["cassette"])),
+                "LLM_CASSETTE_TIMING": options["cassette_timing"],
+                "LLM_CASSETTE_ON_MISS": "live",
+            }
+        )
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def resolve_cassette(name: str) -> Path:
+    """Resolve a cassette path; "example" is the shipped example run."""
+    if name == "example":
+        return next(
+            p for p in sorted((BACKEND_DIR / "example").iterdir()) if p.is_dir()
+        )
+    return Path(name).resolve()
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def probe_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    """
+    Record how late the event loop wakes up a periodic timer.
+
+    Any blocking call on the loop (e.g. synchronous file I/O) shows up as lag.
+
+    Args:
+        samples: List receiving the lag of every wake-up, in seconds
+        stop: Event ending the probe after its next wake-up
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(time.perf_counter() - started - LAG_PROBE_INTERVAL)
+
+
+async def measure(
+    operation: Operation, concurrency: int, iterations: int
+) -> Dict[str, float]:
+    """
+    Run an operation repeatedly with a fixed number of concurrent callers.
+
+    Args:
+        operation: Coroutine factory to benchmark
+        concurrency: Number of concurrent callers
+        iterations: Total number of calls
+
+    Returns:
+        Throughput, latency percentiles, event-loop lag, error count and
+        memory per call
+    """
+    latencies: List[float] = []
+    lags: List[float] = []
+    errors = 0
+    remaining = iterations
+
+    async def caller() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await operation()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    stop_probe = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop_probe))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    # The probe's last wake-up measures a loop blocked until the very end
+    stop_probe.set()
+    await probe
+
+    # Memory is measured on a separate batch: tracemalloc skews timings
+    gc.collect()
+    tracemalloc.start()
+    await asyncio.gather(*(operation() for _ in range(concurrency)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "throughput": iterations / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.fmean(latencies),
+        "lag_p99": percentile(lags, 0.99),
+        "lag_max": max(lags, default=0.0),
+        "errors": errors,
+        "memory_kib": peak / concurrency / 1024,
+    }
+
+
+def disk_usage(path: Path) -> Dict[str, int]:
+    """
+    Measure the disk space taken by a directory tree.
+
+    Args:
+        path: Directory
+
+    Returns:
+        Number of files, bytes of content and bytes of allocated blocks
+    """
+    files = size = allocated = 0
+    for file_path in path.rglob("*"):
+        if file_path.is_file():
+            stat = file_path.stat()
+            files += 1
+            size += stat.st_size
+            allocated += stat.st_blocks * 512
+    return {"files": files, "bytes": size, "allocated": allocated}
+
+
+def build_scenarios(
+    app: FastAPI, client: httpx.AsyncClient
+) -> Dict[str, Operation]:
+    """
+    Build the benchmarked operations.
+
+    Args:
+        app: FastAPI application
+        client: HTTP client bound to the application
+
+    Returns:
+        Operations keyed by scenario name
+    """
+    orchestrator = app.state.orchestrators.get()
+    project_idea = "A habit tracker with social challenges"
+    base = {
+        "project_idea": project_idea,
+        "questions": [f"Question {i}?" for i in range(len(ANSWERS))],
+        "answers": ANSWERS,
+    }
+    docs = {"context.md": "# Context\n\nA habit tracker.\n"}
+    # Seven documents of about 256 KiB each, the size of a large run
+    large_docs = {
+        f"document-{i}.md": f"# Document {i}\n\n" + "lorem ipsum " * 22000
+        for i in range(7)
+    }
+    previous_docs = {"context": docs}
+
+    async def post(path: str, body: Dict) -> Any:
+        response = await client.post(path, json=body)
+        response.raise_for_status()
+        return response
+
+    async def get(path: str) -> Any:
+        response = await client.get(path)
+        response.raise_for_status()
+        return response
+
+    async def workflow() -> None:
+        result = await orchestrator.run_complete_workflow(project_idea, ANSWERS)
+        if not result.success:
+            raise RuntimeError(result.steps[-1].error_message)
+
+    async def workflow_route() -> None:
+        await post(
+            "/api/workflow/complete",
+            {"project_idea": project_idea, "answers": ANSWERS},
+        )
+
+    async def agent_routes() -> None:
+        await post(
+            "/api/question-generator/generate",
+            {"idea": project_idea, "description": project_idea},
+        )
+        await post("/api/context/generate", base)
+        await post("/api/architecture/generate", {**base, "context_docs": docs})
+        await post("/api/tech-stack/generate", {**base, "context_docs": docs})
+        await post("/api/task-breakdown/generate", {**base, "context_docs": docs})
+        for name in ("project-rules", "claude-guide", "readme"):
+            await post(
+                f"/api/{name}/generate", {**base, "previous_docs": previous_docs}
+            )
+
+    async def save_documents() -> None:
+        await orchestrator.save_documentation_to_disk(large_docs, project_idea)
+
+    async def saved_projects() -> None:
+        listing = (await get("/api/workflow/saved-projects")).json()
+        for project in listing["projects"][:5]:
+            await get(f"/api/workflow/saved-projects/{project['folder_name']}")
+
+    return {
+        "workflow": workflow,
+        "workflow_route": workflow_route,
+        "agent_routes": agent_routes,
+        "save_documents": save_documents,
+        "saved_projects": saved_projects,
+    }
+
+
+async def run_suite(
+    scenarios: List[str], levels: List[int], iterations: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, int]]]:
+    """
+    Run the selected scenarios at every concurrency level.
+
+    Returns:
+        Results of every scenario and level, and the disk usage of the saved
+        projects and the blob store afterwards
+    """
+    from config.settings import settings
+    from main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            operations = build_scenarios(app, client)
+            for name in scenarios:
+                # Warm up clients, agents and the saved-projects folder
+                await operations[name]()
+                for level in levels:
+                    stats = await measure(operations[name], level, iterations)
+                    results.append({"scenario": name, "concurrency": level, **stats})
+
+    storage = {
+        name: disk_usage(settings.temp_storage_path / name)
+        for name in ("generated_docs", "blobs")
+    }
+    return results, storage
+
+
+def render(results: List[Dict[str, Any]], console: Console) -> None:
+    """Print the results as a table."""
+    table = Table(title="DAVAI benchmarks (fake LLM provider)")
+    for column in (
+        "scenario",
+        "concurrency",
+        "ops/s",
+        "p50 (ms)",
+        "p95 (ms)",
+        "p99 (ms)",
+        "lag p99 (ms)",
+        "lag max (ms)",
+        "errors",
+        "KiB/op",
+    ):
+        table.add_column(
+            column, justify="left" if column == "scenario" else "right", no_wrap=True
+        )
+    for r in results:
+        table.add_row(
+            r["scenario"],
+            str(r["concurrency"]),
+            f"{r['throughput']:.1f}",
+            f"{r['p50'] * 1000:.1f}",
+            f"{r['p95'] * 1000:.1f}",
+            f"{r['p99'] * 1000:.1f}",
+            f"{r['lag_p99'] * 1000:.1f}",
+            f"{r['lag_max'] * 1000:.1f}",
+            str(r["errors"]),
+            f"{r['memory_kib']:.0f}",
+        )
+    console.print(table)
+
+
+def render_storage(storage: Dict[str, Dict[str, int]], console: Console) -> None:
+    """Print the disk usage of the saved projects and the blob store."""
+    for name, usage in storage.items():
+        console.print(
+            f"{name}: {usage['files']} files, {usage['bytes'] / 1024:.0f} KiB "
+            f"({usage['allocated'] / 1024:.0f} KiB allocated)"
+        )
+
+
+@click.command()
+@click.option(
+    "--scenario",
+    "scenarios",
+    multiple=True,
+    type=click.Choice(
+        [
+            "workflow",
+            "workflow_route",
+            "agent_routes",
+            "save_documents",
+            "saved_projects",
+        ]
+    ),
+    help="Scenario to run (repeatable). Runs all scenarios by default.",
+)
+@click.option("--concurrency", default="1,4,16", help="Comma-separated levels.")
+@click.option("--iterations", default=32, help="Calls per concurrency level.")
+@click.option(
+    "--latency", default="lognormal:0.05,0.5", help="Fake LLM latency distribution."
+)
+@click.option("--tokens-per-second", default=0.0, help="Fake LLM token rate.")
+@click.option("--error-rate", default=0.0, help="Fake LLM injected error rate.")
+@click.option("--response-tokens", default=600, help="Fake LLM document size.")
+@click.option("--seed", default=0, help="Fake LLM random seed.")
+@click.option(
+    "--cassette",
+    help="Replay a cassette file or saved project folder ('example' for the "
+    "shipped example run) instead of synthesized responses.",
+)
+@click.option(
+    "--cassette-timing",
+    type=click.Choice(["original", "fast"]),
+    default="original",
+    help="Replay with the recorded timing or as fast as possible.",
+)
+@click.option(
+    "--storage-fsync",
+    type=click.Choice(["none", "files", "all"]),
+    default="none",
+    help="Durability policy of saved documents.",
+)
+@click.option(
+    "--document-store",
+    type=click.Choice(["blobs", "files"]),
+    default="blobs",
+    help="Layout of saved documents.",
+)
+@click.option(
+    "--coalesce/--no-coalesce",
+    default=False,
+    help="Share identical concurrent LLM calls (every run uses the same idea).",
+)
+@click.option(
+    "--json",
+    "json_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also write the results to this JSON file.",
+)
+def main(
+    scenarios: Tuple[str, ...],
+    concurrency: str,
+    iterations: int,
+    json_path: Optional[Path],
+    **fake_options: Any,
+) -> None:
+    """Benchmark DAVAI offline against the fake LLM provider."""
+    configure_environment(fake_options)
+    levels = [int(level) for level in concurrency.split(",")]
+    selected = list(scenarios) or [
+        "workflow",
+        "workflow_route",
+        "agent_routes",
+        "save_documents",
+        "saved_projects",
+    ]
+
+    results, storage = asyncio.run(run_suite(selected, levels, iterations))
+    console = Console(width=None if sys.stdout.isatty() else 120)
+    render(results, console)
+    render_storage(storage, console)
+    if json_path:
+        json_path.write_text(
+            json.dumps({"results": results, "storage": storage}, indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
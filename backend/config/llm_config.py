@@ -1,5 +1,6 @@
+import json
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 
 @dataclass
@@ -39,3 +40,24 @@ class LlmConfig:
         }
         params.update(kwargs)
         return LlmConfig(**params)
+
+    def cache_key(self) -> Tuple:
+        """
+        Returns a hashable key identifying this configuration.
+
+        Two configurations with the same key produce interchangeable LLM clients.
+
+        Returns:
+            Tuple of all configuration values
+        """
+        return (
+            self.provider.lower(),
+            self.model,
+            self.temperature,
+            self.response_format,
+            (
+                json.dumps(self.model_kwargs, sort_keys=True)
+                if self.model_kwargs
+                else None
+            ),
+        )
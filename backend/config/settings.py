@@ -28,19 +28,118 @@ class Settings(BaseSettings):
     # Project Generation Settings
     max_questions: int = 10
     default_templates_path: Path = Path("../templates")
+    workflow_dependency_profile: str = "strict"  # "strict" or "relaxed"
+    # Feed later agents a compact brief instead of the full core documents
+    workflow_project_brief: bool = False
+    # Tokens kept free for system prompt, prompt template and completion when
+    # fitting upstream documents into a model's context window
+    context_reserved_tokens: int = 6000
 
     # Local Storage Settings
     temp_storage_path: Path = Path("temp")
     cache_storage_path: Path = Path("cache")
+    # Durability of saved documents: "none" (OS flushes), "files" (fsync each
+    # file before its atomic rename) or "all" (also fsync the folder)
+    storage_fsync: str = "none"
+    # Where saved documents go: "blobs" (deduplicated, compressed store under
+    # <temp>/blobs, folders keep a manifest) or "files" (markdown files)
+    document_store: str = "blobs"
+    # SQLite index of the saved projects, defaults to <temp>/projects.sqlite3
+    project_catalog_path: Optional[Path] = None
+    # Storage retention: limits on the saved projects (0 disables a limit),
+    # applied every retention_interval seconds when enabled
+    retention_enabled: bool = False
+    retention_interval: float = 3600.0
+    retention_max_age_days: float = 0
+    retention_max_projects: int = 0
+    retention_max_bytes: int = 0  # Project folders and their blobs
+    # Deleted first: "oldest" (last modified) or "least_accessed" (last read)
+    retention_order: str = "oldest"
+
+    # Background Job Settings
+    job_workers: int = 2  # Batch workflows running at once
+    job_queue_size: int = 100  # Batch workflows waiting
+
+    # Workflow Scheduling Settings: interactive runs start before batch jobs,
+    # tenants share the running slots by weighted fair queuing
+    workflow_max_running: int = 8  # Workflows running at once, all classes
+    workflow_queue_size: int = 50  # Interactive workflows waiting
+    workflow_tenant_queue_size: int = 50  # Waiting per tenant and class
+    tenant_header: str = "X-Tenant-ID"  # Request header naming the tenant
+    # Share of the running slots per tenant (1.0 by default), e.g. {"acme": 2}
+    tenant_weights: dict[str, float] = {}
+    # Items of a POST /workflow/batch request running or waiting at once
+    batch_concurrency: int = 4
+
+    # LLM Provider used by the workflow agents ("openai", "claude" or "fake")
+    llm_provider: str = "openai"
+
+    # Fake LLM Provider Settings (offline runs and benchmarks)
+    # Latency before the first token: fixed:S, uniform:LOW,HIGH, normal:MEAN,STD
+    # or lognormal:MEDIAN,SIGMA
+    fake_llm_latency: str = "fixed:0"
+    fake_llm_tokens_per_second: float = 0.0  # 0 streams instantly
+    fake_llm_error_rate: float = 0.0  # Probability of an injected 503 error
+    fake_llm_response_tokens: int = 600  # Size of synthesized documents
+    fake_llm_responses_path: Optional[Path] = None  # JSON canned responses
+    fake_llm_seed: int = 0
+
+    # LLM Traffic Cassettes: "off", "record" or "replay"
+    llm_cassette_mode: str = "off"
+    # Cassette file (.jsonl or .jsonl.gz); replay also accepts a saved project
+    # folder such as example/<project>
+    llm_cassette_path: Optional[Path] = None
+    llm_cassette_timing: str = "original"  # Replay timing: "original" or "fast"
+    llm_cassette_on_miss: str = "error"  # Unrecorded calls: "error" or "live"
+
+    # LLM Resilience Settings
+    llm_timeout: float = 120.0  # Per-attempt deadline in seconds (0 disables)
+    llm_max_retries: int = 3
+    llm_backoff_base: float = 1.0
+    llm_backoff_max: float = 30.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_timeout: float = 30.0
+    # Per "provider" or "provider/model" overrides of the settings above, e.g.
+    # {"claude": {"timeout": 180}, "openai/gpt-4o": {"max_retries": 5}}
+    llm_resilience_overrides: dict[str, dict[str, float]] = {}
+    # Share one in-flight request between concurrent identical LLM calls
+    llm_coalescing_enabled: bool = True
+    # LLM Rate Limits, used for models without limits in llm_factory.PROVIDERS
+    # (0 disables a limit): requests in flight, requests and tokens per minute
+    llm_max_concurrency: int = 0
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    # Per "provider" or "provider/model" overrides of the limits, e.g.
+    # {"openai/gpt-4o": {"rpm": 5000, "tpm": 800000}}
+    llm_limit_overrides: dict[str, dict[str, float]] = {}
+    # Order of requests waiting for a limit: "priority" (interactive requests
+    # before background jobs, then arrival order) or "fifo"
+    llm_queue_policy: str = "priority"
+    # Hedged requests: send a backup request to a second model when the
+    # primary has not started responding within a percentile of its latency
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_samples: int = 20  # Samples needed before using the percentile
+    llm_hedge_initial_delay: float = 10.0  # Hedge delay until then, in seconds
+    # Backup "provider/model" keyed by primary "provider/model" or provider
+    llm_hedge_backups: dict[str, str] = {"openai": "claude/claude-3-haiku-20240307"}
 
     # Caching Settings
     cache_enabled: bool = True
     cache_ttl: int = 3600  # 1 hour
     cache_max_size: int = 1000
 
+    # Tracing Settings
+    tracing_exporter: str = "none"  # "none", "file" or "otlp"
+    tracing_service_name: str = "davai"
+    tracing_file_path: Path = Path("temp/traces.jsonl")  # OTLP/JSON lines
+    tracing_otlp_endpoint: str = "http://localhost:4318"  # OTLP/HTTP collector
+
     # Logging Settings
     log_level: str = "INFO"
-    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    log_format: str = (
+        "%(asctime)s - %(name)s - %(levelname)s - %(trace_context)s%(message)s"
+    )
     log_file: Optional[str] = None
 
     class Config:
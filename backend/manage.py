@@ -0,0 +1,65 @@
+"""
+Management commands for DAVAI POC.
+
+Usage (from the backend directory):
+    python manage.py rebuild-catalog
+    python manage.py index-documents [--reindex]
+    python manage.py retention [--apply]
+"""
+
+import asyncio
+import json
+import time
+
+import click
+from rich.console import Console
+
+from services.project_catalog import project_catalog
+from services.retention import retention_service
+
+console = Console()
+
+
+@click.group()
+def cli() -> None:
+    """DAVAI management commands."""
+
+
+@cli.command("rebuild-catalog")
+def rebuild_catalog() -> None:
+    """Rebuild the saved projects catalog and search index from disk."""
+    started = time.perf_counter()
+    count = project_catalog.rebuild()
+    project_catalog.close()
+    console.print(
+        f"Indexed {count} projects from {project_catalog.projects_dir} into "
+        f"{project_catalog.db_path} in {time.perf_counter() - started:.2f}s"
+    )
+
+
+@cli.command("index-documents")
+@click.option(
+    "--reindex", is_flag=True, help="Reindex every project, not only missing ones."
+)
+def index_documents(reindex: bool) -> None:
+    """Index the documents of saved projects for full-text search."""
+    started = time.perf_counter()
+    count = project_catalog.backfill_documents(reindex)
+    project_catalog.close()
+    console.print(
+        f"Indexed the documents of {count} projects "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+@cli.command("retention")
+@click.option("--apply", is_flag=True, help="Delete, instead of a dry run.")
+def retention(apply: bool) -> None:
+    """Apply the storage retention limits (RETENTION_* settings)."""
+    report = asyncio.run(retention_service.run(dry_run=not apply))
+    project_catalog.close()
+    console.print_json(json.dumps(report))
+
+
+if __name__ == "__main__":
+    cli()
@@ -53,6 +53,20 @@ class TaskBreakdownAgentRequest(BaseAgentRequest):
     )
 
 
+class ProjectBriefAgentRequest(BaseAgentRequest):
+    """Request for Project Brief Agent - distills context + architecture + tech stack."""
+
+    context_docs: Optional[Dict[str, str]] = Field(
+        None, description="Context documentation from previous step"
+    )
+    architecture_docs: Optional[Dict[str, str]] = Field(
+        None, description="Architecture documentation from previous step"
+    )
+    tech_stack_docs: Optional[Dict[str, str]] = Field(
+        None, description="Tech stack documentation from previous step"
+    )
+
+
 class ProjectRulesAgentRequest(BaseAgentRequest):
     """Request for Project Rules Agent - depends on all documentation agents."""
 
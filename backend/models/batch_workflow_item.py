@@ -0,0 +1,34 @@
+"""
+Batch Workflow Item model.
+"""
+
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+from models.workflow_result import WorkflowResult
+
+
+class BatchWorkflowItem(BaseModel):
+    """Outcome of one item of a batch workflow request, streamed once finished."""
+
+    type: Literal["item"] = Field(default="item", description="NDJSON line type")
+    index: int = Field(..., description="Position of the item in the request")
+    duplicate_of: Optional[int] = Field(
+        default=None,
+        description="Index of the identical item whose run this item shares",
+    )
+    project_idea: str = Field(..., description="Project idea of the item")
+    success: bool = Field(..., description="Whether the item's workflow succeeded")
+    workflow_id: Optional[str] = Field(
+        default=None, description="Identifier of the item's checkpointed run"
+    )
+    duration: float = Field(
+        ..., description="Seconds from the start of the batch to the item's result"
+    )
+    error_message: Optional[str] = Field(
+        default=None, description="Error message if the workflow failed"
+    )
+    result: Optional[WorkflowResult] = Field(
+        default=None,
+        description="Workflow result, unless results are excluded or the item is "
+        "a duplicate",
+    )
@@ -0,0 +1,30 @@
+"""
+Batch Workflow Request model.
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from models.complete_workflow_request import CompleteWorkflowRequest
+
+
+class BatchWorkflowRequest(BaseModel):
+    """Request model for running the complete workflow for many project ideas."""
+
+    items: List[CompleteWorkflowRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Complete workflow requests; identical items run once",
+    )
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=32,
+        description="Items running or waiting for a scheduler slot at once. Uses "
+        "BATCH_CONCURRENCY if not provided.",
+    )
+    include_results: bool = Field(
+        default=True,
+        description="Include each item's WorkflowResult (with its documents) in "
+        "the stream; otherwise only item statuses are streamed",
+    )
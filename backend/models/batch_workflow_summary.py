@@ -0,0 +1,26 @@
+"""
+Batch Workflow Summary model.
+"""
+
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class BatchWorkflowSummary(BaseModel):
+    """Aggregate outcome of a batch workflow request, streamed last."""
+
+    type: Literal["summary"] = Field(default="summary", description="NDJSON line type")
+    items: int = Field(..., description="Items in the request")
+    workflows: int = Field(..., description="Workflows run, duplicates excluded")
+    duplicates: int = Field(..., description="Items sharing an identical item's run")
+    succeeded: int = Field(..., description="Items whose workflow succeeded")
+    failed: int = Field(..., description="Items whose workflow failed")
+    duration: float = Field(..., description="Wall-clock duration in seconds")
+    throughput: float = Field(..., description="Workflows run per second")
+    prompt_tokens: int = Field(default=0, description="Prompt tokens of all workflows")
+    completion_tokens: int = Field(
+        default=0, description="Completion tokens of all workflows"
+    )
+    cost: float = Field(
+        default=0.0, description="Estimated cost of all workflows in USD"
+    )
@@ -2,7 +2,7 @@
 Complete Workflow Request model.
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -12,6 +12,21 @@ class CompleteWorkflowRequest(BaseModel):
     project_idea: str = Field(..., description="Brief description of the project idea")
     answers: List[str] = Field(..., description="User answers to clarifying questions")
     include_suggestions: bool = Field(
-        False,
+        default=False,
         description="Whether to include suggestion generation step in the workflow",
     )
+    dependency_profile: Optional[str] = Field(
+        default=None,
+        description="Agent dependency profile ('strict' or 'relaxed'). "
+        "Uses the configured default if not provided.",
+    )
+    regenerate: bool = Field(
+        default=False,
+        description="Bypass the response cache and regenerate every document",
+    )
+    use_project_brief: Optional[bool] = Field(
+        default=None,
+        description="Feed later agents a compact project brief instead of the full "
+        "context, architecture and tech stack documents. Uses the configured "
+        "default if not provided.",
+    )
@@ -0,0 +1,24 @@
+"""
+Project Brief model.
+"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ProjectBrief(BaseModel):
+    """Compact structured brief distilled from context, architecture and tech stack."""
+
+    summary: str = Field(..., description="Short project summary")
+    key_decisions: List[str] = Field(
+        default_factory=list, description="Key architectural and product decisions"
+    )
+    components: List[str] = Field(
+        default_factory=list, description="Main system components"
+    )
+    tech_stack: List[str] = Field(
+        default_factory=list, description="Selected technologies"
+    )
+    constraints: List[str] = Field(
+        default_factory=list, description="Project constraints"
+    )
@@ -0,0 +1,18 @@
+"""
+Project Export Request model.
+"""
+
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+
+class ProjectExportRequest(BaseModel):
+    """Request model for exporting several saved projects in one archive."""
+
+    projects: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Folder names of the saved projects to export",
+    )
+    format: Literal["zip", "tar.gz"] = Field("zip", description="Archive format")
@@ -0,0 +1,30 @@
+"""
+Regenerate Workflow Request model.
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class RegenerateWorkflowRequest(BaseModel):
+    """Request model for regenerating a workflow after its inputs changed."""
+
+    project_idea: Optional[str] = Field(
+        default=None,
+        description="New project idea. Keeps the previous one if not provided.",
+    )
+    answers: Optional[List[str]] = Field(
+        default=None,
+        description="New answers to the previous clarifying questions. Keeps the "
+        "previous ones if not provided.",
+    )
+    rerun: List[str] = Field(
+        default_factory=list,
+        description="Steps to rerun, bypassing the response cache, even if their "
+        "inputs did not change (e.g. 'architecture'); their dependents are rerun "
+        "only if the new documents differ",
+    )
+    regenerate: bool = Field(
+        default=False,
+        description="Bypass the response cache for the steps that are rerun",
+    )
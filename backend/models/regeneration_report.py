@@ -0,0 +1,32 @@
+"""
+Regeneration Report model.
+"""
+
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class RegenerationReport(BaseModel):
+    """What an incremental regeneration reused from the previous workflow."""
+
+    regenerated_from: str = Field(..., description="Previous workflow identifier")
+    reused_steps: List[str] = Field(
+        ..., description="Steps whose documents were reused, their inputs unchanged"
+    )
+    rerun_steps: Dict[str, List[str]] = Field(
+        ...,
+        description="Steps that were run again, with the inputs that changed "
+        "(project_data, upstream:<step>, prompt, model, input, rerun or new)",
+    )
+    saved_seconds: float = Field(
+        ..., description="Duration of the reused steps in the previous run"
+    )
+    saved_prompt_tokens: int = Field(
+        ..., description="Prompt tokens of the reused steps in the previous run"
+    )
+    saved_completion_tokens: int = Field(
+        ..., description="Completion tokens of the reused steps in the previous run"
+    )
+    saved_cost: float = Field(
+        ..., description="Estimated cost of the reused steps in the previous run (USD)"
+    )
@@ -0,0 +1,14 @@
+"""
+Resume Workflow Request model.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class ResumeWorkflowRequest(BaseModel):
+    """Request model for resuming a checkpointed workflow."""
+
+    regenerate: bool = Field(
+        default=False,
+        description="Bypass the response cache for the steps that are rerun",
+    )
@@ -0,0 +1,42 @@
+"""
+Workflow Job model.
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from models.complete_workflow_request import CompleteWorkflowRequest
+from models.workflow_result import WorkflowResult
+from models.workflow_step import WorkflowStep
+
+
+class WorkflowJob(BaseModel):
+    """Asynchronous complete-workflow job and its progress."""
+
+    job_id: str = Field(..., description="Unique job identifier")
+    status: str = Field(
+        default="queued", description="Job status: queued, running, completed or failed"
+    )
+    request: CompleteWorkflowRequest = Field(..., description="Submitted request")
+    tenant: str = Field("default", description="Tenant that submitted the job")
+    created_at: float = Field(..., description="Submission time (Unix timestamp)")
+    traceparent: Optional[str] = Field(
+        default=None, description="W3C traceparent of the submitting request's trace"
+    )
+    started_at: Optional[float] = Field(
+        default=None, description="Start time (Unix timestamp)"
+    )
+    finished_at: Optional[float] = Field(
+        default=None, description="Completion time (Unix timestamp)"
+    )
+    running_steps: List[str] = Field(
+        default_factory=list, description="Workflow steps currently in progress"
+    )
+    steps: List[WorkflowStep] = Field(
+        default_factory=list, description="Finished workflow steps"
+    )
+    result: Optional[WorkflowResult] = Field(
+        default=None, description="Workflow result once the job has finished"
+    )
+    error_message: Optional[str] = Field(
+        default=None, description="Error message if the job failed"
+    )
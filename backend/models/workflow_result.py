@@ -2,8 +2,9 @@
 Workflow Result model.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
+from models.regeneration_report import RegenerationReport
 from models.workflow_step import WorkflowStep
 
 
@@ -11,9 +12,17 @@ class WorkflowResult(BaseModel):
     """Complete workflow execution result."""
 
     project_idea: str = Field(..., description="Original project idea")
+    workflow_id: Optional[str] = Field(
+        default=None,
+        description="Identifier of the checkpointed run, used to resume it",
+    )
     steps: List[WorkflowStep] = Field(..., description="List of workflow steps")
-    final_documentation: Dict[str, str] = Field(
+    final_documentation: Optional[Dict[str, str]] = Field(
         None, description="Final generated documentation"
     )
     success: bool = Field(..., description="Whether the entire workflow succeeded")
     total_duration: float = Field(..., description="Total execution time in seconds")
+    regeneration: Optional[RegenerationReport] = Field(
+        default=None,
+        description="Steps reused from the previous workflow of a regeneration",
+    )
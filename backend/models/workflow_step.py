@@ -2,7 +2,7 @@
 Workflow Step model.
 """
 
-from typing import Dict
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 
 
@@ -13,4 +13,32 @@ class WorkflowStep(BaseModel):
     input_data: Dict = Field(..., description="Input data for the step")
     output_data: Dict = Field(..., description="Output data from the step")
     success: bool = Field(..., description="Whether the step completed successfully")
-    error_message: str = Field(None, description="Error message if step failed")
+    error_message: Optional[str] = Field(
+        default=None, description="Error message if step failed"
+    )
+    started_at: Optional[float] = Field(
+        default=None,
+        description="Start offset in seconds from the beginning of the workflow",
+    )
+    duration: Optional[float] = Field(
+        default=None, description="Wall-clock duration of the step in seconds"
+    )
+    model: Optional[str] = Field(
+        default=None, description="Model of the step's LLM calls (provider/model)"
+    )
+    ttft: Optional[float] = Field(
+        default=None,
+        description="Time to first token of the step's first LLM call, in seconds",
+    )
+    prompt_tokens: Optional[int] = Field(
+        default=None, description="Prompt tokens of the step's LLM calls"
+    )
+    completion_tokens: Optional[int] = Field(
+        default=None, description="Completion tokens of the step's LLM calls"
+    )
+    cost: Optional[float] = Field(
+        default=None, description="Estimated cost of the step's LLM calls in US dollars"
+    )
+    retry_count: Optional[int] = Field(
+        default=None, description="Retried LLM call attempts of the step"
+    )
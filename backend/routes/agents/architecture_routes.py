@@ -2,21 +2,22 @@
 Architecture Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict
 from models.project_data import ProjectData
 from models.agent_requests import ArchitectureAgentRequest
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/architecture", tags=["Architecture"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Dict[str, str])
-async def generate_architecture(request: ArchitectureAgentRequest) -> Dict[str, str]:
+async def generate_architecture(
+    request: ArchitectureAgentRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, str]:
     """
     Generate system architecture documentation.
 
@@ -2,20 +2,21 @@
 Claude Guide Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict
 from models.project_data import ProjectData
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/claude-guide", tags=["Claude Guide"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Dict[str, str])
-async def generate_claude_guide(project_data: ProjectData) -> Dict[str, str]:
+async def generate_claude_guide(
+    project_data: ProjectData,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, str]:
     """
     Generate Claude AI integration guide documentation.
 
@@ -0,0 +1,62 @@
+"""
+Project Brief Agent routes.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict
+from models.project_data import ProjectData
+from models.agent_requests import ProjectBriefAgentRequest
+from routes.dependencies import get_orchestrator
+from services.workflow_orchestrator import WorkflowOrchestrator
+from utils.logger import logger
+
+router = APIRouter(prefix="/project-brief", tags=["Project Brief"])
+
+
+@router.post("/generate", response_model=Dict[str, str])
+async def generate_project_brief(
+    request: ProjectBriefAgentRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, str]:
+    """
+    Generate the compact project brief.
+
+    Args:
+        request: Project brief agent request with the documents to distill
+
+    Returns:
+        Generated project brief
+    """
+    try:
+        logger.info("Generating project brief")
+
+        # Create base project data
+        project_data = ProjectData(
+            project_idea=request.project_idea,
+            questions=request.questions,
+            answers=request.answers,
+        )
+
+        # If previous docs are provided, enhance the project data
+        if request.context_docs or request.architecture_docs or request.tech_stack_docs:
+            logger.info("Distilling provided documentation into a project brief")
+            previous_docs = {}
+            if request.context_docs:
+                previous_docs["context"] = request.context_docs
+            if request.architecture_docs:
+                previous_docs["architecture"] = request.architecture_docs
+            if request.tech_stack_docs:
+                previous_docs["tech_stack"] = request.tech_stack_docs
+
+            enhanced_project_data = orchestrator.enhance_project_data_with_docs(
+                project_data, previous_docs
+            )
+            result = await orchestrator.generate_project_brief(enhanced_project_data)
+        else:
+            logger.info("Generating project brief without dependencies")
+            result = await orchestrator.generate_project_brief(project_data)
+
+        return result
+    except Exception as e:
+        logger.error(f"Failed to generate project brief: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
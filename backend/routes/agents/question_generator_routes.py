@@ -2,20 +2,21 @@
 Question Generator Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from models.project_idea import ProjectIdea
 from models.questions import Questions
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/question-generator", tags=["Question Generator"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Questions)
-async def generate_questions(project_idea: ProjectIdea) -> Questions:
+async def generate_questions(
+    project_idea: ProjectIdea,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Questions:
     """
     Generate clarifying questions for a project idea.
 
@@ -2,20 +2,21 @@
 Suggestion Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from models.suggestion_input import SuggestionInput
 from models.suggestions import Suggestions
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/suggestion-agent", tags=["Suggestion Agent"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Suggestions)
-async def generate_suggestions(suggestion_input: SuggestionInput) -> Suggestions:
+async def generate_suggestions(
+    suggestion_input: SuggestionInput,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Suggestions:
     """
     Generate suggested answers to clarifying questions based on project idea.
 
@@ -2,21 +2,22 @@
 Task Breakdown Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict
 from models.project_data import ProjectData
 from models.agent_requests import TaskBreakdownAgentRequest
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/task-breakdown", tags=["Task Breakdown"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Dict[str, str])
-async def generate_task_breakdown(request: TaskBreakdownAgentRequest) -> Dict[str, str]:
+async def generate_task_breakdown(
+    request: TaskBreakdownAgentRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, str]:
     """
     Generate task breakdown documentation.
 
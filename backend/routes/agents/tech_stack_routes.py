@@ -2,21 +2,22 @@
 Tech Stack Agent routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict
 from models.project_data import ProjectData
 from models.agent_requests import TechStackAgentRequest
+from routes.dependencies import get_orchestrator
 from services.workflow_orchestrator import WorkflowOrchestrator
 from utils.logger import logger
 
 router = APIRouter(prefix="/tech-stack", tags=["Tech Stack"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
-
 
 @router.post("/generate", response_model=Dict[str, str])
-async def generate_tech_stack(request: TechStackAgentRequest) -> Dict[str, str]:
+async def generate_tech_stack(
+    request: TechStackAgentRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, str]:
     """
     Generate technology stack selection documentation.
 
@@ -0,0 +1,53 @@
+"""
+Shared FastAPI dependencies for DAVAI routes.
+"""
+
+import re
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from config.settings import settings
+from services.job_manager import JobManager
+from services.orchestrator_registry import OrchestratorRegistry
+from services.workflow_orchestrator import WorkflowOrchestrator
+from services.workflow_scheduler import DEFAULT_TENANT
+
+_TENANT_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def get_orchestrator_registry(request: Request) -> OrchestratorRegistry:
+    """Get the app-scoped orchestrator registry created in the lifespan hook."""
+    registry = getattr(request.app.state, "orchestrators", None)
+    if registry is None:
+        # Lifespan did not run (e.g. app used without startup events)
+        registry = OrchestratorRegistry()
+        request.app.state.orchestrators = registry
+    return registry
+
+
+def get_orchestrator(request: Request) -> WorkflowOrchestrator:
+    """Get the shared workflow orchestrator."""
+    return get_orchestrator_registry(request).get()
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """Get the background workflow job manager started in the lifespan hook."""
+    jobs: Optional[JobManager] = getattr(request.app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Job manager is not running")
+    return jobs
+
+
+def get_tenant(request: Request) -> str:
+    """Get the tenant of a request from the TENANT_HEADER header."""
+    tenant = request.headers.get(settings.tenant_header)
+    if tenant is None:
+        return DEFAULT_TENANT
+    if not _TENANT_ID.match(tenant):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {settings.tenant_header} header: use 1-64 letters, "
+            "digits, dots, dashes or underscores",
+        )
+    return tenant
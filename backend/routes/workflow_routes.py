@@ -2,29 +2,59 @@
 Complete workflow routes.
 """
 
-from fastapi import APIRouter, HTTPException
-from pathlib import Path
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Literal, Optional
 from models.workflow_result import WorkflowResult
+from models.batch_workflow_request import BatchWorkflowRequest
 from models.complete_workflow_request import CompleteWorkflowRequest
+from models.project_export_request import ProjectExportRequest
+from models.regenerate_workflow_request import RegenerateWorkflowRequest
+from models.resume_workflow_request import ResumeWorkflowRequest
+from models.workflow_job import WorkflowJob
+from routes.dependencies import get_job_manager, get_orchestrator, get_tenant
+from services.job_manager import JobManager, JobQueueFullError
+from services.project_catalog import SORT_COLUMNS
+from services.project_export import ARCHIVE_FORMATS, project_exporter
+from services.workflow_batch import run_batch
 from services.workflow_orchestrator import WorkflowOrchestrator
+from services.workflow_scheduler import SchedulerFullError, workflow_scheduler
 from utils.logger import logger
 
 router = APIRouter(prefix="/workflow", tags=["Workflow"])
 
-# Initialize workflow orchestrator
-orchestrator = WorkflowOrchestrator()
+
+def _queue_full(error: SchedulerFullError) -> HTTPException:
+    """Too Many Requests response for a workflow rejected by the scheduler."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
 
 
 @router.post("/complete", response_model=WorkflowResult)
-async def complete_workflow(request: CompleteWorkflowRequest) -> WorkflowResult:
+async def complete_workflow(
+    request: CompleteWorkflowRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    tenant: str = Depends(get_tenant),
+) -> WorkflowResult:
     """
     Run the complete workflow: generate questions then documentation.
 
+    The run waits for an interactive slot of the workflow scheduler.
+
     Args:
         request: Complete workflow request with project_idea, answers, and optional suggestion generation
+        tenant: Tenant named by the TENANT_HEADER header
 
     Returns:
         Complete workflow result with all documentation
+
+    Raises:
+        HTTPException: 429 with Retry-After if the tenant's queue is full
     """
     try:
         logger.info(
@@ -33,23 +63,334 @@ async def complete_workflow(request: CompleteWorkflowRequest) -> WorkflowResult:
         if request.include_suggestions:
             logger.info("Including suggestion generation in workflow")
 
-        result = await orchestrator.run_complete_workflow(
-            request.project_idea, request.answers, request.include_suggestions
-        )
+        async with workflow_scheduler.slot(tenant):
+            result = await orchestrator.run_complete_workflow(
+                request.project_idea,
+                request.answers,
+                request.include_suggestions,
+                dependency_profile=request.dependency_profile,
+                regenerate=request.regenerate,
+                use_project_brief=request.use_project_brief,
+            )
         return result
+    except SchedulerFullError as e:
+        raise _queue_full(e) from e
     except Exception as e:
         logger.error(f"Complete workflow failed: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post("/{workflow_id}/resume", response_model=WorkflowResult)
+async def resume_workflow(
+    workflow_id: str,
+    request: ResumeWorkflowRequest = ResumeWorkflowRequest(),
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    tenant: str = Depends(get_tenant),
+) -> WorkflowResult:
+    """
+    Resume a failed or interrupted workflow from its checkpoint.
+
+    Completed steps are restored; only the failed step and its dependents run.
+
+    Args:
+        workflow_id: Workflow identifier returned in the WorkflowResult
+        request: Resume options
+        tenant: Tenant named by the TENANT_HEADER header
+
+    Returns:
+        Complete workflow result with all documentation
+    """
+    checkpoint = await orchestrator.get_checkpoint(workflow_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if checkpoint.status == "completed":
+        raise HTTPException(status_code=409, detail="Workflow already completed")
+
+    try:
+        async with workflow_scheduler.slot(tenant):
+            return await orchestrator.resume_workflow(
+                checkpoint, regenerate=request.regenerate
+            )
+    except SchedulerFullError as e:
+        raise _queue_full(e) from e
+    except Exception as e:
+        logger.error(f"Workflow resume failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/{workflow_id}/regenerate", response_model=WorkflowResult)
+async def regenerate_workflow(
+    workflow_id: str,
+    request: RegenerateWorkflowRequest = RegenerateWorkflowRequest(),
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    tenant: str = Depends(get_tenant),
+) -> WorkflowResult:
+    """
+    Regenerate a workflow with a new project idea or answers.
+
+    Only the steps whose inputs changed, and the steps depending on their
+    documents, are run again; the others reuse the previous documents. The
+    new run gets its own workflow id and project folder.
+
+    Args:
+        workflow_id: Identifier of the workflow to regenerate
+        request: New inputs and regeneration options
+        tenant: Tenant named by the TENANT_HEADER header
+
+    Returns:
+        Complete workflow result with its regeneration report
+    """
+    checkpoint = await orchestrator.get_checkpoint(workflow_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if checkpoint.status == "running":
+        raise HTTPException(status_code=409, detail="Workflow is still running")
+
+    try:
+        async with workflow_scheduler.slot(tenant):
+            return await orchestrator.regenerate_workflow(
+                checkpoint,
+                project_idea=request.project_idea,
+                answers=request.answers,
+                rerun=request.rerun,
+                regenerate=request.regenerate,
+            )
+    except SchedulerFullError as e:
+        raise _queue_full(e) from e
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except Exception as e:
+        logger.error(f"Workflow regeneration failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/complete/stream")
+async def stream_complete_workflow(
+    request: CompleteWorkflowRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    tenant: str = Depends(get_tenant),
+) -> StreamingResponse:
+    """
+    Run the complete workflow and stream its progress as server-sent events.
+
+    The run waits for an interactive slot of the workflow scheduler; a full
+    queue is rejected with 429 before the stream starts.
+
+    Events:
+        workflow_start: Sent immediately
+        step_start: {"step_name", "started_at"}
+        token: {"step_name", "token"} for each generated LLM token
+        step_end: The finished WorkflowStep
+        result: The final WorkflowResult (last event)
+        error: {"detail"} if the workflow raised
+
+    Args:
+        request: Complete workflow request
+        tenant: Tenant named by the TENANT_HEADER header
+
+    Returns:
+        Event stream
+    """
+    try:
+        workflow_scheduler.check(tenant, "interactive")
+    except SchedulerFullError as e:
+        raise _queue_full(e) from e
+    logger.info(
+        f"Streaming complete workflow for project: {request.project_idea[:100]}..."
+    )
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: str, data: Dict[str, Any]) -> None:
+        if event == "step_end":
+            data = data["step"].model_dump()
+        events.put_nowait((event, data))
+
+    async def run() -> None:
+        try:
+            # Admitted by the check above
+            async with workflow_scheduler.slot(tenant, force=True):
+                result = await orchestrator.run_complete_workflow(
+                    request.project_idea,
+                    request.answers,
+                    request.include_suggestions,
+                    dependency_profile=request.dependency_profile,
+                    regenerate=request.regenerate,
+                    use_project_brief=request.use_project_brief,
+                    on_event=on_event,
+                    stream_tokens=True,
+                )
+            events.put_nowait(("result", result.model_dump()))
+        except Exception as e:
+            logger.error(f"Streaming workflow failed: {e}")
+            events.put_nowait(("error", {"detail": str(e)}))
+
+    async def stream() -> AsyncIterator[str]:
+        task = asyncio.create_task(run())
+        try:
+            yield _sse_event("workflow_start", {"project_idea": request.project_idea})
+            while True:
+                event, data = await events.get()
+                yield _sse_event(event, data)
+                if event in ("result", "error"):
+                    break
+        finally:
+            # Client disconnected or stream finished
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def batch_workflow(
+    request: BatchWorkflowRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    tenant: str = Depends(get_tenant),
+) -> StreamingResponse:
+    """
+    Run the complete workflow for many project ideas, streaming NDJSON.
+
+    Identical items run once. Items are batch runs of the workflow
+    scheduler, at most `concurrency` at a time. Each line is a JSON object:
+    a BatchWorkflowItem ("type": "item") as soon as an item finishes, in
+    completion order, then a BatchWorkflowSummary ("type": "summary").
+
+    Args:
+        request: Batch request
+        tenant: Tenant named by the TENANT_HEADER header
+
+    Returns:
+        NDJSON stream
+
+    Raises:
+        HTTPException: 429 with Retry-After if the batch queue or the
+            tenant's share of it is full
+    """
+    try:
+        workflow_scheduler.check(tenant, "batch")
+    except SchedulerFullError as e:
+        raise _queue_full(e) from e
+
+    async def stream() -> AsyncIterator[str]:
+        batch = run_batch(orchestrator, request, tenant)
+        try:
+            async for line in batch:
+                yield line.model_dump_json() + "\n"
+        finally:
+            # Client disconnected: cancel the remaining runs
+            await batch.aclose()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=WorkflowJob,
+    response_model_exclude={"result"},
+    status_code=202,
+)
+async def submit_workflow_job(
+    request: CompleteWorkflowRequest,
+    jobs: JobManager = Depends(get_job_manager),
+    tenant: str = Depends(get_tenant),
+) -> WorkflowJob:
+    """
+    Submit a complete workflow for background execution.
+
+    Jobs are batch runs of the workflow scheduler: they start after the
+    interactive runs, sharing the batch slots fairly between tenants.
+
+    Args:
+        request: Complete workflow request
+        tenant: Tenant named by the TENANT_HEADER header
+
+    Returns:
+        The queued job; poll GET /workflow/jobs/{job_id} for progress
+
+    Raises:
+        HTTPException: 429 with Retry-After if the batch queue or the
+            tenant's share of it is full
+    """
+    try:
+        return await jobs.submit(request, tenant)
+    except JobQueueFullError as e:
+        raise _queue_full(e) from e
+
+
+@router.get(
+    "/jobs/{job_id}", response_model=WorkflowJob, response_model_exclude={"result"}
+)
+async def get_workflow_job(
+    job_id: str, jobs: JobManager = Depends(get_job_manager)
+) -> WorkflowJob:
+    """Get the status and per-step progress of a workflow job."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result", response_model=WorkflowResult)
+async def get_workflow_job_result(
+    job_id: str, jobs: JobManager = Depends(get_job_manager)
+) -> WorkflowResult:
+    """Get the result of a finished workflow job."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.result is None:
+        raise HTTPException(
+            status_code=409,
+            detail=job.error_message or f"Job is {job.status}, result not available",
+        )
+    return job.result
+
+
 @router.get("/saved-projects")
-async def list_saved_projects():
-    """List all saved documentation projects."""
+async def list_saved_projects(
+    offset: int = Query(0, ge=0, description="Number of projects to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Projects per page"),
+    sort: str = Query(
+        "generated_at",
+        description=f"Sort column: {', '.join(SORT_COLUMNS)}",
+    ),
+    order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
+    status: Optional[str] = Query(
+        None, description="Only projects with this status (running, failed, ...)"
+    ),
+    q: Optional[str] = Query(
+        None, description="Only projects whose idea contains this text"
+    ),
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, Any]:
+    """List saved documentation projects, a page at a time."""
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"sort must be one of: {', '.join(SORT_COLUMNS)}",
+        )
     try:
-        projects = orchestrator.list_saved_projects()
+        total, projects = await orchestrator.list_saved_projects(
+            offset, limit, sort, order == "desc", status, q
+        )
         return {
             "status": "success",
-            "total_projects": len(projects),
+            "total_projects": total,
+            "offset": offset,
+            "limit": limit,
             "projects": projects,
         }
     except Exception as e:
@@ -57,27 +398,110 @@ async def list_saved_projects():
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.get("/search")
+async def search_documents(
+    q: str = Query(
+        ...,
+        min_length=1,
+        description='Terms to find, "quoted phrases" and prefix* terms',
+    ),
+    document: Optional[str] = Query(
+        None, description="Only search this document, e.g. architecture.md"
+    ),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Results per page"),
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Dict[str, Any]:
+    """Search the documents of every saved project, best matches first."""
+    try:
+        total, results = await orchestrator.search_documents(q, document, offset, limit)
+        return {
+            "status": "success",
+            "query": q,
+            "total_results": total,
+            "offset": offset,
+            "limit": limit,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(f"Failed to search documents: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get("/saved-projects/{project_name}")
-async def get_project_files(project_name: str):
+async def get_project_files(
+    project_name: str, orchestrator: WorkflowOrchestrator = Depends(get_orchestrator)
+) -> Dict[str, Any]:
     """Get files from a specific saved project."""
     try:
-        projects = orchestrator.list_saved_projects()
-        project = next((p for p in projects if p["folder_name"] == project_name), None)
-
-        if not project:
+        found = await orchestrator.get_saved_project(project_name)
+        if found is None:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Read all markdown files from the project folder
-        project_path = Path(project["folder_path"])
-        files = {}
-
-        for file_path in project_path.glob("*.md"):
-            with open(file_path, "r", encoding="utf-8") as f:
-                files[file_path.stem] = f.read()
-
+        project, files = found
         return {"status": "success", "project_metadata": project, "files": files}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to get project files: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.get("/saved-projects/{project_name}/export")
+async def export_project(
+    project_name: str,
+    request: Request,
+    format: Literal["zip", "tar.gz"] = Query("zip", description="Archive format"),
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Response:
+    """Download a saved project as an archive (supports Range and ETag requests)."""
+    project_dir = await orchestrator.saved_project_dir(project_name)
+    if project_dir is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    etag = await project_exporter.etag(project_dir, format)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    media_type, extension = ARCHIVE_FORMATS[format]
+    path = await project_exporter.archive(project_dir, format, etag)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"{project_name}{extension}",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/saved-projects/export")
+async def export_projects(
+    request: ProjectExportRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+) -> Response:
+    """Stream several saved projects as one archive, one folder per project."""
+    project_dirs, missing = [], []
+    for name in dict.fromkeys(request.projects):
+        project_dir = await orchestrator.saved_project_dir(name)
+        if project_dir is None:
+            missing.append(name)
+        else:
+            project_dirs.append(project_dir)
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Projects not found: {', '.join(missing)}"
+        )
+
+    media_type, extension = ARCHIVE_FORMATS[request.format]
+    return StreamingResponse(
+        project_exporter.stream(project_dirs, request.format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="projects{extension}"'},
+    )
@@ -0,0 +1,305 @@
+"""
+LLM traffic cassettes for DAVAI POC.
+
+Records every prompt/response pair flowing through the agents into a compact
+JSON Lines file (gzip-compressed when the path ends in .gz) and replays it
+without any network access, either with the original timing or as fast as
+possible.
+"""
+
+import asyncio
+import gzip
+import io
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from services.document_store import read_documents
+from utils.logger import logger
+
+# Agent producing each document of a saved project
+SAVED_PROJECT_AGENTS = {
+    "context.md": "ContextAgent",
+    "architecture.md": "ArchitectureAgent",
+    "tech-stack-selection.md": "TechStackAgent",
+    "TASK_BREAKDOWN.md": "TaskBreakdownAgent",
+    "project-rules.md": "ProjectRulesAgent",
+    "CLAUDE.md": "ClaudeGuideAgent",
+    "README.md": "ReadmeAgent",
+}
+
+# Timing assumed for saved projects, which do not record any
+ESTIMATED_TTFT = 0.8
+ESTIMATED_TOKENS_PER_SECOND = 40.0
+
+_TIMINGS = ("original", "fast")
+
+
+class CassetteMissError(RuntimeError):
+    """Raised when a replayed cassette has no response for an LLM call."""
+
+
+@dataclass(eq=False)
+class CassetteEntry:
+    """A recorded LLM call."""
+
+    agent: str
+    response: str
+    fingerprint: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    system_prompt: Optional[str] = None
+    user_prompt: Optional[str] = None
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    recorded_at: Optional[float] = None
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.GzipFile(path, mode), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """Recorded LLM traffic, in record or replay mode."""
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        mode: str = "replay",
+        timing: str = "original",
+        on_miss: str = "error",
+        entries: Optional[List[CassetteEntry]] = None,
+    ):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: Cassette file (None for an in-memory cassette)
+            mode: "record" or "replay"
+            timing: Replay timing, "original" or "fast"
+            on_miss: What replay does for unrecorded calls: "error" raises
+                CassetteMissError, "live" calls the configured provider
+            entries: Recorded calls
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if timing not in _TIMINGS:
+            raise ValueError(f"Unknown cassette timing: {timing}")
+
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self.on_miss = on_miss
+        self.entries: List[CassetteEntry] = entries or []
+
+        self._by_fingerprint: Dict[str, Deque[CassetteEntry]] = defaultdict(deque)
+        self._by_agent: Dict[str, Deque[CassetteEntry]] = defaultdict(deque)
+        self.rewind()
+
+    @classmethod
+    def load(cls, path: Path, **kwargs: Any) -> "Cassette":
+        """
+        Load a cassette for replay.
+
+        Args:
+            path: Cassette file, or a saved project folder (see from_saved_project)
+            **kwargs: Cassette options
+
+        Returns:
+            Cassette in replay mode
+        """
+        if path.is_dir():
+            return cls.from_saved_project(path, **kwargs)
+
+        entries = []
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(CassetteEntry(**json.loads(line)))
+        logger.info(f"Loaded cassette {path} ({len(entries)} calls)")
+        return cls(path, "replay", entries=entries, **kwargs)
+
+    @classmethod
+    def from_saved_project(cls, project_dir: Path, **kwargs: Any) -> "Cassette":
+        """
+        Build a replay cassette from a saved project folder.
+
+        Each document becomes the response of the agent that produced it.
+        Saved projects carry no prompts or timing, so calls are matched by
+        agent and replayed with an estimated timing.
+
+        Args:
+            project_dir: Folder written by save_documentation_to_disk
+            **kwargs: Cassette options
+
+        Returns:
+            Cassette in replay mode
+        """
+        with open(project_dir / "metadata.json", "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        documents = read_documents(project_dir, metadata)
+        entries = []
+        for doc_name in metadata.get("document_list", []):
+            agent = SAVED_PROJECT_AGENTS.get(doc_name)
+            response = documents.get(doc_name)
+            if agent is None or response is None:
+                logger.warning(f"No replayable document {doc_name} in {project_dir}")
+                continue
+            output_tokens = (len(response) + 3) // 4
+            entries.append(
+                CassetteEntry(
+                    agent=agent,
+                    response=response,
+                    latency=ESTIMATED_TTFT
+                    + output_tokens / ESTIMATED_TOKENS_PER_SECOND,
+                    ttft=ESTIMATED_TTFT,
+                    usage={"output_tokens": output_tokens},
+                )
+            )
+        logger.info(f"Loaded saved project {project_dir} ({len(entries)} calls)")
+        return cls(project_dir, "replay", entries=entries, **kwargs)
+
+    def rewind(self) -> None:
+        """Restart replay from the first recorded call."""
+        self._by_fingerprint.clear()
+        self._by_agent.clear()
+        for entry in self.entries:
+            if entry.fingerprint:
+                self._by_fingerprint[entry.fingerprint].append(entry)
+            self._by_agent[entry.agent].append(entry)
+
+    def match(self, agent: str, fingerprint: str) -> Optional[CassetteEntry]:
+        """
+        Find the recorded response of a call.
+
+        Calls are matched by prompt fingerprint first, then by agent and
+        call order, so replays survive prompt changes in the orchestrator.
+        The last response of a fingerprint or agent is reused once its
+        recorded calls are used up.
+
+        Args:
+            agent: Agent class name
+            fingerprint: Prompt fingerprint of the call
+
+        Returns:
+            Recorded call, or None
+        """
+        for queue in (self._by_fingerprint.get(fingerprint), self._by_agent.get(agent)):
+            if queue:
+                entry = queue[0]
+                self._consume(entry)
+                return entry
+        return None
+
+    def _consume(self, entry: CassetteEntry) -> None:
+        """Remove a replayed call from its queues, keeping the last one of each."""
+        for queue in (
+            self._by_fingerprint.get(entry.fingerprint or ""),
+            self._by_agent.get(entry.agent),
+        ):
+            if queue and len(queue) > 1 and entry in queue:
+                queue.remove(entry)
+
+    async def replay(
+        self, entry: CassetteEntry, sink: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Replay a recorded response.
+
+        Args:
+            entry: Recorded call
+            sink: Optional callback receiving the response tokens
+
+        Returns:
+            Recorded response
+        """
+        latency = (entry.latency or 0.0) if self.timing == "original" else 0.0
+        ttft = min(entry.ttft or 0.0, latency)
+        if ttft:
+            await asyncio.sleep(ttft)
+
+        if sink is None:
+            if latency:
+                await asyncio.sleep(latency - ttft)
+            return entry.response
+
+        # Spread the tokens over the recorded generation time
+        words = entry.response.split(" ")
+        delay = (latency - ttft) / len(words)
+        for index, word in enumerate(words):
+            sink(word if index == len(words) - 1 else word + " ")
+            if delay:
+                await asyncio.sleep(delay)
+        return entry.response
+
+    def record(self, entry: CassetteEntry) -> None:
+        """
+        Append a call to the cassette file.
+
+        Args:
+            entry: Recorded call
+        """
+        entry.recorded_at = entry.recorded_at or time.time()
+        self.entries.append(entry)
+        if self.path is not None:
+            with _open(self.path, "a") as f:
+                f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+
+
+# Cassette of the current context, overriding the configured one
+_active: ContextVar[Optional[Cassette]] = ContextVar("llm_cassette", default=None)
+_configured: Tuple[bool, Optional[Cassette]] = (False, None)
+
+
+def _from_settings() -> Optional[Cassette]:
+    mode = settings.llm_cassette_mode
+    if mode == "off":
+        return None
+    if settings.llm_cassette_path is None:
+        raise ValueError("LLM_CASSETTE_PATH is required when LLM_CASSETTE_MODE is set")
+
+    options: Dict[str, Any] = {
+        "timing": settings.llm_cassette_timing,
+        "on_miss": settings.llm_cassette_on_miss,
+    }
+    if mode == "replay":
+        return Cassette.load(settings.llm_cassette_path, **options)
+    settings.llm_cassette_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Recording LLM traffic to {settings.llm_cassette_path}")
+    return Cassette(settings.llm_cassette_path, mode, **options)
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the cassette of the current context, or the configured one."""
+    global _configured
+    cassette = _active.get()
+    if cassette is not None:
+        return cassette
+    if not _configured[0]:
+        _configured = (True, _from_settings())
+    return _configured[1]
+
+
+@contextmanager
+def use_cassette(cassette: Optional[Cassette]) -> Iterator[Optional[Cassette]]:
+    """
+    Record or replay the LLM calls of the current context with a cassette.
+
+    Args:
+        cassette: Cassette to use
+    """
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
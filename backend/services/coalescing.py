@@ -0,0 +1,154 @@
+"""
+LLM request coalescing for DAVAI POC.
+
+Concurrent identical LLM calls (same prompt fingerprint) share a single
+in-flight request: the first caller starts it, later callers wait for its
+response instead of sending their own. Waiters streaming tokens receive the
+tokens already streamed, then the live ones. The shared request only stops
+when every waiter is gone, so a disconnecting client never fails the others.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.metrics import LlmResult, registry
+
+# Starts the shared request, streaming its tokens to the given callback when
+# the first caller streams (None otherwise). Its result carries what the
+# request consumed, so that whichever caller owns it can account for it
+LlmRequest = Callable[[Optional[Callable[[str], None]]], Awaitable[LlmResult]]
+
+
+class _Flight:
+    """An in-flight request and the callers waiting for it."""
+
+    def __init__(self, request: LlmRequest, streaming: bool):
+        self.streaming = streaming
+        self.waiters = 0
+        self.claimed = False
+        self.tokens: List[str] = []
+        self.listeners: List[Callable[[str], None]] = []
+        self.task: asyncio.Future[LlmResult] = asyncio.ensure_future(
+            request(self.broadcast if streaming else None)
+        )
+
+    def broadcast(self, token: str) -> None:
+        """Forward a streamed token to every waiter, keeping it for later ones."""
+        self.tokens.append(token)
+        for listener in list(self.listeners):
+            listener(token)
+
+
+class RequestCoalescer:
+    """Shares in-flight LLM requests between concurrent identical calls."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the coalescer.
+
+        Args:
+            enabled: Whether identical calls are coalesced at all
+        """
+        self.enabled = enabled
+        self._flights: Dict[str, _Flight] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "coalesced": 0, "cancelled": 0, "abandoned": 0}
+        )
+
+    async def run(
+        self,
+        agent: str,
+        key: str,
+        request: LlmRequest,
+        on_token: Callable[[str], None],
+        stream: bool = False,
+    ) -> Tuple[LlmResult, bool]:
+        """
+        Get the response of a call, joining an identical call in flight.
+
+        When the shared request does not stream, the waiters' on_token
+        receives the whole response at once, as for a cache hit.
+
+        Args:
+            agent: Agent class name, for the counters
+            key: Prompt fingerprint of the call
+            request: Starts the request if none is in flight for the key
+            on_token: Callback receiving the response tokens
+            stream: Whether the caller streams tokens
+
+        Returns:
+            The request's result, and whether this caller accounts for the
+            request: the first waiter to get the result, usually the one
+            that started it
+
+        Raises:
+            asyncio.CancelledError: If this waiter is cancelled; the request
+                is cancelled too when no other caller waits for it
+        """
+        counters = self._counters[agent]
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(request, stream)
+            flight.task.add_done_callback(lambda _: self._discard(key, flight))
+            self._flights[key] = flight
+            counters["requests"] += 1
+        else:
+            counters["coalesced"] += 1
+
+        if flight.streaming:
+            for token in flight.tokens:
+                on_token(token)
+            flight.listeners.append(on_token)
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                counters["cancelled"] += 1
+                if flight.waiters == 1:
+                    # Nobody needs the response any more
+                    flight.task.cancel()
+                    self._discard(key, flight)
+                    counters["abandoned"] += 1
+            raise
+        finally:
+            flight.waiters -= 1
+            if flight.streaming:
+                flight.listeners.remove(on_token)
+
+        if not flight.streaming:
+            on_token(result.content)
+        owner = not flight.claimed
+        flight.claimed = True
+        return result, owner
+
+    def in_flight(self) -> int:
+        """Number of requests in flight."""
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-agent coalescing counters.
+
+        Returns:
+            Requests sent, calls coalesced into one of them, waiters cancelled
+            and requests abandoned by all their waiters, by agent
+        """
+        return {agent: dict(counters) for agent, counters in self._counters.items()}
+
+    def _discard(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Global request coalescer instance
+coalescer = RequestCoalescer(enabled=settings.llm_coalescing_enabled)
+
+registry.gauge(
+    "davai_llm_inflight_requests",
+    "LLM requests in flight, each possibly shared by several coalesced calls.",
+    (),
+    lambda: {(): float(coalescer.in_flight())},
+)
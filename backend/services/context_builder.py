@@ -0,0 +1,256 @@
+"""
+Context builder for DAVAI POC.
+
+Assembles the upstream documentation passed to downstream agents within a
+per-model token budget, ranking and trimming documents section by section.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from config.llm_config import LlmConfig
+from services.llm_factory import get_context_window
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$", re.MULTILINE)
+
+# Sections whose heading mentions one of these terms are kept first
+KEY_SECTION_TERMS = (
+    "overview",
+    "summary",
+    "decision",
+    "component",
+    "architecture",
+    "stack",
+    "technolog",
+    "constraint",
+    "requirement",
+    "scope",
+    "goal",
+)
+
+# Relative importance of upstream document categories
+DOC_PRIORITY = {
+    "project_brief": 1.2,
+    "context": 1.0,
+    "architecture": 0.9,
+    "tech_stack": 0.9,
+    "task_breakdown": 0.6,
+    "project_rules": 0.5,
+    "claude_guide": 0.4,
+    "readme": 0.3,
+}
+
+TRIM_MARKER = "[...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text (about 4 characters per token).
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class _Section:
+    """A markdown section split into heading, lead paragraph and remainder."""
+
+    doc_type: str
+    heading: str
+    lead: str
+    rest: str
+    score: float
+    keep_heading: bool = False
+    keep_lead: bool = False
+    keep_rest: bool = False
+
+
+@dataclass
+class BuiltContext:
+    """Result of a context build."""
+
+    text: str
+    token_budget: int
+    total_tokens: int
+    doc_tokens: Dict[str, int] = field(default_factory=dict)
+    trimmed: bool = False
+
+
+class ContextBuilder:
+    """Builds downstream agent context from upstream documents within a budget."""
+
+    def __init__(self, token_budget: int):
+        """
+        Initialize the builder.
+
+        Args:
+            token_budget: Maximum number of tokens of the assembled context
+        """
+        self.token_budget = max(token_budget, 0)
+
+    @classmethod
+    def for_model(cls, llm_config: LlmConfig, reserved_tokens: int) -> "ContextBuilder":
+        """
+        Create a builder sized for a model's context window.
+
+        Args:
+            llm_config: Configuration of the model that will receive the context
+            reserved_tokens: Tokens kept free for the system prompt, the rest of
+                the user prompt and the completion
+
+        Returns:
+            Context builder
+        """
+        return cls(get_context_window(llm_config) - reserved_tokens)
+
+    def build(
+        self, base_text: str, previous_docs: Dict[str, Dict[str, str]]
+    ) -> BuiltContext:
+        """
+        Combine the base text with upstream documents.
+
+        Documents are included in full when they fit. Otherwise section headings
+        are kept first, then lead paragraphs, then full section bodies, ranked
+        by document priority, key headings and heading level while the budget
+        allows.
+
+        Args:
+            base_text: Text placed before the documents (the project idea)
+            previous_docs: Upstream documents by category, then by filename
+
+        Returns:
+            Assembled context with per-document token accounting
+        """
+        full = self._render(base_text, previous_docs, None)
+        if full.total_tokens <= self.token_budget:
+            return full
+
+        sections = self._split(previous_docs)
+        remaining = self.token_budget - estimate_tokens(
+            self._render(base_text, previous_docs, {}).text
+        )
+
+        # Headings (with a trim marker) go in first, then lead paragraphs, then
+        # full section bodies, each pass in rank order while the budget allows
+        ranked = sorted(
+            (s for doc_sections in sections.values() for s in doc_sections),
+            key=lambda s: s.score,
+            reverse=True,
+        )
+        for section in ranked:
+            cost = estimate_tokens(section.heading + TRIM_MARKER)
+            if cost <= remaining:
+                section.keep_heading = True
+                remaining -= cost
+        for attr, part, requires in (
+            ("keep_lead", "lead", "keep_heading"),
+            ("keep_rest", "rest", "keep_lead"),
+        ):
+            for section in ranked:
+                if not getattr(section, requires):
+                    continue
+                cost = estimate_tokens(getattr(section, part))
+                if cost <= remaining:
+                    setattr(section, attr, True)
+                    remaining -= cost
+
+        built = self._render(base_text, previous_docs, sections)
+        built.trimmed = True
+        return built
+
+    def _split(self, previous_docs: Dict[str, Dict[str, str]]) -> Dict:
+        """Split every document into ranked sections, keyed by (category, filename)."""
+        sections = {}
+        for doc_type, docs in previous_docs.items():
+            doc_weight = DOC_PRIORITY.get(doc_type, 0.5)
+            for filename, content in docs.items():
+                matches = list(_HEADING.finditer(content))
+                bounds = [m.start() for m in matches] + [len(content)]
+                doc_sections = []
+
+                if not matches or bounds[0] > 0:
+                    preamble = content[: bounds[0] if matches else len(content)]
+                    doc_sections.append(
+                        self._section(doc_type, "", preamble, doc_weight + 0.5)
+                    )
+
+                for index, match in enumerate(matches):
+                    heading_line = content[match.start() : match.end()] + "\n"
+                    body = content[match.end() : bounds[index + 1]].lstrip("\n")
+                    heading = match.group(2).lower()
+                    score = doc_weight
+                    score += 0.5 if any(t in heading for t in KEY_SECTION_TERMS) else 0
+                    score += 0.2 / len(match.group(1))
+                    score -= 0.01 * index
+                    doc_sections.append(
+                        self._section(doc_type, heading_line, body, score)
+                    )
+
+                sections[(doc_type, filename)] = doc_sections
+        return sections
+
+    @staticmethod
+    def _section(doc_type: str, heading: str, body: str, score: float) -> _Section:
+        lead, sep, rest = body.partition("\n\n")
+        return _Section(doc_type, heading, lead + sep, rest, score)
+
+    def _render(
+        self,
+        base_text: str,
+        previous_docs: Dict[str, Dict[str, str]],
+        sections: Optional[Dict],
+    ) -> BuiltContext:
+        """
+        Render the context in linear time.
+
+        Args:
+            base_text: Text placed before the documents
+            previous_docs: Upstream documents
+            sections: Trimmed sections by (category, filename); None renders the
+                full documents and an empty dict renders only the frame
+
+        Returns:
+            Rendered context
+        """
+        parts: List[str] = [base_text, "\n\n"]
+        doc_tokens: Dict[str, int] = {}
+
+        for doc_type, docs in previous_docs.items():
+            parts.append(f"\n=== {doc_type.upper()} DOCUMENTATION ===\n")
+            doc_parts: List[str] = []
+            for filename in docs:
+                doc_parts.append(f"\n--- {filename} ---\n")
+                if sections is None:
+                    doc_parts.append(docs[filename])
+                else:
+                    for section in sections.get((doc_type, filename), []):
+                        if not section.keep_heading:
+                            continue
+                        doc_parts.append(section.heading)
+                        if section.keep_lead:
+                            doc_parts.append(section.lead)
+                        if section.keep_rest:
+                            doc_parts.append(section.rest)
+                        cut_lead = section.lead and not section.keep_lead
+                        cut_rest = section.rest and not section.keep_rest
+                        if cut_lead or cut_rest:
+                            doc_parts.append(TRIM_MARKER)
+                doc_parts.append("\n")
+
+            doc_text = "".join(doc_parts)
+            doc_tokens[doc_type] = estimate_tokens(doc_text)
+            parts.append(doc_text)
+
+        text = "".join(parts)
+        return BuiltContext(
+            text=text,
+            token_budget=self.token_budget,
+            total_tokens=estimate_tokens(text),
+            doc_tokens=doc_tokens,
+        )
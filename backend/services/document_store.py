@@ -0,0 +1,229 @@
+"""
+Document store for DAVAI POC.
+
+Writes and reads the documents of saved projects. With the "blobs" store
+(DOCUMENT_STORE), every document is hashed (SHA-256), gzip-compressed and
+written once under its hash, so regenerated and cache-served runs share
+their identical documents; a project folder then only holds a manifest of
+its documents in metadata.json. With the "files" store, documents are plain
+markdown files in the project folder. Folders of both layouts, including the
+ones saved before blobs existed, are read the same way.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from config.settings import settings
+from utils.tracing import start_span
+
+
+def document_filename(doc_name: str) -> str:
+    """Get the markdown filename of a document."""
+    return f"{doc_name}.md" if not doc_name.endswith(".md") else doc_name
+
+
+async def write_file_atomic(
+    path: Path, data: Union[str, bytes], fsync: Optional[str] = None
+) -> int:
+    """
+    Atomically write a file without blocking the event loop.
+
+    The data is written to a temporary file in the same folder, then renamed
+    over the target, so readers never see a partially written file. The
+    whole write runs in one worker thread.
+
+    Args:
+        path: Target file
+        data: File content, text (UTF-8) or bytes
+        fsync: Durability policy, defaults to STORAGE_FSYNC: "none" leaves
+            flushing to the OS, "files" fsyncs the file before the rename and
+            "all" also fsyncs the folder after the rename
+
+    Returns:
+        Number of characters or bytes written
+    """
+    with start_span("file.write", {"file.path": str(path)}) as span:
+        written = await asyncio.to_thread(
+            write_atomic, path, data, fsync or settings.storage_fsync
+        )
+        span.set_attribute("file.size", written)
+    return written
+
+
+def write_atomic(path: Path, data: Union[str, bytes], fsync: str) -> int:
+    """Blocking version of write_file_atomic, for worker threads."""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        binary = isinstance(data, bytes)
+        with open(
+            tmp_path, "wb" if binary else "w", encoding=None if binary else "utf-8"
+        ) as f:
+            written = f.write(data)
+            if fsync in ("files", "all"):
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if fsync == "all":
+        _fsync_dir(path.parent)
+    return written
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist the entries of a folder (e.g. a rename) to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class BlobStore:
+    """Content-addressed store of gzip-compressed blobs."""
+
+    def __init__(self, root: Path, compress_level: int = 6):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the blobs
+            compress_level: gzip compression level (1-9)
+        """
+        self.root = root
+        self.compress_level = compress_level
+
+    def path(self, digest: str) -> Path:
+        """Get the file of a blob, fanned out over 256 folders."""
+        return self.root / digest[:2] / f"{digest[2:]}.gz"
+
+    def put(self, data: bytes, fsync: str = "none") -> Tuple[str, bool]:
+        """
+        Store a blob unless it is already stored.
+
+        Args:
+            data: Blob content
+            fsync: Durability policy (see write_file_atomic)
+
+        Returns:
+            SHA-256 hex digest of the content, and whether it was new
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # Refreshed so garbage collection spares a blob being reused
+            os.utime(path)
+            return digest, False
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mtime=0 keeps the compressed bytes of identical content identical
+        compressed = gzip.compress(data, self.compress_level, mtime=0)
+        write_atomic(path, compressed, fsync)
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a blob.
+
+        Raises:
+            FileNotFoundError: If the blob is not stored
+        """
+        return gzip.decompress(self.path(digest).read_bytes())
+
+    def open(self, digest: str) -> gzip.GzipFile:
+        """Open a blob for streaming reads of its decompressed content."""
+        return gzip.open(self.path(digest), "rb")
+
+    def exists(self, digest: str) -> bool:
+        """Check whether a blob is stored."""
+        return self.path(digest).exists()
+
+
+async def store_documents(
+    project_dir: Path, documents: Dict[str, str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Store the documents of a project folder concurrently.
+
+    Args:
+        project_dir: Project folder
+        documents: Document contents by name
+
+    Returns:
+        Manifest entries ({"sha256", "size"}) by document filename to record
+        under "documents" in metadata.json; empty with the "files" store
+    """
+    if settings.document_store != "blobs":
+        await asyncio.gather(
+            *(
+                write_file_atomic(project_dir / document_filename(name), content)
+                for name, content in documents.items()
+            )
+        )
+        return {}
+
+    async def put(content: str) -> Dict[str, Any]:
+        data = content.encode("utf-8")
+        with start_span("blob.put", {"blob.size": len(data)}) as span:
+            digest, is_new = await asyncio.to_thread(
+                blob_store.put, data, settings.storage_fsync
+            )
+            span.set_attributes(**{"blob.sha256": digest, "blob.new": is_new})
+        return {"sha256": digest, "size": len(data)}
+
+    entries = await asyncio.gather(*(put(content) for content in documents.values()))
+    return {document_filename(name): entry for name, entry in zip(documents, entries)}
+
+
+def read_documents(
+    project_dir: Path,
+    metadata: Dict[str, Any],
+    names: Optional[Iterable[str]] = None,
+) -> Dict[str, str]:
+    """
+    Read documents of a project folder, whatever its layout (blocking).
+
+    Documents listed in the folder's manifest are read from the blob store,
+    the others from the folder's markdown files.
+
+    Args:
+        project_dir: Project folder
+        metadata: Content of the folder's metadata.json
+        names: Document names to read; all documents by default
+
+    Returns:
+        Document contents by filename
+
+    Raises:
+        FileNotFoundError: If a requested document is missing
+    """
+    manifest = metadata.get("documents") or {}
+    if names is None:
+        filenames: List[str] = sorted(
+            set(manifest) | {path.name for path in project_dir.glob("*.md")}
+        )
+    else:
+        filenames = [document_filename(name) for name in names]
+
+    documents = {}
+    for filename in filenames:
+        entry = manifest.get(filename)
+        if entry is not None:
+            try:
+                documents[filename] = blob_store.get(entry["sha256"]).decode("utf-8")
+                continue
+            except FileNotFoundError:
+                pass
+        documents[filename] = (project_dir / filename).read_text(encoding="utf-8")
+    return documents
+
+
+# Global blob store instance
+blob_store = BlobStore(root=settings.temp_storage_path / "blobs")
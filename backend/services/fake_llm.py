@@ -0,0 +1,275 @@
+"""
+Fake LLM provider for DAVAI POC.
+
+Deterministic chat model used for offline runs and benchmarks: it returns
+canned responses without any network access and simulates provider latency,
+token rate and errors.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    UsageMetadata,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from utils.logger import logger
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+# Words used to synthesize markdown documents
+_WORDS = (
+    "service api user data model workflow module database cache queue event "
+    "request response component interface deployment security monitoring "
+    "scalability integration storage schema endpoint feature release team"
+).split()
+
+
+class FakeLLMError(Exception):
+    """Injected provider error carrying an HTTP status like real SDK errors."""
+
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution.
+
+    Supported forms: "fixed:SECONDS", "uniform:LOW,HIGH",
+    "normal:MEAN,STDDEV" and "lognormal:MEDIAN,SIGMA".
+
+    Args:
+        spec: Distribution specification
+
+    Returns:
+        Function drawing a latency in seconds from a random generator
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    kind, _, raw = spec.partition(":")
+    try:
+        params = [float(p) for p in raw.split(",") if p.strip()]
+    except ValueError as e:
+        raise ValueError(f"Invalid latency distribution: {spec}") from e
+
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal" and len(params) == 2:
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    raise ValueError(
+        f"Invalid latency distribution: {spec}. "
+        "Use fixed:S, uniform:LOW,HIGH, normal:MEAN,STD or lognormal:MEDIAN,SIGMA"
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model returning canned responses with simulated timing and errors.
+
+    A response is picked from the first rule in `responses` whose "match"
+    string appears in the prompt. Otherwise a response is synthesized from a
+    hash of the prompt: a JSON object accepted by every JSON agent in JSON
+    mode, or a markdown document of about `response_tokens` tokens.
+    """
+
+    model_name: str = "fake-chat"
+    json_mode: bool = False
+    latency: str = "fixed:0"
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    response_tokens: int = 600
+    question_count: int = 5
+    responses: List[Dict[str, str]] = []
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _draw_latency: Callable[[random.Random], float] = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._draw_latency = parse_latency(self.latency)
+
+    @classmethod
+    def load_responses(cls, path: Optional[Path]) -> List[Dict[str, str]]:
+        """
+        Load canned response rules from a JSON file.
+
+        Args:
+            path: File holding a list of {"match": ..., "response": ...} objects
+
+        Returns:
+            Response rules (empty if no path is given)
+        """
+        if path is None:
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            rules: List[Dict[str, str]] = json.load(f)
+        return rules
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "json_mode": self.json_mode}
+
+    def respond(self, messages: List[BaseMessage]) -> str:
+        """
+        Get the response to a prompt.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            Canned or synthesized response
+        """
+        prompt = "\n".join(str(m.content) for m in messages)
+        for rule in self.responses:
+            if rule.get("match", "") in prompt:
+                return rule["response"]
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(digest)
+        if self.json_mode:
+            items = [
+                f"{' '.join(rng.choices(_WORDS, k=6))}"
+                for _ in range(self.question_count)
+            ]
+            return json.dumps(
+                {
+                    "questions": [f"What about the {item}?" for item in items],
+                    "suggested_answers": [f"Use a {item}." for item in items],
+                    "reasoning": " ".join(rng.choices(_WORDS, k=30)),
+                    "summary": " ".join(rng.choices(_WORDS, k=40)),
+                    "key_decisions": items,
+                    "components": rng.sample(_WORDS, 4),
+                    "tech_stack": rng.sample(_WORDS, 4),
+                    "constraints": items[:2],
+                }
+            )
+
+        parts = [f"# {' '.join(rng.choices(_WORDS, k=3)).title()}\n\n"]
+        while _estimate_tokens("".join(parts)) < self.response_tokens:
+            parts.append(f"## {' '.join(rng.choices(_WORDS, k=2)).title()}\n\n")
+            parts.append(" ".join(rng.choices(_WORDS, k=60)) + ".\n\n")
+        return "".join(parts)
+
+    def _usage(self, messages: List[BaseMessage], content: str) -> UsageMetadata:
+        input_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+        output_tokens = _estimate_tokens(content)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _next_call(self) -> float:
+        """Draw the latency of a call, raising an injected error if due."""
+        if self.error_rate and self._rng.random() < self.error_rate:
+            logger.debug("Fake LLM injecting a provider error")
+            raise FakeLLMError(
+                f"Injected fake provider error ({self.error_status})",
+                self.error_status,
+            )
+        return self._draw_latency(self._rng)
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency = self._next_call()
+        content = self.respond(messages)
+        time.sleep(latency + self._token_delay() * len(_TOKEN.findall(content)))
+        message = AIMessage(
+            content=content, usage_metadata=self._usage(messages, content)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        latency = self._next_call()
+        content = self.respond(messages)
+        await asyncio.sleep(
+            latency + self._token_delay() * len(_TOKEN.findall(content))
+        )
+        message = AIMessage(
+            content=content, usage_metadata=self._usage(messages, content)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._next_call())
+        content = self.respond(messages)
+        delay = self._token_delay()
+        for token in _TOKEN.findall(content):
+            if delay:
+                time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, content)
+            )
+        )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._next_call())
+        content = self.respond(messages)
+        delay = self._token_delay()
+        for token in _TOKEN.findall(content):
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, content)
+            )
+        )
@@ -0,0 +1,240 @@
+"""
+Hedged LLM requests for DAVAI POC.
+
+When the primary model has not started responding within a percentile of its
+observed time to first token, a backup request is sent to a second model.
+The first result wins and the other request is cancelled.
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from config.llm_config import LlmConfig
+from config.settings import settings
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# A request leg: model label and a coroutine factory streaming the response,
+# calling the given callback with every token
+HedgeLeg = Tuple[str, Callable[[Callable[[str], None]], Awaitable[T]]]
+
+
+class LatencyTracker:
+    """Sliding window of time-to-first-token samples per model."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent samples kept per model
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+
+    def record(self, model: str, seconds: float) -> None:
+        """
+        Record the time to first token of a call.
+
+        A call cancelled before its first token is recorded with its elapsed
+        time, a lower bound of its time to first token: leaving such calls
+        out would bias the percentiles towards the fast calls.
+        """
+        self._samples[model].append(seconds)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        """
+        Get a percentile of a model's time to first token.
+
+        Args:
+            model: Model label
+            q: Percentile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None until enough samples were recorded
+        """
+        samples = self._samples.get(model)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Hedger:
+    """Races a backup request against a slow primary request."""
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        initial_delay: float = 10.0,
+        tracker: Optional[LatencyTracker] = None,
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            percentile: Percentile of the primary's time to first token after
+                which the backup request is sent
+            initial_delay: Hedge delay used until enough samples were recorded
+            tracker: Latency tracker (a new one by default)
+        """
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.tracker = tracker or LatencyTracker()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "hedged": 0, "backup_wins": 0}
+        )
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for the primary's first token before hedging."""
+        delay = self.tracker.percentile(model, self.percentile)
+        return self.initial_delay if delay is None else delay
+
+    async def run(
+        self,
+        agent_name: str,
+        primary: HedgeLeg[T],
+        backup: HedgeLeg[T],
+        sink: Optional[Callable[[str], None]] = None,
+    ) -> T:
+        """
+        Run the primary leg, hedging with the backup leg if it is slow to start.
+
+        Without a sink the first leg to complete wins. With a sink, tokens
+        cannot be taken back, so the first leg to produce a token wins and
+        the other one is cancelled right away.
+
+        Args:
+            agent_name: Agent issuing the call, for per-agent counters
+            primary: Primary request leg
+            backup: Backup request leg
+            sink: Optional callback receiving the winning leg's tokens
+
+        Returns:
+            Result of the winning leg
+        """
+        counters = self._counters[agent_name]
+        counters["calls"] += 1
+        started = time.monotonic()
+        owner: Dict[str, "asyncio.Future[T]"] = {}
+        first_token: Dict[str, asyncio.Event] = {}
+        tasks: Dict[str, "asyncio.Future[T]"] = {}
+
+        def start(leg: HedgeLeg[T]) -> "asyncio.Future[T]":
+            name, run = leg
+            event = first_token[name] = asyncio.Event()
+
+            def forward(token: str) -> None:
+                if not event.is_set():
+                    event.set()
+                    self.tracker.record(name, time.monotonic() - started)
+                if sink is not None:
+                    winner = owner.setdefault("task", tasks[name])
+                    if winner is not tasks[name]:
+                        return
+                    for other in tasks.values():
+                        if other is not winner:
+                            other.cancel()
+                    sink(token)
+
+            tasks[name] = asyncio.ensure_future(run(forward))
+            return tasks[name]
+
+        primary_name = primary[0]
+        primary_task = start(primary)
+        delay = self.hedge_delay(primary_name)
+        waiter: "asyncio.Future[Any]" = asyncio.ensure_future(
+            first_token[primary_name].wait()
+        )
+        try:
+            await asyncio.wait(
+                {primary_task, waiter},
+                timeout=delay,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        except asyncio.CancelledError:
+            primary_task.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        if primary_task.done() or first_token[primary_name].is_set():
+            return await primary_task
+
+        counters["hedged"] += 1
+        logger.info(
+            f"Hedging {agent_name}: no response from {primary_name} after "
+            f"{delay:.1f}s, sending backup request to {backup[0]}"
+        )
+        backup_task = start(backup)
+        pending = {primary_task, backup_task}
+        try:
+            while pending:
+                if sink is not None and "task" in owner:
+                    # The leg streaming to the sink is the only one that counts
+                    pending = {owner["task"]}
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is backup_task:
+                            counters["backup_wins"] += 1
+                        return task.result()
+            # Every leg failed: report the error of the leg that counted
+            error = owner.get("task", primary_task).exception()
+            raise error or RuntimeError("Every hedged request failed")
+        finally:
+            for task in (primary_task, backup_task):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(primary_task, backup_task, return_exceptions=True)
+            if primary_task.cancelled() and not first_token[primary_name].is_set():
+                # Censored sample: the primary took at least this long
+                self.tracker.record(primary_name, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get per-agent hedging counters."""
+        return {agent: dict(counters) for agent, counters in self._counters.items()}
+
+
+def get_hedge_backup(config: LlmConfig) -> Optional[LlmConfig]:
+    """
+    Get the backup model configuration of a primary model.
+
+    Backups are configured in LLM_HEDGE_BACKUPS as "provider/model" values
+    keyed by "provider/model" or by provider.
+
+    Args:
+        config: Primary model configuration
+
+    Returns:
+        Backup configuration, or None if hedging is disabled or no backup is set
+    """
+    if not settings.llm_hedging_enabled:
+        return None
+
+    provider = config.provider.lower()
+    backups = settings.llm_hedge_backups
+    target = backups.get(f"{provider}/{config.model}") or backups.get(provider)
+    if not target:
+        return None
+
+    backup_provider, _, backup_model = target.partition("/")
+    if (backup_provider, backup_model) == (provider, config.model):
+        return None
+    return config.copy(provider=backup_provider, model=backup_model)
+
+
+hedger = Hedger(
+    percentile=settings.llm_hedge_percentile,
+    initial_delay=settings.llm_hedge_initial_delay,
+    tracker=LatencyTracker(min_samples=settings.llm_hedge_min_samples),
+)
@@ -0,0 +1,261 @@
+"""
+Workflow job manager for DAVAI POC.
+
+Runs complete workflows in the background as batch runs of the workflow
+scheduler, which bounds the jobs waiting and running and shares the running
+slots fairly between tenants. Job state is persisted to local storage after
+every step so progress and results survive a restart.
+"""
+
+import asyncio
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from models.complete_workflow_request import CompleteWorkflowRequest
+from models.workflow_job import WorkflowJob
+from services.document_store import write_atomic
+from services.orchestrator_registry import OrchestratorRegistry
+from services.rate_limiter import llm_priority
+from services.workflow_scheduler import (
+    DEFAULT_TENANT,
+    Admission,
+    SchedulerFullError,
+    WorkflowScheduler,
+    workflow_scheduler,
+)
+from utils.logger import logger
+from utils.tracing import current_span, start_span
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobQueueFullError(SchedulerFullError):
+    """Raised when a job is submitted while its queue is at capacity."""
+
+
+class JobManager:
+    """Background execution of workflow jobs."""
+
+    def __init__(
+        self,
+        registry: OrchestratorRegistry,
+        storage_path: Path,
+        scheduler: WorkflowScheduler = workflow_scheduler,
+    ):
+        """
+        Initialize the job manager.
+
+        Args:
+            registry: Registry providing the shared workflow orchestrator
+            storage_path: Directory where job state is persisted
+            scheduler: Scheduler admitting and starting the jobs
+        """
+        self.registry = registry
+        self.storage_path = storage_path
+        self.scheduler = scheduler
+
+        self._jobs: Dict[str, WorkflowJob] = {}  # Queued and running jobs
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._run_tasks: Set[asyncio.Task] = set()
+        self._save_tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Restore unfinished jobs from storage and queue them again."""
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+
+        for job in await asyncio.to_thread(self._load_unfinished):
+            job.status = "queued"
+            job.running_steps = []
+            # Already accepted once: the queue limits do not apply
+            self._spawn(job, self.scheduler.admit(job.tenant, "batch", force=True))
+        if self._jobs:
+            logger.info(f"Re-queued {len(self._jobs)} unfinished workflow jobs")
+
+    async def stop(self) -> None:
+        """Stop the jobs. Unfinished jobs are resumed on the next start."""
+        for task in self._run_tasks:
+            task.cancel()
+        await asyncio.gather(*self._run_tasks, return_exceptions=True)
+        self._run_tasks.clear()
+        await asyncio.gather(*self._save_tasks, return_exceptions=True)
+
+    async def submit(
+        self, request: CompleteWorkflowRequest, tenant: str = DEFAULT_TENANT
+    ) -> WorkflowJob:
+        """
+        Queue a complete workflow for background execution.
+
+        Args:
+            request: Complete workflow request
+            tenant: Tenant submitting the job
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If the batch queue or the tenant's share of it
+                is at capacity
+        """
+        try:
+            admission = self.scheduler.admit(tenant, "batch")
+        except SchedulerFullError as e:
+            raise JobQueueFullError(str(e), e.retry_after) from e
+
+        span = current_span()
+        job = WorkflowJob(
+            job_id=uuid.uuid4().hex,
+            request=request,
+            tenant=tenant,
+            created_at=time.time(),
+            traceparent=span.traceparent if span else None,
+        )
+        try:
+            await self._save(job)
+        except BaseException:
+            admission.cancel()
+            raise
+        self._spawn(job, admission)
+
+        logger.info(f"Queued workflow job {job.job_id} for tenant {tenant}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[WorkflowJob]:
+        """
+        Get a job by id, from memory or from storage.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        if not _JOB_ID.match(job_id):
+            return None
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return await asyncio.to_thread(self._read, self._path(job_id))
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue statistics."""
+        active = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {"queued": len(self._jobs) - active, "active": active}
+
+    def _spawn(self, job: WorkflowJob, admission: Admission) -> None:
+        self._jobs[job.job_id] = job
+        task = asyncio.get_running_loop().create_task(
+            self._wait_and_run(job, admission)
+        )
+        self._run_tasks.add(task)
+        task.add_done_callback(self._run_tasks.discard)
+
+    async def _wait_and_run(self, job: WorkflowJob, admission: Admission) -> None:
+        try:
+            async with admission:
+                await self._run(job)
+        except Exception as e:
+            logger.error(f"Workflow job {job.job_id} failed to run: {e}")
+        finally:
+            # Cancelled before its turn (e.g. at shutdown)
+            admission.cancel()
+
+    async def _run(self, job: WorkflowJob) -> None:
+        # The job continues the trace of the request that submitted it
+        with start_span(
+            "workflow.job",
+            kind="consumer",
+            traceparent=job.traceparent,
+            attributes={"job.id": job.job_id},
+        ) as span:
+            job.status = "running"
+            job.started_at = time.time()
+            span.set_attribute("job.queue_time", job.started_at - job.created_at)
+            await self._save(job)
+            await self._execute(job)
+            if job.status == "failed":
+                span.set_error(job.error_message or "failed")
+
+    async def _execute(self, job: WorkflowJob) -> None:
+        def on_event(event: str, data: Dict) -> None:
+            if event == "step_start":
+                job.running_steps.append(data["step_name"])
+            elif event == "step_end":
+                step = data["step"]
+                job.steps.append(step)
+                if step.step_name in job.running_steps:
+                    job.running_steps.remove(step.step_name)
+            else:
+                return
+            self._schedule_save(job)
+
+        request = job.request
+        try:
+            # Interactive requests go first in the LLM rate limiter queues
+            with llm_priority("background"):
+                result = await self.registry.get().run_complete_workflow(
+                    request.project_idea,
+                    request.answers,
+                    request.include_suggestions,
+                    dependency_profile=request.dependency_profile,
+                    regenerate=request.regenerate,
+                    use_project_brief=request.use_project_brief,
+                    on_event=on_event,
+                )
+            job.result = result
+            job.status = "completed" if result.success else "failed"
+            if not result.success:
+                job.error_message = next(
+                    (s.error_message for s in result.steps if not s.success), None
+                )
+        except Exception as e:
+            logger.error(f"Workflow job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error_message = str(e)
+
+        job.running_steps = []
+        job.finished_at = time.time()
+        await self._save(job)
+
+        # Finished jobs are served from storage
+        self._jobs.pop(job.job_id, None)
+        self._locks.pop(job.job_id, None)
+        logger.info(f"Workflow job {job.job_id} {job.status}")
+
+    def _schedule_save(self, job: WorkflowJob) -> None:
+        task = asyncio.get_running_loop().create_task(self._save(job))
+        self._save_tasks.add(task)
+        task.add_done_callback(self._save_tasks.discard)
+
+    async def _save(self, job: WorkflowJob) -> None:
+        lock = self._locks.setdefault(job.job_id, asyncio.Lock())
+        async with lock:
+            # Serialize under the lock so the latest state always wins
+            data = job.model_dump_json()
+            path = self._path(job.job_id)
+            with start_span("file.write", {"file.path": str(path)}):
+                await asyncio.to_thread(write_atomic, path, data, "none")
+
+    def _path(self, job_id: str) -> Path:
+        return self.storage_path / f"{job_id}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[WorkflowJob]:
+        try:
+            return WorkflowJob.model_validate_json(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Could not read workflow job {path}: {e}")
+            return None
+
+    def _load_unfinished(self) -> List[WorkflowJob]:
+        jobs = []
+        for path in self.storage_path.glob("*.json"):
+            job = self._read(path)
+            if job is not None and job.status in ("queued", "running"):
+                jobs.append(job)
+        jobs.sort(key=lambda j: j.created_at)
+        return jobs
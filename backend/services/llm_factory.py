@@ -5,33 +5,49 @@ Provides centralized management of Language Model providers (OpenAI, Claude, Gem
 optimized for project documentation generation tasks.
 """
 
+from typing import Any, Dict, Tuple
+
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
 from config.api_keys_config import init_api_keys_config
 from config.llm_config import LlmConfig
+from config.settings import settings
+from services.fake_llm import FakeChatModel
 from utils.logger import logger
 
 
 def validate_api_keys() -> bool:
     """
-    Validate that required API keys are available.
+    Validate that the API key of the configured provider is available.
 
     Returns:
-        True if OpenAI API key is available, False otherwise
+        True if the provider needs no key or its key is configured, False otherwise
     """
     try:
+        provider = settings.llm_provider.lower()
+        if provider not in PROVIDERS:
+            logger.error(f"❌ Unsupported LLM provider: {provider}")
+            return False
+
+        key_name = PROVIDERS[provider].get("api_key")
+        if key_name is None:
+            logger.info(f"✅ Using the {provider} LLM provider, no API key required")
+            return True
+
         api_keys_config = init_api_keys_config()
+        env_var = key_name.upper()
 
-        if not api_keys_config.openai_api_key:
+        if not getattr(api_keys_config, key_name):
             logger.error(
-                "❌ OpenAI API key is required but not found in environment variables"
+                f"❌ {env_var} is required by the {provider} provider but not found "
+                "in environment variables"
             )
-            logger.error("Please set OPENAI_API_KEY environment variable")
+            logger.error(f"Please set {env_var} environment variable")
             return False
 
-        logger.info("✅ OpenAI API key found and configured")
+        logger.info(f"✅ {env_var} found and configured")
         return True
 
     except Exception as e:
@@ -40,10 +56,17 @@ def validate_api_keys() -> bool:
 
 
 # Available providers and their models optimized for documentation generation
-PROVIDERS = {
+PROVIDERS: Dict[str, Dict[str, Any]] = {
     "openai": {
         "models": ["gpt-3.5-turbo-0125", "gpt-4o", "gpt-4o-mini"],
-        "config": {"temperature": 0.7},
+        "api_key": "openai_api_key",  # Settings field holding the key
+        # stream_usage: report token usage on streamed responses too;
+        # include_response_headers: expose rate-limit headers to the limiter
+        "config": {
+            "temperature": 0.7,
+            "stream_usage": True,
+            "include_response_headers": True,
+        },
         "json_models": [
             "gpt-3.5-turbo-0125",
             "gpt-4o",
@@ -53,6 +76,24 @@ PROVIDERS = {
             "gpt-3.5-turbo-0125",
             "gpt-4o-mini",
         ],  # Cheaper models for text generation
+        "context_windows": {
+            "gpt-3.5-turbo-0125": 16385,
+            "gpt-4o": 128000,
+            "gpt-4o-mini": 128000,
+        },
+        # USD per million (input, output) tokens
+        "pricing": {
+            "gpt-3.5-turbo-0125": (0.50, 1.50),
+            "gpt-4o": (2.50, 10.00),
+            "gpt-4o-mini": (0.15, 0.60),
+        },
+        # Rate limits (see services.rate_limiter), tier 1 defaults; the
+        # account's actual limits are read from the response headers
+        "limits": {
+            "gpt-3.5-turbo-0125": {"max_concurrency": 16, "rpm": 500, "tpm": 200000},
+            "gpt-4o": {"max_concurrency": 8, "rpm": 500, "tpm": 30000},
+            "gpt-4o-mini": {"max_concurrency": 16, "rpm": 500, "tpm": 200000},
+        },
     },
     "claude": {
         "models": [
@@ -60,10 +101,74 @@ PROVIDERS = {
             "claude-3-sonnet-20240229",
             "claude-3-opus-20240229",
         ],
+        "api_key": "anthropic_api_key",
         "config": {"temperature": 0.7},
+        "context_windows": {
+            "claude-3-haiku-20240307": 200000,
+            "claude-3-sonnet-20240229": 200000,
+            "claude-3-opus-20240229": 200000,
+        },
+        "pricing": {
+            "claude-3-haiku-20240307": (0.25, 1.25),
+            "claude-3-sonnet-20240229": (3.00, 15.00),
+            "claude-3-opus-20240229": (15.00, 75.00),
+        },
+        "limits": {
+            "claude-3-haiku-20240307": {"max_concurrency": 8, "rpm": 50, "tpm": 50000},
+            "claude-3-sonnet-20240229": {"max_concurrency": 8, "rpm": 50, "tpm": 40000},
+            "claude-3-opus-20240229": {"max_concurrency": 4, "rpm": 50, "tpm": 20000},
+        },
+    },
+    # Offline provider with canned responses, for local runs and benchmarks
+    "fake": {
+        "models": ["fake-chat"],
+        "config": {"temperature": 0.0},
+        "json_models": ["fake-chat"],
+        "text_models": ["fake-chat"],
+        "context_windows": {"fake-chat": 128000},
+        "pricing": {"fake-chat": (0.0, 0.0)},
+        # No limits: benchmarks measure the service, not a simulated quota
     },
 }
 
+# Context window assumed for models without a declared one
+DEFAULT_CONTEXT_WINDOW = 8192
+
+
+def get_context_window(config: LlmConfig) -> int:
+    """
+    Get the context window size of a model, in tokens.
+
+    Args:
+        config: LLM configuration
+
+    Returns:
+        Maximum number of prompt + completion tokens for the model
+    """
+    provider = PROVIDERS.get(config.provider.lower(), {})
+    windows: Dict[str, int] = provider.get("context_windows", {})
+    return windows.get(config.model, DEFAULT_CONTEXT_WINDOW)
+
+
+def estimate_cost(
+    config: LlmConfig, prompt_tokens: int, completion_tokens: int
+) -> float:
+    """
+    Estimate the cost of an LLM call from the provider's list prices.
+
+    Args:
+        config: LLM configuration
+        prompt_tokens: Prompt tokens of the call
+        completion_tokens: Completion tokens of the call
+
+    Returns:
+        Cost in US dollars (0.0 for models without a declared price)
+    """
+    provider = PROVIDERS.get(config.provider.lower(), {})
+    pricing: Dict[str, Tuple[float, float]] = provider.get("pricing", {})
+    input_price, output_price = pricing.get(config.model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+
 
 def get_llm(config: LlmConfig) -> BaseChatModel:
     """
@@ -90,8 +195,9 @@ def get_llm(config: LlmConfig) -> BaseChatModel:
     if config.model not in PROVIDERS[provider]["models"]:
         raise ValueError(f"Unsupported model {config.model} for provider {provider}")
 
-    # Get base configuration for the provider
-    base_config = PROVIDERS[provider]["config"].copy()
+    # Get base configuration for the provider. Client-side retries are
+    # disabled: services.resilience owns retries, backoff and deadlines.
+    base_config = {"max_retries": 0, **PROVIDERS[provider]["config"]}
 
     # Override with user-specified configuration
     if config.temperature is not None:
@@ -127,6 +233,25 @@ def get_llm(config: LlmConfig) -> BaseChatModel:
                 **base_config,
             )
 
+        elif provider == "fake":
+            fake_config: Dict[str, Any] = {
+                "latency": settings.fake_llm_latency,
+                "tokens_per_second": settings.fake_llm_tokens_per_second,
+                "error_rate": settings.fake_llm_error_rate,
+                "response_tokens": settings.fake_llm_response_tokens,
+                "responses": FakeChatModel.load_responses(
+                    settings.fake_llm_responses_path
+                ),
+                "seed": settings.fake_llm_seed,
+            }
+            # model_kwargs override the settings (e.g. per-benchmark latency)
+            fake_config.update(config.model_kwargs or {})
+            return FakeChatModel(
+                model_name=config.model,
+                json_mode=config.response_format == "json_object",
+                **fake_config,
+            )
+
         elif provider == "claude":
             if not api_keys_config.anthropic_api_key:
                 raise RuntimeError("Anthropic API key is required but not configured")
@@ -145,6 +270,37 @@ def get_llm(config: LlmConfig) -> BaseChatModel:
         raise
 
 
+# Shared LLM clients keyed by LlmConfig.cache_key()
+_llm_cache: Dict[Tuple, BaseChatModel] = {}
+
+
+def get_shared_llm(config: LlmConfig) -> BaseChatModel:
+    """
+    Get an LLM instance shared by every caller with the same configuration.
+
+    Clients are created lazily on first use, so agents with identical
+    configurations reuse one client and its HTTP connection pool.
+
+    Args:
+        config: LLM configuration specifying provider, model, and parameters
+
+    Returns:
+        Shared language model instance
+    """
+    key = config.cache_key()
+    llm = _llm_cache.get(key)
+    if llm is None:
+        llm = get_llm(config)
+        _llm_cache[key] = llm
+        logger.debug(f"Created shared LLM client for {config.provider}/{config.model}")
+    return llm
+
+
+def clear_llm_cache() -> None:
+    """Drop all shared LLM clients."""
+    _llm_cache.clear()
+
+
 def get_default_config(provider: str = "openai", use_json: bool = False) -> LlmConfig:
     """
     Get default LLM configuration for a provider.
@@ -159,13 +315,13 @@ def get_default_config(provider: str = "openai", use_json: bool = False) -> LlmC
     if provider not in PROVIDERS:
         raise ValueError(f"Unsupported provider: {provider}")
 
-    if provider == "openai" and use_json:
+    if "json_models" in PROVIDERS[provider] and use_json:
         # Use GPT-4 for JSON responses
         default_model = PROVIDERS[provider]["json_models"][0]  # gpt-4
         response_format = "json_object"
     else:
         # Use cheaper models for text generation
-        if provider == "openai":
+        if "text_models" in PROVIDERS[provider]:
             default_model = PROVIDERS[provider]["text_models"][0]  # gpt-3.5-turbo
         else:
             default_model = PROVIDERS[provider]["models"][0]
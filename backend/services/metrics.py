@@ -0,0 +1,368 @@
+"""
+Metrics for DAVAI POC.
+
+In-process counters and histograms of LLM calls and workflow steps (latency,
+time to first token, token usage, estimated cost, retries), exported in the
+Prometheus text exposition format.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from config.llm_config import LlmConfig
+
+# Latency buckets in seconds, from cache hits to long document generations
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter of a label set."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines of every label set."""
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: bucket counts, sum of observations
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation for a label set."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines (buckets, sum and count) of every label set."""
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labels, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge:
+    """Gauge whose label sets and values are read at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...],
+        collect: Callable[[], Dict[LabelValues, float]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.collect = collect
+
+    def samples(self) -> Iterator[str]:
+        """Exposition lines of every label set returned by the collector."""
+        for key, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+_Metric = TypeVar("_Metric", Counter, Histogram, Gauge)
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Union[Counter, Histogram, Gauge]] = {}
+
+    def counter(
+        self, name: str, documentation: str, labels: Tuple[str, ...] = ()
+    ) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...],
+        collect: Callable[[], Dict[LabelValues, float]],
+    ) -> Gauge:
+        """Register a gauge read from a collector function at scrape time."""
+        return self._register(Gauge(name, documentation, labels, collect))
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+LLM_CALLS = registry.counter(
+    "davai_llm_calls_total",
+    "LLM calls by agent, model, source (live, cache, replay) and outcome.",
+    ("agent", "model", "source", "outcome"),
+)
+LLM_LATENCY = registry.histogram(
+    "davai_llm_call_duration_seconds",
+    "Wall-clock duration of LLM calls, retries included.",
+    ("agent", "model", "source"),
+)
+LLM_TTFT = registry.histogram(
+    "davai_llm_time_to_first_token_seconds",
+    "Time to the first streamed token of LLM calls.",
+    ("agent", "model", "source"),
+)
+LLM_TOKENS = registry.counter(
+    "davai_llm_tokens_total",
+    "Prompt and completion tokens of LLM calls.",
+    ("agent", "model", "kind"),
+)
+LLM_COST = registry.counter(
+    "davai_llm_cost_usd_total",
+    "Estimated cost of LLM calls in US dollars.",
+    ("agent", "model"),
+)
+LLM_RETRIES = registry.counter(
+    "davai_llm_retries_total",
+    "Retried LLM call attempts.",
+    ("agent", "model"),
+)
+STEP_DURATION = registry.histogram(
+    "davai_workflow_step_duration_seconds",
+    "Wall-clock duration of workflow steps that ran (restored steps excluded).",
+    ("step", "outcome"),
+)
+WORKFLOWS = registry.counter(
+    "davai_workflows_total", "Completed workflow runs by outcome.", ("outcome",)
+)
+WORKFLOW_DURATION = registry.histogram(
+    "davai_workflow_duration_seconds",
+    "Wall-clock duration of workflow runs.",
+    ("outcome",),
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0),
+)
+
+
+@dataclass
+class LlmCall:
+    """
+    Measurements of one LLM call made by an agent.
+
+    Attributes:
+        agent: Agent class name
+        model: Model label ("provider/model")
+        source: Where the response came from: "live", "cache", "replay" or
+            "coalesced" (shared with an identical call in flight)
+        started: time.perf_counter() value at the start of the call
+        duration: Wall-clock duration in seconds, retries included
+        ttft: Seconds until the first streamed token, if any was streamed
+        prompt_tokens: Prompt tokens, reported by the provider or estimated
+        completion_tokens: Completion tokens, reported or estimated
+        cost: Estimated cost in US dollars
+        retries: Retried attempts
+        success: Whether the call returned a response
+    """
+
+    agent: str
+    model: str
+    source: str = "live"
+    started: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    ttft: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    retries: int = 0
+    success: bool = True
+
+    def first_token(self) -> None:
+        """Record the time to first token, once."""
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def add_retry(self) -> None:
+        """Count a retried attempt."""
+        self.retries += 1
+
+
+@dataclass
+class LlmResult:
+    """
+    Response of an LLM request and what it consumed.
+
+    Attributes:
+        content: Response text
+        llm_config: Configuration of the model that produced the response,
+            the backup model's when a hedged backup request won
+        usage: Token usage reported by the provider for the response
+        retries: Retried attempts of a shared request (see services.coalescing)
+        ttft: Seconds from the start of a shared request to its first token
+    """
+
+    content: str
+    llm_config: LlmConfig
+    usage: Dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    ttft: Optional[float] = None
+
+
+# LLM calls of the current workflow step, if one is being instrumented
+_calls: ContextVar[Optional[List[LlmCall]]] = ContextVar("llm_calls", default=None)
+
+
+@contextmanager
+def collect_llm_calls() -> Iterator[List[LlmCall]]:
+    """Collect the LLM calls made in the current context into a list."""
+    calls: List[LlmCall] = []
+    token = _calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _calls.reset(token)
+
+
+def record_llm_call(call: LlmCall) -> None:
+    """
+    Record a finished LLM call in the metrics and the current collector.
+
+    Args:
+        call: Measured call
+    """
+    call.duration = time.perf_counter() - call.started
+    labels = {"agent": call.agent, "model": call.model}
+    LLM_CALLS.inc(
+        1, source=call.source, outcome="success" if call.success else "error", **labels
+    )
+    LLM_LATENCY.observe(call.duration, source=call.source, **labels)
+    if call.ttft is not None:
+        LLM_TTFT.observe(call.ttft, source=call.source, **labels)
+    if call.prompt_tokens:
+        LLM_TOKENS.inc(call.prompt_tokens, kind="prompt", **labels)
+    if call.completion_tokens:
+        LLM_TOKENS.inc(call.completion_tokens, kind="completion", **labels)
+    if call.cost:
+        LLM_COST.inc(call.cost, **labels)
+    if call.retries:
+        LLM_RETRIES.inc(call.retries, **labels)
+
+    calls = _calls.get()
+    if calls is not None:
+        calls.append(call)
+
+
+def summarize_llm_calls(calls: List[LlmCall]) -> Dict[str, Any]:
+    """
+    Aggregate the LLM calls of a workflow step into WorkflowStep fields.
+
+    Args:
+        calls: Calls made by the step
+
+    Returns:
+        model, ttft, prompt_tokens, completion_tokens, cost and retry_count
+        (empty if the step made no call)
+    """
+    if not calls:
+        return {}
+    first = calls[0]
+    return {
+        "model": first.model,
+        "ttft": first.ttft,
+        "prompt_tokens": sum(c.prompt_tokens for c in calls),
+        "completion_tokens": sum(c.completion_tokens for c in calls),
+        "cost": round(sum(c.cost for c in calls), 6),
+        "retry_count": sum(c.retries for c in calls),
+    }
+
+
+def observe_step(step_name: str, duration: float, success: bool) -> None:
+    """Record the duration of a workflow step that ran."""
+    STEP_DURATION.observe(duration, step=step_name, outcome=_outcome(success))
+
+
+def observe_workflow(duration: float, success: bool) -> None:
+    """Record a finished workflow run."""
+    WORKFLOWS.inc(outcome=_outcome(success))
+    WORKFLOW_DURATION.observe(duration, outcome=_outcome(success))
+
+
+def _outcome(success: bool) -> str:
+    return "success" if success else "failure"
@@ -0,0 +1,37 @@
+"""
+Orchestrator registry for DAVAI POC.
+
+Holds the app-scoped WorkflowOrchestrator so that every router shares a single
+set of agents and LLM clients instead of building its own at import time.
+"""
+
+from typing import Optional
+
+from services.llm_factory import clear_llm_cache
+from services.workflow_orchestrator import WorkflowOrchestrator
+from utils.logger import logger
+
+
+class OrchestratorRegistry:
+    """App-scoped registry of the shared workflow orchestrator."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry. The orchestrator is built on first use."""
+        self._orchestrator: Optional[WorkflowOrchestrator] = None
+
+    def get(self) -> WorkflowOrchestrator:
+        """
+        Get the shared workflow orchestrator, creating it on first access.
+
+        Returns:
+            Shared workflow orchestrator
+        """
+        if self._orchestrator is None:
+            logger.debug("Creating shared workflow orchestrator")
+            self._orchestrator = WorkflowOrchestrator()
+        return self._orchestrator
+
+    def close(self) -> None:
+        """Release the shared orchestrator and its LLM clients."""
+        self._orchestrator = None
+        clear_llm_cache()
@@ -0,0 +1,527 @@
+"""
+Project catalog for DAVAI POC.
+
+SQLite index of the saved projects' metadata, kept up to date whenever a
+metadata.json file is written. Listing, filtering, sorting and lookups by
+folder name or workflow id read the index instead of scanning the saved
+projects folder. Saved documents are also indexed for full-text search
+(FTS5). The index can always be rebuilt from the project folders.
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.document_store import read_documents
+from utils.logger import logger
+
+# Sortable columns, exposed as the "sort" parameter of the listing
+SORT_COLUMNS = ("generated_at", "project_idea", "status", "total_documents")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    folder_name TEXT PRIMARY KEY,
+    folder_path TEXT NOT NULL,
+    project_idea TEXT NOT NULL DEFAULT '',
+    generated_at TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    workflow_id TEXT,
+    total_documents INTEGER NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL,
+    accessed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_generated_at ON projects (generated_at);
+CREATE INDEX IF NOT EXISTS projects_status ON projects (status, generated_at);
+CREATE INDEX IF NOT EXISTS projects_workflow_id ON projects (workflow_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5 (
+    folder_name UNINDEXED,
+    doc_name UNINDEXED,
+    content,
+    tokenize = 'porter unicode61'
+);
+"""
+
+# Quoted phrases, or single terms with an optional trailing * for prefixes
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+_UPSERT = """
+INSERT INTO projects (
+    folder_name, folder_path, project_idea, generated_at, status, workflow_id,
+    total_documents, metadata
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (folder_name) DO UPDATE SET
+    folder_path = excluded.folder_path,
+    project_idea = excluded.project_idea,
+    generated_at = excluded.generated_at,
+    status = excluded.status,
+    workflow_id = excluded.workflow_id,
+    total_documents = excluded.total_documents,
+    metadata = excluded.metadata
+"""
+
+
+def _row(project_dir: Path, metadata: Dict[str, Any]) -> Tuple:
+    """Build the catalog row of a project folder from its metadata."""
+    return (
+        project_dir.name,
+        str(project_dir),
+        metadata.get("project_idea", ""),
+        metadata.get("generated_at", ""),
+        # Folders saved without a checkpoint carry no status
+        metadata.get("status", "completed"),
+        metadata.get("workflow_id"),
+        metadata.get("total_documents", len(metadata.get("document_list", []))),
+        json.dumps(metadata, ensure_ascii=False),
+    )
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn a search string into an FTS5 query matching all of its terms.
+
+    Terms and "quoted phrases" are matched literally (FTS5 operators and
+    punctuation have no special meaning); a trailing * matches a prefix.
+
+    Args:
+        text: Search string
+
+    Returns:
+        FTS5 query, empty if the string has no term
+    """
+    terms = []
+    for phrase, term in _SEARCH_TERM.findall(text):
+        prefix = not phrase and term.endswith("*")
+        words = (phrase or term.rstrip("*")).replace('"', " ").strip()
+        if words:
+            terms.append(f'"{words}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _project(folder_name: str, folder_path: str, metadata: str) -> Dict[str, Any]:
+    """Decode a catalog row into the project listing format."""
+    return {
+        **json.loads(metadata),
+        "folder_name": folder_name,
+        "folder_path": folder_path,
+    }
+
+
+class ProjectCatalog:
+    """SQLite index of saved project metadata."""
+
+    def __init__(self, db_path: Path, projects_dir: Path):
+        """
+        Initialize the catalog. The database is opened on first use.
+
+        Args:
+            db_path: SQLite database file
+            projects_dir: Directory holding the saved project folders
+        """
+        self.db_path = db_path
+        self.projects_dir = projects_dir
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection shared by the worker threads, used one at a time
+        self._lock = threading.Lock()
+        # New catalog whose documents are not indexed yet (see open)
+        self._unindexed = False
+
+    def open(self) -> None:
+        """Open the database, indexing the saved projects if it is new."""
+        with self._lock:
+            self._connect()
+            backfill, self._unindexed = self._unindexed, False
+        if backfill:
+            count = self.backfill_documents()
+            logger.info(f"Indexed the documents of {count} projects for search")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self, index_if_new: bool = True) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        is_new = not self.db_path.exists()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+        if "accessed_at" not in columns:
+            # Catalogs created before access times were tracked
+            conn.execute("ALTER TABLE projects ADD COLUMN accessed_at TEXT")
+        self._conn = conn
+        if is_new and index_if_new:
+            count = self._rebuild(conn, self._scan())
+            self._unindexed = True
+            logger.info(f"Created project catalog {self.db_path} ({count} projects)")
+        elif conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM projects) "
+            "AND NOT EXISTS (SELECT 1 FROM documents)"
+        ).fetchone()[0]:
+            # Catalog created before documents were indexed
+            logger.warning(
+                "Saved documents are not indexed for search yet, "
+                "run: python manage.py index-documents"
+            )
+        return conn
+
+    def rebuild(self) -> int:
+        """
+        Recreate the index from the project folders on disk.
+
+        The projects are indexed in one transaction, then their documents
+        one project at a time outside the lock (see backfill_documents), so
+        searches and saves keep going during the rebuild.
+
+        Returns:
+            Number of indexed projects
+        """
+        rows = self._scan()
+        with self._lock:
+            count = self._rebuild(self._connect(index_if_new=False), rows)
+        self.backfill_documents(reindex=True)
+        return count
+
+    def _scan(self) -> List[Tuple]:
+        rows = []
+        if self.projects_dir.exists():
+            for metadata_file in self.projects_dir.glob("*/metadata.json"):
+                try:
+                    with open(metadata_file, "r", encoding="utf-8") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(
+                        f"Could not read project {metadata_file.parent}: {e}"
+                    )
+                    continue
+                rows.append(_row(metadata_file.parent, metadata))
+        return rows
+
+    def _rebuild(self, conn: sqlite3.Connection, rows: List[Tuple]) -> int:
+        with conn:
+            # Stale rows only, so the access times of the others are kept
+            indexed = {row[0] for row in rows}
+            conn.executemany(
+                "DELETE FROM projects WHERE folder_name = ?",
+                [
+                    (name,)
+                    for (name,) in conn.execute("SELECT folder_name FROM projects")
+                    if name not in indexed
+                ],
+            )
+            conn.executemany(_UPSERT, rows)
+            conn.execute(
+                "DELETE FROM documents WHERE folder_name NOT IN "
+                "(SELECT folder_name FROM projects)"
+            )
+        return len(rows)
+
+    def index_documents(self, folder_name: str, documents: Dict[str, str]) -> None:
+        """
+        Replace the full-text index of a project's documents.
+
+        Args:
+            folder_name: Project folder name
+            documents: Document contents by file name
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "DELETE FROM documents WHERE folder_name = ?", (folder_name,)
+                )
+                conn.executemany(
+                    "INSERT INTO documents (folder_name, doc_name, content) "
+                    "VALUES (?, ?, ?)",
+                    [(folder_name, name, text) for name, text in documents.items()],
+                )
+
+    def backfill_documents(self, reindex: bool = False) -> int:
+        """
+        Index the documents of cataloged projects missing from the full-text index.
+
+        Folders are read one at a time outside the lock, so searches and
+        saves keep going while a large archive is indexed.
+
+        Args:
+            reindex: Reindex the documents of every project
+
+        Returns:
+            Number of projects whose documents were indexed
+        """
+        missing = (
+            ""
+            if reindex
+            else ("WHERE folder_name NOT IN (SELECT folder_name FROM documents)")
+        )
+        with self._lock:
+            projects = (
+                self._connect()
+                .execute(
+                    f"SELECT folder_name, folder_path, metadata FROM projects {missing}"
+                )
+                .fetchall()
+            )
+
+        indexed = 0
+        for folder_name, folder_path, metadata in projects:
+            try:
+                documents = read_documents(Path(folder_path), json.loads(metadata))
+            except OSError as e:
+                logger.warning(f"Could not read documents of {folder_name}: {e}")
+                continue
+            self.index_documents(folder_name, documents)
+            indexed += 1
+        return indexed
+
+    def upsert(self, project_dir: Path, metadata: Dict[str, Any]) -> None:
+        """
+        Index or update a project folder.
+
+        Args:
+            project_dir: Project folder
+            metadata: Content of the folder's metadata.json
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(_UPSERT, _row(project_dir, metadata))
+
+    def remove(self, folder_name: str) -> None:
+        """Drop a project folder from the index."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "DELETE FROM projects WHERE folder_name = ?", (folder_name,)
+                )
+                conn.execute(
+                    "DELETE FROM documents WHERE folder_name = ?", (folder_name,)
+                )
+
+    def touch(self, folder_name: str) -> None:
+        """Record an access to a project (see access_times)."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE projects SET accessed_at = ? WHERE folder_name = ?",
+                    (datetime.now().isoformat(), folder_name),
+                )
+
+    def access_times(self) -> Dict[str, str]:
+        """
+        Get the last access time of the projects read since they were indexed.
+
+        Returns:
+            ISO timestamps by folder name
+        """
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT folder_name, accessed_at FROM projects "
+                    "WHERE accessed_at IS NOT NULL"
+                )
+                .fetchall()
+            )
+        return dict(rows)
+
+    def get(self, folder_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a project by folder name.
+
+        Args:
+            folder_name: Project folder name
+
+        Returns:
+            Project metadata with folder_name and folder_path, or None
+        """
+        return self._get("folder_name", folder_name)
+
+    def find_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the project folder of a workflow run.
+
+        Args:
+            workflow_id: Workflow identifier
+
+        Returns:
+            Project metadata with folder_name and folder_path, or None
+        """
+        return self._get("workflow_id", workflow_id)
+
+    def _get(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT folder_name, folder_path, metadata FROM projects "
+                    f"WHERE {column} = ?",
+                    (value,),
+                )
+                .fetchone()
+            )
+        return _project(*row) if row else None
+
+    def list(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "generated_at",
+        descending: bool = True,
+        status: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        List a page of projects.
+
+        Args:
+            offset: Number of projects to skip
+            limit: Maximum number of projects returned
+            sort: Sort column, one of SORT_COLUMNS
+            descending: Sort newest/largest first
+            status: Only list projects with this status
+            query: Only list projects whose idea contains this text
+                (case-insensitive)
+
+        Returns:
+            Number of matching projects and the requested page
+
+        Raises:
+            ValueError: If the sort column is unknown
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if query:
+            clauses.append("project_idea LIKE ? ESCAPE '\\'")
+            escaped = (
+                query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            params.append(f"%{escaped}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if descending else "ASC"
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM projects {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT folder_name, folder_path, metadata FROM projects "
+                f"{where} ORDER BY {sort} {order}, folder_name {order} "
+                "LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return total, [_project(*row) for row in rows]
+
+    def search(
+        self,
+        query: str,
+        doc_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Search the saved documents, best matches first (BM25 ranking).
+
+        Args:
+            query: Search string (see fts_query)
+            doc_name: Only search documents with this file name
+            offset: Number of results to skip
+            limit: Maximum number of results returned
+
+        Returns:
+            Number of matching documents and the requested page of results,
+            each with the project, document name, score and a snippet with
+            the matched terms in **bold**
+        """
+        match = fts_query(query)
+        if not match:
+            return 0, []
+
+        where, params = "documents MATCH ?", [match]
+        if doc_name:
+            where += " AND doc_name = ?"
+            params.append(doc_name)
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM documents WHERE {where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT d.folder_name, d.doc_name, p.project_idea, "
+                "snippet(documents, 2, '**', '**', ' … ', 24), bm25(documents) "
+                f"FROM documents d LEFT JOIN projects p USING (folder_name) "
+                f"WHERE {where} ORDER BY bm25(documents) LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return total, [
+            {
+                "folder_name": folder_name,
+                "document": document,
+                "project_idea": project_idea,
+                "snippet": snippet,
+                "score": round(-rank, 4),
+            }
+            for folder_name, document, project_idea, snippet, rank in rows
+        ]
+
+    async def record_documents(
+        self, project_dir: Path, documents: Dict[str, str]
+    ) -> None:
+        """
+        Index the saved documents of a project without blocking the event loop.
+
+        Errors are logged, never raised (see record).
+
+        Args:
+            project_dir: Project folder
+            documents: Document contents by file name
+        """
+        try:
+            await asyncio.to_thread(self.index_documents, project_dir.name, documents)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index documents of {project_dir.name}: {e}")
+
+    async def record(self, project_dir: Path, metadata: Dict[str, Any]) -> None:
+        """
+        Index or update a project folder without blocking the event loop.
+
+        Catalog errors are logged, never raised: the metadata file on disk
+        stays the source of truth and a rebuild recovers the index.
+
+        Args:
+            project_dir: Project folder
+            metadata: Content of the folder's metadata.json
+        """
+        try:
+            await asyncio.to_thread(self.upsert, project_dir, metadata)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index project {project_dir.name}: {e}")
+
+
+# Global project catalog instance
+project_catalog = ProjectCatalog(
+    db_path=settings.project_catalog_path
+    or settings.temp_storage_path / "projects.sqlite3",
+    projects_dir=settings.temp_storage_path / "generated_docs",
+)
@@ -0,0 +1,327 @@
+"""
+Project export for DAVAI POC.
+
+Packs saved project folders into ZIP or tar.gz archives. Files are copied
+from disk in fixed-size chunks, so memory use does not grow with the size of
+the projects. Single-project archives are cached on disk under a content
+ETag so they can be served with Range and conditional requests; multi-project
+archives are streamed while they are written, each by a thread of its own so
+that slow downloads never hold the threads of the default executor.
+"""
+
+import asyncio
+import hashlib
+import io
+import shutil
+import tarfile
+import json
+import threading
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from config.settings import settings
+from services.document_store import blob_store
+from utils.logger import logger
+from utils.tracing import start_span
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+
+# Archive formats: media type and file extension
+ARCHIVE_FORMATS = {
+    "zip": ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+
+CHUNK_SIZE = 64 * 1024
+# Chunks buffered between the archive writer thread and the response
+_STREAM_BUFFER = 8
+
+
+class _StreamCancelled(Exception):
+    """Raised in the writer thread when the client stopped reading."""
+
+
+class _QueueWriter(io.RawIOBase):
+    """
+    Write-only, non-seekable file handing fixed-size chunks to an event loop.
+
+    Chunks go to an asyncio queue through the loop's thread-safe callbacks.
+    The writer takes a credit per chunk and the reader gives it back once
+    the chunk is sent, so at most _STREAM_BUFFER chunks are buffered.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        chunks: "asyncio.Queue[Optional[bytes]]",
+        credits: threading.Semaphore,
+        cancelled: threading.Event,
+    ):
+        self._loop = loop
+        self._chunks = chunks
+        self._credits = credits
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: "ReadableBuffer") -> int:
+        self._buffer += data
+        while len(self._buffer) >= CHUNK_SIZE:
+            self._put(bytes(self._buffer[:CHUNK_SIZE]))
+            del self._buffer[:CHUNK_SIZE]
+        return memoryview(data).nbytes
+
+    def finish(self) -> None:
+        """Hand over the last partial chunk and the end-of-stream marker."""
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        self._put(None)
+
+    def _put(self, chunk: Optional[bytes]) -> None:
+        # Blocks while the buffer is full, unless the client went away
+        while not self._cancelled.is_set():
+            if self._credits.acquire(timeout=0.1):
+                self._loop.call_soon_threadsafe(self._chunks.put_nowait, chunk)
+                return
+        raise _StreamCancelled()
+
+
+def _project_files(project_dir: Path) -> List[Path]:
+    """Exported files of a project folder (temporary files excluded)."""
+    return sorted(
+        path
+        for path in project_dir.iterdir()
+        if path.is_file() and not path.name.startswith(".")
+    )
+
+
+def _stored_documents(
+    project_dir: Path, files: List[Path]
+) -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Documents of a project folder kept in the blob store.
+
+    Returns:
+        Filename, manifest entry and modification time of every document of
+        the folder's manifest that has no file of its own
+    """
+    metadata_file = project_dir / "metadata.json"
+    if not metadata_file.exists():
+        return []
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f).get("documents") or {}
+    on_disk = {path.name for path in files}
+    mtime = metadata_file.stat().st_mtime
+    return [
+        (name, entry, mtime)
+        for name, entry in sorted(manifest.items())
+        if name not in on_disk
+    ]
+
+
+def write_archive(
+    fileobj: Union[IO[bytes], io.RawIOBase], project_dirs: List[Path], fmt: str
+) -> None:
+    """
+    Write project folders into an archive, one top-level folder per project.
+
+    Documents kept in the blob store are written as markdown files, so the
+    archive has the same content whatever the storage layout.
+
+    Args:
+        fileobj: Binary file to write to (need not be seekable)
+        project_dirs: Project folders
+        fmt: Archive format, a key of ARCHIVE_FORMATS
+    """
+    if fmt == "zip":
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+            for project_dir in project_dirs:
+                files = _project_files(project_dir)
+                for path in files:
+                    file_info = zipfile.ZipInfo.from_file(
+                        path, f"{project_dir.name}/{path.name}"
+                    )
+                    file_info.compress_type = zipfile.ZIP_DEFLATED
+                    with (
+                        open(path, "rb") as src,
+                        archive.open(file_info, "w") as dst,
+                    ):
+                        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                for name, entry, mtime in _stored_documents(project_dir, files):
+                    zip_info = zipfile.ZipInfo(
+                        f"{project_dir.name}/{name}", time.localtime(mtime)[:6]
+                    )
+                    zip_info.compress_type = zipfile.ZIP_DEFLATED
+                    with (
+                        blob_store.open(entry["sha256"]) as src,
+                        archive.open(zip_info, "w") as dst,
+                    ):
+                        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    elif fmt == "tar.gz":
+        with tarfile.open(fileobj=fileobj, mode="w|gz") as archive:
+            for project_dir in project_dirs:
+                files = _project_files(project_dir)
+                for path in files:
+                    archive.add(path, f"{project_dir.name}/{path.name}")
+                for name, entry, mtime in _stored_documents(project_dir, files):
+                    tar_info = tarfile.TarInfo(f"{project_dir.name}/{name}")
+                    tar_info.size = entry["size"]
+                    tar_info.mtime = mtime
+                    tar_info.mode = 0o644
+                    with blob_store.open(entry["sha256"]) as src:
+                        archive.addfile(tar_info, src)
+    else:
+        raise ValueError(f"Unknown archive format: {fmt}")
+
+
+class ProjectExporter:
+    """Builds cached single-project archives and streams multi-project ones."""
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the exporter.
+
+        Args:
+            cache_dir: Directory holding the cached single-project archives
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def _etag(project_dir: Path, fmt: str) -> str:
+        digest = hashlib.sha256(fmt.encode())
+        for path in _project_files(project_dir):
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    async def etag(self, project_dir: Path, fmt: str) -> str:
+        """
+        Get the ETag of a project's archive.
+
+        It only depends on the names, sizes and modification times of the
+        project files, so it is computed without reading them.
+
+        Args:
+            project_dir: Project folder
+            fmt: Archive format
+
+        Returns:
+            Quoted ETag
+        """
+        return await asyncio.to_thread(self._etag, project_dir, fmt)
+
+    async def archive(self, project_dir: Path, fmt: str, etag: str) -> Path:
+        """
+        Get the cached archive of a project, building it if needed.
+
+        Args:
+            project_dir: Project folder
+            fmt: Archive format
+            etag: Current ETag of the archive (see etag)
+
+        Returns:
+            Path of the archive file
+        """
+        extension = ARCHIVE_FORMATS[fmt][1]
+        version = etag.strip('"')
+        path = self.cache_dir / f"{project_dir.name}-{version}{extension}"
+        if await asyncio.to_thread(path.exists):
+            return path
+        with start_span("project.export", {"export.format": fmt, "export.projects": 1}):
+            await asyncio.to_thread(self._build, project_dir, fmt, path)
+        return path
+
+    def _build(self, project_dir: Path, fmt: str, path: Path) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                write_archive(f, [project_dir], fmt)
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        # Drop the archives of older versions of the project
+        extension = ARCHIVE_FORMATS[fmt][1]
+        for stale in self.cache_dir.glob(f"{project_dir.name}-*{extension}"):
+            # Same length: only this project's versions, not similar names
+            if stale != path and len(stale.name) == len(path.name):
+                stale.unlink(missing_ok=True)
+        logger.info(f"Exported {project_dir.name} to {path}")
+
+    async def stream(self, project_dirs: List[Path], fmt: str) -> AsyncIterator[bytes]:
+        """
+        Stream an archive of several projects while it is being written.
+
+        The archive is written by a dedicated thread into a small bounded
+        buffer, so memory use stays constant and a slow client slows the
+        writer down without holding a thread of the default executor. The
+        writer stops when the client disconnects.
+
+        Args:
+            project_dirs: Project folders
+            fmt: Archive format
+
+        Yields:
+            Archive chunks
+        """
+        loop = asyncio.get_running_loop()
+        chunks: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        credits = threading.Semaphore(_STREAM_BUFFER)
+        cancelled = threading.Event()
+        finished = asyncio.Event()
+        failure: List[BaseException] = []
+
+        def produce() -> None:
+            writer = _QueueWriter(loop, chunks, credits, cancelled)
+            try:
+                write_archive(writer, project_dirs, fmt)
+            except BaseException as e:
+                failure.append(e)
+            try:
+                writer.finish()
+            except _StreamCancelled:
+                pass
+            finally:
+                loop.call_soon_threadsafe(finished.set)
+
+        with start_span(
+            "project.export",
+            {"export.format": fmt, "export.projects": len(project_dirs)},
+        ):
+            threading.Thread(target=produce, name="project-export", daemon=True).start()
+            try:
+                while True:
+                    chunk = await chunks.get()
+                    credits.release()
+                    if chunk is None:
+                        break
+                    yield chunk
+                if failure and not isinstance(failure[0], _StreamCancelled):
+                    raise failure[0]
+            finally:
+                # The writer gives up within its credit timeout
+                cancelled.set()
+                await finished.wait()
+
+
+# Global project exporter instance
+project_exporter = ProjectExporter(cache_dir=settings.temp_storage_path / "exports")
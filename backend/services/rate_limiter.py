@@ -0,0 +1,525 @@
+"""
+LLM rate limiting for DAVAI POC.
+
+Schedules the LLM requests of every provider and model: a concurrency limit,
+request and token buckets refilled at the model's requests and tokens per
+minute (RPM/TPM), and a queue of the requests waiting for them, served by
+priority then in arrival order. Limits are declared per model in
+llm_factory.PROVIDERS and adapt to the provider's rate-limit headers and to
+429 responses.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from config.llm_config import LlmConfig
+from config.settings import settings
+from services.llm_factory import PROVIDERS
+from services.metrics import registry
+from utils.logger import logger
+
+QUEUE_POLICIES = ("priority", "fifo")
+
+# Queue priorities of LLM requests: lower values are served first
+PRIORITIES = {"interactive": 0, "background": 10}
+
+# Pause after a 429 response without a Retry-After header, in seconds
+DEFAULT_RATE_LIMIT_PAUSE = 1.0
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default="interactive")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+QUEUE_WAIT = registry.histogram(
+    "davai_llm_queue_wait_seconds",
+    "Time LLM requests waited for a concurrency slot and rate limit budget.",
+    ("model", "priority"),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+RATE_LIMITED = registry.counter(
+    "davai_llm_rate_limited_total",
+    "LLM requests rejected by the provider with a 429 status.",
+    ("model",),
+)
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """
+    Set the queue priority of the LLM requests made in the current context.
+
+    Args:
+        priority: "interactive" (default) or "background"
+
+    Raises:
+        ValueError: If the priority is unknown
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """
+    Rate limits of a provider or model (0 disables a limit).
+
+    Attributes:
+        max_concurrency: Requests in flight at once.
+        rpm: Requests per minute.
+        tpm: Prompt and completion tokens per minute.
+    """
+
+    max_concurrency: int = 0
+    rpm: int = 0
+    tpm: int = 0
+
+    def merged(self, overrides: Optional[Dict[str, Any]]) -> "RateLimits":
+        """Get a copy of the limits with the given fields overridden."""
+        if not overrides:
+            return self
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            logger.warning(f"Ignoring unknown rate limit settings: {sorted(unknown)}")
+        return replace(
+            self,
+            **{
+                k: type(getattr(self, k))(v) for k, v in overrides.items() if k in known
+            },
+        )
+
+
+class TokenBucket:
+    """Bucket refilled continuously at a per-minute rate, starting full."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute: Refill rate and capacity (0 means unlimited)
+        """
+        self.rate = float(per_minute)
+        self.level = self.rate
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until the bucket holds the given amount."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # Requests larger than the bucket wait for a full bucket
+        missing = min(amount, self.rate) - self.level
+        return max(missing, 0.0) * 60 / self.rate
+
+    def take(self, amount: float) -> None:
+        """Consume an amount; the level goes negative when overdrawn."""
+        if self.rate:
+            self.level -= amount
+
+    def give(self, amount: float) -> None:
+        """Return an amount consumed but not used."""
+        if self.rate:
+            self.level = min(self.level + amount, self.rate)
+
+    def set_rate(self, per_minute: float) -> None:
+        """Change the refill rate and capacity."""
+        self._refill(time.monotonic())
+        # An unlimited bucket has no level yet: it starts full
+        self.level = min(self.level, per_minute) if self.rate else float(per_minute)
+        self.rate = float(per_minute)
+
+    def cap(self, remaining: float) -> None:
+        """Lower the level to the budget the provider says remains."""
+        if self.rate:
+            self._refill(time.monotonic())
+            self.level = min(self.level, remaining)
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.level + (now - self.updated) * self.rate / 60, self.rate)
+        self.updated = now
+
+
+class _Ticket:
+    """A request waiting in a model's queue."""
+
+    def __init__(self, tokens: float, future: asyncio.Future):
+        self.tokens = tokens
+        self.future = future
+
+
+class ModelLimiter:
+    """Concurrency limit, rate limit buckets and queue of one model's requests."""
+
+    def __init__(self, name: str, limits: RateLimits, policy: str = "priority"):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Model label used in logs and metrics ("provider/model")
+            limits: Configured rate limits
+            policy: Queue order, "priority" or "fifo"
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown LLM queue policy: {policy}")
+        self.name = name
+        self.limits = limits
+        self.policy = policy
+        self.requests = TokenBucket(limits.rpm)
+        self.tokens = TokenBucket(limits.tpm)
+        # Concurrency limit, lowered after 429s and raised back on successes
+        self.ceiling = float(limits.max_concurrency or math.inf)
+        self.active = 0
+        self.paused_until = 0.0
+        self._queue: List[Tuple[int, int, _Ticket]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Running mean of completion tokens, reserved with every prompt
+        self._completion_tokens = 0.0
+        self._counters = {
+            "requests": 0,
+            "queued": 0,
+            "rate_limited": 0,
+            "queue_wait_seconds": 0.0,
+        }
+
+    @asynccontextmanager
+    async def slot(
+        self, prompt_tokens: int, usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold a request slot of the model for the duration of one attempt.
+
+        Waits in the model's queue until a concurrency slot is free and the
+        buckets hold one request and the estimated tokens (prompt plus the
+        mean completion). The token reservation is settled with the usage
+        reported by the provider, and a 429 error throttles the model.
+
+        Args:
+            prompt_tokens: Estimated prompt tokens of the request
+            usage: Optional dict receiving the token usage reported by the
+                provider during the attempt
+
+        Yields:
+            Once the request may be sent
+        """
+        reserved = prompt_tokens + round(self._completion_tokens)
+        await self._acquire(reserved)
+        before = dict(usage or {})
+        try:
+            yield
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                self.throttle(e)
+            raise
+        else:
+            # Additive increase back to the configured concurrency
+            self.ceiling = min(
+                self.ceiling + 1 / self.ceiling,
+                self.limits.max_concurrency or math.inf,
+            )
+        finally:
+            self.active -= 1
+            self._settle(reserved, before, usage)
+            self._dispatch()
+
+    def throttle(self, error: BaseException) -> None:
+        """
+        Back off after a 429 response.
+
+        The queue pauses for the Retry-After delay, both buckets are emptied
+        and the concurrency limit is halved.
+
+        Args:
+            error: Rate limit error raised by the provider
+        """
+        self._counters["rate_limited"] += 1
+        RATE_LIMITED.inc(model=self.name)
+        headers = _error_headers(error)
+        self.observe_headers(headers)
+        delay = _retry_after(headers)
+        if delay is None:
+            delay = DEFAULT_RATE_LIMIT_PAUSE
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.requests.cap(0)
+        self.tokens.cap(0)
+        self.ceiling = max(1.0, min(self.ceiling, self.active) / 2)
+        logger.warning(
+            f"Rate limited by {self.name}: pausing {delay:.1f}s, "
+            f"concurrency limit {self.ceiling:.1f}"
+        )
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Adapt the buckets to the rate-limit headers of a provider response.
+
+        Provider limits lower than the configured ones replace them, the
+        remaining budgets cap the buckets and an exhausted budget pauses the
+        queue until it resets. OpenAI ("x-ratelimit-*") and Anthropic
+        ("anthropic-ratelimit-*") headers are understood.
+
+        Args:
+            headers: Response headers
+        """
+        if not headers:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+        for kind, bucket, configured in (
+            ("requests", self.requests, self.limits.rpm),
+            ("tokens", self.tokens, self.limits.tpm),
+        ):
+            limit = _number(
+                headers.get(f"x-ratelimit-limit-{kind}")
+                or headers.get(f"anthropic-ratelimit-{kind}-limit")
+            )
+            remaining = _number(
+                headers.get(f"x-ratelimit-remaining-{kind}")
+                or headers.get(f"anthropic-ratelimit-{kind}-remaining")
+            )
+            reset = _reset_delay(
+                headers.get(f"x-ratelimit-reset-{kind}")
+                or headers.get(f"anthropic-ratelimit-{kind}-reset")
+            )
+            if (
+                limit
+                and limit != bucket.rate
+                and (not configured or limit < configured)
+            ):
+                bucket.set_rate(limit)
+            if remaining is not None:
+                bucket.cap(remaining)
+                if remaining < 1 and reset:
+                    self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+    def queued(self) -> int:
+        """Number of requests waiting in the queue."""
+        return sum(1 for _, _, ticket in self._queue if not ticket.future.done())
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters, current limits and queue state."""
+        return {
+            **self._counters,
+            "active": self.active,
+            "waiting": self.queued(),
+            "max_concurrency": (
+                None if math.isinf(self.ceiling) else math.floor(self.ceiling)
+            ),
+            "rpm": self.requests.rate or None,
+            "tpm": self.tokens.rate or None,
+            "paused_for": round(max(self.paused_until - time.monotonic(), 0.0), 3),
+        }
+
+    async def _acquire(self, tokens: float) -> None:
+        """Wait for a slot and the rate limit budget of a request."""
+        self._counters["requests"] += 1
+        priority = _priority.get()
+        enqueued = time.monotonic()
+        if not self._queue and not self._wait_time(tokens, enqueued) and self._free():
+            self._grant(tokens)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            rank = PRIORITIES[priority] if self.policy == "priority" else 0
+            ticket = _Ticket(tokens, future)
+            heapq.heappush(self._queue, (rank, next(self._sequence), ticket))
+            self._counters["queued"] += 1
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # Granted just as the caller was cancelled: hand it back
+                    self.active -= 1
+                    self.requests.give(1)
+                    self.tokens.give(tokens)
+                    self._dispatch()
+                raise
+        waited = time.monotonic() - enqueued
+        self._counters["queue_wait_seconds"] += waited
+        QUEUE_WAIT.observe(waited, model=self.name, priority=priority)
+
+    def _dispatch(self) -> None:
+        """Grant queued requests in order while slots and budget allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            ticket = self._queue[0][2]
+            if ticket.future.done():
+                heapq.heappop(self._queue)  # Cancelled while waiting
+                continue
+            if not self._free():
+                return  # Dispatched again when a slot is released
+            wait = self._wait_time(ticket.tokens, time.monotonic())
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    wait, self._dispatch
+                )
+                return
+            heapq.heappop(self._queue)
+            self._grant(ticket.tokens)
+            ticket.future.set_result(None)
+
+    def _free(self) -> bool:
+        if math.isinf(self.ceiling):
+            return True
+        return self.active < max(1, math.floor(self.ceiling))
+
+    def _wait_time(self, tokens: float, now: float) -> float:
+        return max(
+            self.paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            0.0,
+        )
+
+    def _grant(self, tokens: float) -> None:
+        self.active += 1
+        self.requests.take(1)
+        self.tokens.take(tokens)
+
+    def _settle(
+        self, reserved: float, before: Dict[str, int], usage: Optional[Dict[str, int]]
+    ) -> None:
+        """Replace a request's token reservation by its reported usage."""
+        if usage is None:
+            return
+        prompt = usage.get("input_tokens", 0) - before.get("input_tokens", 0)
+        completion = usage.get("output_tokens", 0) - before.get("output_tokens", 0)
+        if not prompt and not completion:
+            return  # Nothing reported: the estimate stands
+        self.tokens.give(reserved - prompt - completion)
+        self._completion_tokens += 0.2 * (completion - self._completion_tokens)
+
+
+def _error_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """Response headers of a provider error, if any."""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    if not headers:
+        return None
+    return _number(headers.get("retry-after") or headers.get("Retry-After"))
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _reset_delay(value: Optional[str]) -> Optional[float]:
+    """Seconds until a budget resets: "1m30s" / "20ms" durations or RFC 3339 times."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        return max(datetime.fromisoformat(value).timestamp() - time.time(), 0.0)
+    except ValueError:
+        return None
+
+
+# Limiters keyed by (provider, model)
+_limiters: Dict[Tuple[str, str], ModelLimiter] = {}
+
+registry.gauge(
+    "davai_llm_queued_requests",
+    "LLM requests waiting for a concurrency slot or rate limit budget.",
+    ("model",),
+    lambda: {
+        (limiter.name,): float(limiter.queued()) for limiter in _limiters.values()
+    },
+)
+registry.gauge(
+    "davai_llm_active_requests",
+    "LLM requests holding a concurrency slot.",
+    ("model",),
+    lambda: {(limiter.name,): float(limiter.active) for limiter in _limiters.values()},
+)
+
+
+def resolve_limits(provider: str, model: str) -> RateLimits:
+    """
+    Resolve the rate limits of a model.
+
+    Settings defaults are overridden by the model's entry under "limits" in
+    llm_factory.PROVIDERS, then by LLM_LIMIT_OVERRIDES entries keyed by
+    provider and by "provider/model".
+
+    Args:
+        provider: Provider name
+        model: Model name
+
+    Returns:
+        Rate limits
+    """
+    limits = RateLimits(
+        max_concurrency=settings.llm_max_concurrency,
+        rpm=settings.llm_rpm,
+        tpm=settings.llm_tpm,
+    )
+    limits = limits.merged(PROVIDERS.get(provider, {}).get("limits", {}).get(model))
+    overrides = settings.llm_limit_overrides
+    limits = limits.merged(overrides.get(provider))
+    return limits.merged(overrides.get(f"{provider}/{model}"))
+
+
+def get_limiter(config: LlmConfig) -> ModelLimiter:
+    """
+    Get the limiter shared by all calls to a model.
+
+    Args:
+        config: LLM configuration
+
+    Returns:
+        Limiter of the configuration's provider and model
+    """
+    provider = config.provider.lower()
+    key = (provider, config.model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = ModelLimiter(
+            f"{provider}/{config.model}",
+            resolve_limits(provider, config.model),
+            settings.llm_queue_policy,
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Get queue, concurrency and rate limit metrics of every model."""
+    return {limiter.name: limiter.stats() for limiter in _limiters.values()}
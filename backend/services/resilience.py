@@ -0,0 +1,365 @@
+"""
+LLM call resilience for DAVAI POC.
+
+Wraps every LLM call in a per-call deadline, retries retryable errors with
+jittered exponential backoff and fails fast through a per-model circuit
+breaker while a provider is unhealthy.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, fields, replace
+from typing import (
+    Any,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from config.llm_config import LlmConfig
+from config.settings import settings
+from services.llm_factory import PROVIDERS
+from services.metrics import registry
+from utils.logger import logger
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the model's circuit is open."""
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """
+    Resilience settings of a provider or model.
+
+    Attributes:
+        timeout: Deadline of a single attempt in seconds (0 disables it).
+        max_retries: Retries after the first attempt.
+        backoff_base: Delay before the first retry, doubled on every retry.
+        backoff_max: Upper bound of the retry delay.
+        failure_threshold: Consecutive failures opening the circuit.
+        reset_timeout: Seconds the circuit stays open before a trial call.
+    """
+
+    timeout: float = 120.0
+    max_retries: int = 3
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    def merged(self, overrides: Optional[Dict[str, Any]]) -> "ResiliencePolicy":
+        """Get a copy of the policy with the given fields overridden."""
+        if not overrides:
+            return self
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            logger.warning(f"Ignoring unknown resilience settings: {sorted(unknown)}")
+        return replace(
+            self,
+            **{
+                k: type(getattr(self, k))(v) for k, v in overrides.items() if k in known
+            },
+        )
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures opening the circuit
+            reset_timeout: Seconds before an open circuit lets a trial call through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through now."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            # A single trial call decides whether the circuit closes again
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """
+        Record a failed call.
+
+        Returns:
+            True if the failure opened the circuit
+        """
+        self.failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            opened = self.state != self.OPEN
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return opened
+        return False
+
+    def release(self) -> None:
+        """Release a trial call that ended without a verdict (e.g. cancelled)."""
+        self._trial_running = False
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an LLM call error is transient and worth retrying.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True for timeouts, connection errors, rate limits and server errors
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # openai / anthropic connection and timeout errors
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Delay requested by the provider through a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelResilience:
+    """Deadline, retry and circuit breaker policy applied to one model's calls."""
+
+    def __init__(self, name: str, policy: ResiliencePolicy):
+        """
+        Initialize the policy layer.
+
+        Args:
+            name: Model label used in logs and metrics ("provider/model")
+            policy: Resilience settings
+        """
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self._counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "short_circuits": 0,
+            "circuit_opens": 0,
+        }
+
+    async def call(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        can_retry: Optional[Callable[[], bool]] = None,
+        on_retry: Optional[Callable[[], None]] = None,
+        gate: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+    ) -> T:
+        """
+        Run an LLM call under the policy.
+
+        Args:
+            operation: Coroutine factory performing one attempt
+            can_retry: Optional predicate vetoing retries (e.g. once streamed
+                tokens have been forwarded)
+            on_retry: Optional callback run before every retry
+            gate: Optional context manager factory entered around every
+                attempt, outside its deadline (e.g. a rate limiter slot)
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: The last error once retries are exhausted or if the
+                error is not retryable
+        """
+        self._counters["calls"] += 1
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._counters["short_circuits"] += 1
+                raise CircuitOpenError(
+                    f"Circuit open for {self.name}, failing fast "
+                    f"(retry in {self.policy.reset_timeout:.0f}s)"
+                )
+
+            try:
+                async with gate() if gate is not None else nullcontext():
+                    if self.policy.timeout:
+                        result = await asyncio.wait_for(
+                            operation(), self.policy.timeout
+                        )
+                    else:
+                        result = await operation()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                if isinstance(e, asyncio.TimeoutError):
+                    self._counters["timeouts"] += 1
+                    e = asyncio.TimeoutError(
+                        f"LLM call to {self.name} exceeded {self.policy.timeout}s"
+                    )
+                if retryable and self.breaker.record_failure():
+                    self._counters["circuit_opens"] += 1
+                    logger.warning(f"Circuit opened for {self.name}")
+                elif not retryable:
+                    # Bad requests say nothing about provider health
+                    self.breaker.release()
+
+                if (
+                    not retryable
+                    or attempt >= self.policy.max_retries
+                    or (can_retry is not None and not can_retry())
+                ):
+                    self._counters["failures"] += 1
+                    raise e
+
+                delay = self._backoff(attempt, _retry_after(e))
+                attempt += 1
+                self._counters["retries"] += 1
+                if on_retry is not None:
+                    on_retry()
+                logger.warning(
+                    f"LLM call to {self.name} failed ({e!r}), "
+                    f"retry {attempt}/{self.policy.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self._counters["successes"] += 1
+            return result
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After."""
+        ceiling = min(self.policy.backoff_max, self.policy.backoff_base * 2**attempt)
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.policy.backoff_max))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters and breaker state."""
+        return {
+            **self._counters,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+
+# Policy layers keyed by (provider, model)
+_resilience: Dict[Tuple[str, str], ModelResilience] = {}
+
+registry.gauge(
+    "davai_llm_circuit_open",
+    "Whether a model's circuit breaker is open or half open (1) or closed (0).",
+    ("model",),
+    lambda: {
+        (layer.name,): float(layer.breaker.state != CircuitBreaker.CLOSED)
+        for layer in _resilience.values()
+    },
+)
+
+
+def resolve_policy(provider: str, model: str) -> ResiliencePolicy:
+    """
+    Resolve the resilience settings of a model.
+
+    Settings defaults are overridden by the provider's "resilience" entry in
+    llm_factory.PROVIDERS, then by LLM_RESILIENCE_OVERRIDES entries keyed by
+    provider and by "provider/model".
+
+    Args:
+        provider: Provider name
+        model: Model name
+
+    Returns:
+        Resilience policy
+    """
+    policy = ResiliencePolicy(
+        timeout=settings.llm_timeout,
+        max_retries=settings.llm_max_retries,
+        backoff_base=settings.llm_backoff_base,
+        backoff_max=settings.llm_backoff_max,
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        reset_timeout=settings.llm_breaker_reset_timeout,
+    )
+    policy = policy.merged(PROVIDERS.get(provider, {}).get("resilience"))
+    overrides = settings.llm_resilience_overrides
+    policy = policy.merged(overrides.get(provider))
+    return policy.merged(overrides.get(f"{provider}/{model}"))
+
+
+def get_resilience(config: LlmConfig) -> ModelResilience:
+    """
+    Get the policy layer shared by all calls to a model.
+
+    Args:
+        config: LLM configuration
+
+    Returns:
+        Policy layer of the configuration's provider and model
+    """
+    provider = config.provider.lower()
+    key = (provider, config.model)
+    layer = _resilience.get(key)
+    if layer is None:
+        layer = ModelResilience(
+            f"{provider}/{config.model}", resolve_policy(provider, config.model)
+        )
+        _resilience[key] = layer
+    return layer
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    """Get retry, timeout and circuit breaker metrics of every model."""
+    return {layer.name: layer.stats() for layer in _resilience.values()}
@@ -0,0 +1,252 @@
+"""
+Response cache for DAVAI POC.
+
+Two-tier cache of LLM responses keyed by prompt fingerprint: an in-process LRU
+in front of an on-disk store under the configured cache storage path.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from config.settings import settings
+from services.document_store import write_atomic
+from utils.logger import logger
+from utils.tracing import start_span
+
+# Set for the duration of a request that must regenerate instead of reading the cache
+_bypass: ContextVar[bool] = ContextVar("response_cache_bypass", default=False)
+
+
+class ResponseCache:
+    """LRU memory cache backed by a JSON file store, with TTL and size limits."""
+
+    def __init__(
+        self,
+        storage_path: Path,
+        ttl: int = 3600,
+        max_size: int = 1000,
+        enabled: bool = True,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            storage_path: Directory holding the on-disk tier
+            ttl: Entry time-to-live in seconds (0 disables expiry)
+            max_size: Maximum number of entries kept in each tier
+            enabled: Whether the cache is used at all
+        """
+        self.storage_path = storage_path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._disk_count: Optional[int] = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    @contextmanager
+    def bypass(self, enabled: bool = True) -> Iterator[None]:
+        """
+        Skip cache reads for the current context (fresh results are still stored).
+
+        Args:
+            enabled: Whether to bypass the cache
+        """
+        token = _bypass.set(enabled or _bypass.get())
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Prompt fingerprint
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        if _bypass.get():
+            self._counters["bypassed"] += 1
+            return None
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if not self._is_expired(entry[0]):
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[1]
+            del self._memory[key]
+            self._counters["expired"] += 1
+
+        entry = await asyncio.to_thread(self._read_disk, key)
+        if entry is not None:
+            self._remember(key, entry)
+            self._counters["disk_hits"] += 1
+            return entry[1]
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, response: str) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Prompt fingerprint
+            response: LLM response to cache
+        """
+        if not self.enabled:
+            return
+
+        entry = (time.time(), response)
+        self._remember(key, entry)
+        try:
+            with start_span("file.write", {"file.path": str(self._path(key))}):
+                await asyncio.to_thread(self._write_disk, key, entry)
+            self._counters["writes"] += 1
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key[:12]}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        Returns:
+            Hit/miss counters, current memory size and hit ratio
+        """
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "enabled": self.enabled,
+        }
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        self._memory.clear()
+        if self.storage_path.exists():
+            for path in self.storage_path.glob("*.json"):
+                path.unlink(missing_ok=True)
+        self._disk_count = 0
+
+    def purge_expired(self, dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Delete the expired files of the on-disk tier (blocking).
+
+        Expired entries are otherwise only dropped when they are read again.
+        A file's modification time is its entry's creation time.
+
+        Args:
+            dry_run: Only count the files that would be deleted
+
+        Returns:
+            Number and total size in bytes of the expired files
+        """
+        if self.ttl <= 0 or not self.storage_path.exists():
+            return 0, 0
+        count = size = 0
+        for path in self.storage_path.glob("*.json"):
+            try:
+                stat = path.stat()
+                if not self._is_expired(stat.st_mtime):
+                    continue
+                if not dry_run:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+            count += 1
+            size += stat.st_size
+        if count and not dry_run:
+            self._counters["expired"] += count
+            self._disk_count = None  # Recounted on the next write
+        return count, size
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, entry: Tuple[float, str]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _path(self, key: str) -> Path:
+        return self.storage_path / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if self._is_expired(data["created_at"]):
+            path.unlink(missing_ok=True)
+            self._counters["expired"] += 1
+            return None
+        return data["created_at"], data["response"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, str]) -> None:
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        if self._disk_count is None:
+            self._disk_count = sum(1 for _ in self.storage_path.glob("*.json"))
+
+        path = self._path(key)
+        is_new = not path.exists()
+        # Unique temporary file: concurrent writes of a key must not share it
+        write_atomic(
+            path, json.dumps({"created_at": entry[0], "response": entry[1]}), "none"
+        )
+
+        if is_new:
+            self._disk_count += 1
+            if self._disk_count > self.max_size:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Drop the oldest files, leaving headroom so eviction is amortized."""
+        files = sorted(
+            self.storage_path.glob("*.json"), key=lambda p: p.stat().st_mtime
+        )
+        target = int(self.max_size * 0.9)
+        for path in files[: max(len(files) - target, 0)]:
+            path.unlink(missing_ok=True)
+            self._counters["evictions"] += 1
+        self._disk_count = min(len(files), target)
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    storage_path=settings.cache_storage_path / "responses",
+    ttl=settings.cache_ttl,
+    max_size=settings.cache_max_size,
+    enabled=settings.cache_enabled,
+)
@@ -0,0 +1,462 @@
+"""
+Storage retention for DAVAI POC.
+
+Bounds the disk space used by saved projects and the files derived from
+them. A background task periodically deletes the saved projects that exceed
+the configured maximum age, count or total size, oldest (or least recently
+accessed) first, then the blobs no project references any more, the export
+archives of deleted projects, expired LLM response cache files and old
+finished job files. A run can also be planned without deleting anything.
+"""
+
+import asyncio
+import json
+import shutil
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from services.document_store import BlobStore, blob_store
+from services.metrics import registry
+from services.project_catalog import ProjectCatalog, project_catalog
+from services.project_export import ARCHIVE_FORMATS, project_exporter
+from services.response_cache import ResponseCache, response_cache
+from utils.logger import logger
+from utils.tracing import start_span
+
+# Eviction orders of the count and size limits
+RETENTION_ORDERS = ("oldest", "least_accessed")
+
+# Unreferenced blobs younger than this may belong to a project being saved
+BLOB_GRACE_PERIOD = 600.0
+
+# Deleted project names listed in a report
+_REPORTED_PROJECTS = 100
+
+_KINDS = ("projects", "blobs", "exports", "cache", "jobs")
+
+RECLAIMED_BYTES = registry.counter(
+    "davai_retention_reclaimed_bytes_total",
+    "Disk space reclaimed by storage retention, in bytes.",
+    ("kind",),
+)
+DELETED = registry.counter(
+    "davai_retention_deleted_total",
+    "Entries deleted by storage retention.",
+    ("kind",),
+)
+
+
+@dataclass
+class _Project:
+    """A saved project folder as found on disk."""
+
+    path: Path
+    size: int
+    modified_at: float
+    accessed_at: float
+    status: str
+    blobs: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class _Plan:
+    """Entries a retention run deletes, with their size in bytes."""
+
+    usage: Dict[str, int]
+    projects: List[_Project] = field(default_factory=list)
+    blobs: List[Tuple[Path, int]] = field(default_factory=list)
+    exports: List[Tuple[Path, int]] = field(default_factory=list)
+    jobs: List[Tuple[Path, int]] = field(default_factory=list)
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _folder_size(path: Path) -> int:
+    return sum(_file_size(child) for child in path.iterdir() if child.is_file())
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value).timestamp() if value else None
+    except ValueError:
+        return None
+
+
+class RetentionService:
+    """Periodically deletes saved projects and derived files beyond the limits."""
+
+    def __init__(
+        self,
+        catalog: ProjectCatalog,
+        blobs: BlobStore,
+        cache: ResponseCache,
+        exports_dir: Path,
+        jobs_dir: Path,
+        interval: float = 3600.0,
+        max_age_days: float = 0,
+        max_projects: int = 0,
+        max_bytes: int = 0,
+        order: str = "oldest",
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            catalog: Catalog of the saved projects, whose folder is scanned
+            blobs: Store of the saved documents
+            cache: LLM response cache whose expired files are deleted
+            exports_dir: Directory of the cached export archives
+            jobs_dir: Directory of the persisted workflow jobs
+            interval: Seconds between two runs of the background task
+            max_age_days: Age in days after which a project or finished job
+                is deleted, by its last modification (0 disables)
+            max_projects: Maximum number of saved projects (0 disables)
+            max_bytes: Maximum size of the saved projects in bytes, their
+                folders and blobs together (0 disables)
+            order: Projects deleted first by the count and size limits:
+                "oldest" (last modification) or "least_accessed" (last read,
+                download or modification)
+
+        Raises:
+            ValueError: If the order is unknown
+        """
+        if order not in RETENTION_ORDERS:
+            raise ValueError(f"Unknown retention order: {order}")
+        self.catalog = catalog
+        self.blobs = blobs
+        self.cache = cache
+        self.exports_dir = exports_dir
+        self.jobs_dir = jobs_dir
+        self.interval = interval
+        self.max_age = max_age_days * 86400
+        self.max_projects = max_projects
+        self.max_bytes = max_bytes
+        self.order = order
+
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background task, which runs right away then periodically."""
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the background task, letting a run in progress finish."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        async with self._lock:
+            pass
+
+    async def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Apply the retention limits once.
+
+        Runs never overlap: a run waits for the one in progress. The work is
+        done in a worker thread.
+
+        Args:
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Report of the run: storage usage before it and the number and
+            size of the entries deleted (or to delete), by kind
+        """
+        async with self._lock:
+            with start_span("retention.run", {"retention.dry_run": dry_run}) as span:
+                report = await asyncio.to_thread(self._run, dry_run)
+                span.set_attribute(
+                    "retention.reclaimed_bytes", report["reclaimed_bytes"]
+                )
+            self.last_report = report
+            if not dry_run:
+                entries = sum(r["count"] for r in report["reclaimed"].values())
+                logger.info(
+                    f"Storage retention: reclaimed {report['reclaimed_bytes']} "
+                    f"bytes in {entries} entries"
+                )
+            return report
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the retention settings and the report of the last run.
+
+        Returns:
+            Settings, whether the background task runs, and the last report
+        """
+        return {
+            "running": self._task is not None,
+            "interval": self.interval,
+            "max_age_days": self.max_age / 86400,
+            "max_projects": self.max_projects,
+            "max_bytes": self.max_bytes,
+            "order": self.order,
+            "last_run": self.last_report,
+        }
+
+    def usage(self) -> Dict[Tuple[str, ...], float]:
+        """Storage usage by area measured by the last run, for the metrics."""
+        if self.last_report is None:
+            return {}
+        return {(area,): size for area, size in self.last_report["usage"].items()}
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Storage retention failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _run(self, dry_run: bool) -> Dict[str, Any]:
+        started = time.time()
+        plan = self._plan(started)
+        reclaimed = {kind: {"count": 0, "bytes": 0} for kind in _KINDS}
+
+        def account(kind: str, size: int) -> None:
+            reclaimed[kind]["count"] += 1
+            reclaimed[kind]["bytes"] += size
+
+        for project in plan.projects:
+            if not dry_run:
+                try:
+                    shutil.rmtree(project.path)
+                except OSError as e:
+                    logger.warning(f"Could not delete project {project.path}: {e}")
+                    continue
+                try:
+                    self.catalog.remove(project.path.name)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not unindex {project.path.name}: {e}")
+            account("projects", project.size)
+
+        for kind, files in (
+            ("blobs", plan.blobs),
+            ("exports", plan.exports),
+            ("jobs", plan.jobs),
+        ):
+            for path, size in files:
+                if not dry_run:
+                    if kind == "blobs" and self._blob_reused(path):
+                        continue
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        continue
+                account(kind, size)
+
+        count, size = self.cache.purge_expired(dry_run)
+        reclaimed["cache"] = {"count": count, "bytes": size}
+
+        if not dry_run:
+            for kind, totals in reclaimed.items():
+                if totals["count"]:
+                    DELETED.inc(totals["count"], kind=kind)
+                    RECLAIMED_BYTES.inc(totals["bytes"], kind=kind)
+
+        return {
+            "dry_run": dry_run,
+            "started_at": datetime.fromtimestamp(started).isoformat(),
+            "duration_seconds": round(time.time() - started, 3),
+            "usage": plan.usage,
+            "reclaimed": reclaimed,
+            "reclaimed_bytes": sum(r["bytes"] for r in reclaimed.values()),
+            "deleted_projects": [
+                project.path.name for project in plan.projects[:_REPORTED_PROJECTS]
+            ],
+        }
+
+    def _plan(self, now: float) -> _Plan:
+        projects = self._scan_projects()
+        stored = self._scan_blobs()
+        refs = Counter(digest for project in projects for digest in project.blobs)
+
+        usage = {
+            "projects": sum(project.size for project in projects),
+            "blobs": sum(size for size, _ in stored.values()),
+            "exports": 0,
+            "cache": 0,
+            "jobs": 0,
+        }
+        plan = _Plan(usage)
+
+        # Size of the saved projects, the blobs they reference included
+        total = usage["projects"] + sum(
+            size for digest, (size, _) in stored.items() if refs[digest]
+        )
+        kept = len(projects)
+
+        def evict(project: _Project) -> None:
+            nonlocal total, kept
+            plan.projects.append(project)
+            kept -= 1
+            total -= project.size
+            for digest in project.blobs:
+                refs[digest] -= 1
+                if not refs[digest] and digest in stored:
+                    total -= stored[digest][0]
+
+        key = "modified_at" if self.order == "oldest" else "accessed_at"
+        candidates = sorted(projects, key=lambda project: getattr(project, key))
+        if self.max_age:
+            for project in candidates:
+                # Old running projects may be resumed: only the count and size
+                # limits could justify losing them, and they skip them too
+                if (
+                    now - project.modified_at > self.max_age
+                    and project.status != "running"
+                ):
+                    evict(project)
+        evicted = {id(project) for project in plan.projects}
+        for project in candidates:
+            over_count = self.max_projects and kept > self.max_projects
+            over_size = self.max_bytes and total > self.max_bytes
+            if not (over_count or over_size):
+                break
+            # A workflow may still be saving documents into running projects
+            if id(project) not in evicted and project.status != "running":
+                evict(project)
+
+        for digest, (size, modified_at) in stored.items():
+            if not refs[digest] and now - modified_at > BLOB_GRACE_PERIOD:
+                plan.blobs.append((self.blobs.path(digest), size))
+
+        deleted = {project.path.name for project in plan.projects}
+        names = {project.path.name for project in projects} - deleted
+        if self.exports_dir.exists():
+            for path in self.exports_dir.iterdir():
+                size = _file_size(path)
+                usage["exports"] += size
+                extension = next(
+                    (e for _, e in ARCHIVE_FORMATS.values() if path.name.endswith(e)),
+                    None,
+                )
+                if extension is None:
+                    continue
+                # "<project>-<etag><extension>"
+                project_name = path.name[: -len(extension)].rsplit("-", 1)[0]
+                if project_name not in names:
+                    plan.exports.append((path, size))
+
+        if self.cache.storage_path.exists():
+            usage["cache"] = sum(
+                _file_size(path) for path in self.cache.storage_path.glob("*.json")
+            )
+
+        if self.jobs_dir.exists():
+            for path in self.jobs_dir.glob("*.json"):
+                size = _file_size(path)
+                usage["jobs"] += size
+                if self.max_age and self._job_expired(path, now):
+                    plan.jobs.append((path, size))
+        return plan
+
+    def _scan_projects(self) -> List[_Project]:
+        try:
+            accessed = self.catalog.access_times()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read project access times: {e}")
+            accessed = {}
+
+        projects: List[_Project] = []
+        if not self.catalog.projects_dir.exists():
+            return projects
+        for metadata_file in self.catalog.projects_dir.glob("*/metadata.json"):
+            try:
+                modified_at = metadata_file.stat().st_mtime
+                with open(metadata_file, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+                size = _folder_size(metadata_file.parent)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read project {metadata_file.parent}: {e}")
+                continue
+            name = metadata_file.parent.name
+            projects.append(
+                _Project(
+                    path=metadata_file.parent,
+                    size=size,
+                    modified_at=modified_at,
+                    accessed_at=max(
+                        modified_at, _timestamp(accessed.get(name)) or modified_at
+                    ),
+                    status=metadata.get("status", "completed"),
+                    blobs={
+                        entry["sha256"]
+                        for entry in (metadata.get("documents") or {}).values()
+                    },
+                )
+            )
+        return projects
+
+    def _scan_blobs(self) -> Dict[str, Tuple[int, float]]:
+        """Size and modification time of every stored blob, by digest."""
+        stored = {}
+        if self.blobs.root.exists():
+            for path in self.blobs.root.glob("*/*.gz"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                stored[path.parent.name + path.name[: -len(".gz")]] = (
+                    stat.st_size,
+                    stat.st_mtime,
+                )
+        return stored
+
+    @staticmethod
+    def _blob_reused(path: Path) -> bool:
+        """
+        Check whether a blob planned for deletion was stored again (or was
+        deleted) since the plan.
+
+        Storing a blob that exists refreshes its modification time, so a
+        project saved after the plan may reference it.
+        """
+        try:
+            return time.time() - path.stat().st_mtime <= BLOB_GRACE_PERIOD
+        except FileNotFoundError:
+            return True
+
+    def _job_expired(self, path: Path, now: float) -> bool:
+        try:
+            if now - path.stat().st_mtime <= self.max_age:
+                return False
+            status = json.loads(path.read_text(encoding="utf-8")).get("status")
+        except (OSError, ValueError):
+            return False
+        return status not in ("queued", "running")
+
+
+# Global retention service instance
+retention_service = RetentionService(
+    catalog=project_catalog,
+    blobs=blob_store,
+    cache=response_cache,
+    exports_dir=project_exporter.cache_dir,
+    jobs_dir=settings.temp_storage_path / "jobs",
+    interval=settings.retention_interval,
+    max_age_days=settings.retention_max_age_days,
+    max_projects=settings.retention_max_projects,
+    max_bytes=settings.retention_max_bytes,
+    order=settings.retention_order,
+)
+
+registry.gauge(
+    "davai_storage_bytes",
+    "Disk space used by area, measured by the last storage retention run.",
+    ("area",),
+    retention_service.usage,
+)
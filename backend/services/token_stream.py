@@ -0,0 +1,37 @@
+"""
+Token streaming for DAVAI POC.
+
+Lets a caller receive LLM tokens as they are generated by the agents running
+in the current context, without changing the agents' interfaces.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+TokenSink = Callable[[str], None]
+
+_sink: ContextVar[Optional[TokenSink]] = ContextVar("token_sink", default=None)
+
+
+@contextmanager
+def token_sink(sink: TokenSink) -> Iterator[None]:
+    """
+    Stream LLM tokens produced in the current context to a callback.
+
+    While active, BaseAgent._invoke_llm passes every token streamed by the
+    model to the sink.
+
+    Args:
+        sink: Callback receiving each token
+    """
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def get_token_sink() -> Optional[TokenSink]:
+    """Get the token sink of the current context, if any."""
+    return _sink.get()
@@ -0,0 +1,175 @@
+"""
+Batch workflow runs for DAVAI POC.
+
+Runs the complete workflow for every item of a batch request and reports
+each item as soon as it finishes. Identical items run once. Items are batch
+runs of the workflow scheduler, a bounded number at a time, and their LLM
+calls have background priority in the provider rate limiters.
+"""
+
+import asyncio
+import time
+from typing import AsyncGenerator, Dict, List, Union
+
+from config.settings import settings
+from models.batch_workflow_item import BatchWorkflowItem
+from models.batch_workflow_request import BatchWorkflowRequest
+from models.batch_workflow_summary import BatchWorkflowSummary
+from models.complete_workflow_request import CompleteWorkflowRequest
+from services.rate_limiter import llm_priority
+from services.workflow_orchestrator import WorkflowOrchestrator
+from services.workflow_scheduler import (
+    DEFAULT_TENANT,
+    WorkflowScheduler,
+    workflow_scheduler,
+)
+from utils.fingerprint import value_digest
+from utils.logger import logger
+
+
+def item_key(item: CompleteWorkflowRequest) -> str:
+    """
+    Digest identifying identical batch items.
+
+    Items are identical when their requests are equal, ignoring whitespace
+    differences in the project idea.
+
+    Args:
+        item: Batch item
+
+    Returns:
+        Short digest of the normalized request
+    """
+    data = item.model_dump()
+    data["project_idea"] = " ".join(item.project_idea.split())
+    return value_digest(data)
+
+
+async def run_batch(
+    orchestrator: WorkflowOrchestrator,
+    request: BatchWorkflowRequest,
+    tenant: str = DEFAULT_TENANT,
+    scheduler: WorkflowScheduler = workflow_scheduler,
+) -> AsyncGenerator[Union[BatchWorkflowItem, BatchWorkflowSummary], None]:
+    """
+    Run a batch request, yielding every item as it finishes, then a summary.
+
+    Items are yielded in completion order; an item identical to an earlier
+    one is yielded with it, sharing its run. Closing the iterator cancels
+    the runs still in progress.
+
+    Args:
+        orchestrator: Orchestrator running the workflows
+        request: Batch request
+        tenant: Tenant the runs are scheduled for
+        scheduler: Scheduler starting the runs
+
+    Yields:
+        BatchWorkflowItem per item, then one BatchWorkflowSummary
+    """
+    started = time.perf_counter()
+    runs: Dict[str, int] = {}  # Item key -> index of the item that runs
+    sharing: Dict[int, List[int]] = {}  # Running index -> identical indexes
+    for index, item in enumerate(request.items):
+        first = runs.setdefault(item_key(item), index)
+        sharing.setdefault(first, [])
+        if first != index:
+            sharing[first].append(index)
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for index in sharing:
+        pending.put_nowait(index)
+    # Finished runs: index, result (None if the run raised), error message
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        while not pending.empty():
+            index = pending.get_nowait()
+            item = request.items[index]
+            try:
+                # Admission was checked for the batch; the worker count
+                # bounds what it adds to the tenant's queue
+                async with scheduler.slot(tenant, "batch", force=True):
+                    result = await orchestrator.run_complete_workflow(
+                        item.project_idea,
+                        item.answers,
+                        item.include_suggestions,
+                        dependency_profile=item.dependency_profile,
+                        regenerate=item.regenerate,
+                        use_project_brief=item.use_project_brief,
+                    )
+                error = None
+                if not result.success:
+                    error = next(
+                        (s.error_message for s in result.steps if not s.success),
+                        "Workflow failed",
+                    )
+                finished.put_nowait((index, result, error))
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {e}")
+                finished.put_nowait((index, None, str(e)))
+
+    concurrency = min(
+        request.concurrency or settings.batch_concurrency,
+        settings.workflow_tenant_queue_size,
+        len(sharing),
+    )
+    with llm_priority("background"):
+        workers = [asyncio.create_task(worker()) for _ in range(max(concurrency, 1))]
+    logger.info(
+        f"Running batch of {len(request.items)} items ({len(sharing)} unique) "
+        f"for tenant {tenant}, {len(workers)} at a time"
+    )
+
+    summary = BatchWorkflowSummary(
+        items=len(request.items),
+        workflows=len(sharing),
+        duplicates=len(request.items) - len(sharing),
+        succeeded=0,
+        failed=0,
+        duration=0.0,
+        throughput=0.0,
+    )
+    try:
+        for _ in range(len(sharing)):
+            index, result, error = await finished.get()
+            if result is not None:
+                for step in result.steps:
+                    summary.prompt_tokens += step.prompt_tokens or 0
+                    summary.completion_tokens += step.completion_tokens or 0
+                    summary.cost += step.cost or 0.0
+            elapsed = round(time.perf_counter() - started, 3)
+            for item_index in [index, *sharing[index]]:
+                if error is None:
+                    summary.succeeded += 1
+                else:
+                    summary.failed += 1
+                yield BatchWorkflowItem(
+                    index=item_index,
+                    duplicate_of=index if item_index != index else None,
+                    project_idea=request.items[item_index].project_idea,
+                    success=error is None,
+                    workflow_id=result.workflow_id if result else None,
+                    duration=elapsed,
+                    error_message=error,
+                    result=(
+                        result
+                        if request.include_results and item_index == index
+                        else None
+                    ),
+                )
+    finally:
+        # Client gone or batch finished: stop the remaining runs
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    duration = time.perf_counter() - started
+    summary.duration = round(duration, 3)
+    summary.throughput = round(summary.workflows / duration, 3)
+    summary.cost = round(summary.cost, 6)
+    logger.info(
+        f"Batch finished: {summary.succeeded} succeeded, {summary.failed} failed "
+        f"in {summary.duration:.1f}s"
+    )
+    yield summary
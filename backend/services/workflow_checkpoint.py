@@ -0,0 +1,266 @@
+"""
+Workflow checkpoints for DAVAI POC.
+
+Persists the output of every completed workflow step under a workflow id so a
+failed run can be resumed without regenerating the documents it already paid
+for. Checkpoints use the layout of saved projects: one folder per project with
+a metadata.json file, its documents being stored by the document store.
+"""
+
+import asyncio
+import json
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.document_store import read_documents, store_documents, write_file_atomic
+from services.project_catalog import project_catalog
+from utils.logger import logger
+
+_WORKFLOW_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def project_folder_name(project_idea: str) -> str:
+    """
+    Build a timestamped, filesystem-safe folder name from a project idea.
+
+    Args:
+        project_idea: Original project idea
+
+    Returns:
+        Folder name
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_name = "".join(
+        c for c in project_idea[:50] if c.isalnum() or c in (" ", "-", "_")
+    ).rstrip()
+    safe_name = safe_name.replace(" ", "_").lower()
+    return f"{safe_name}_{timestamp}"
+
+
+async def write_metadata(project_dir: Path, metadata: Dict[str, Any]) -> None:
+    """Atomically write the metadata.json file of a project folder and index it."""
+    await write_file_atomic(
+        project_dir / "metadata.json",
+        json.dumps(metadata, ensure_ascii=False, indent=2),
+    )
+    await project_catalog.record(project_dir, metadata)
+
+
+class WorkflowCheckpoint:
+    """Checkpoint of a single workflow run."""
+
+    def __init__(self, project_dir: Path, metadata: Dict[str, Any]):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            project_dir: Project folder holding the checkpointed documents
+            metadata: Content of the folder's metadata.json
+        """
+        self.project_dir = project_dir
+        self.metadata = metadata
+        self._lock = asyncio.Lock()
+
+    @property
+    def workflow_id(self) -> str:
+        """Identifier of the checkpointed workflow."""
+        workflow_id: str = self.metadata["workflow_id"]
+        return workflow_id
+
+    @property
+    def status(self) -> str:
+        """Workflow status: "running", "failed" or "completed"."""
+        status: str = self.metadata["status"]
+        return status
+
+    @property
+    def request(self) -> Dict[str, Any]:
+        """Parameters the workflow was started with."""
+        request: Dict[str, Any] = self.metadata["request"]
+        return request
+
+    @property
+    def questions(self) -> Optional[List[str]]:
+        """Checkpointed clarifying questions, if generated."""
+        return self.metadata.get("questions")
+
+    @classmethod
+    async def create(
+        cls, output_dir: Path, project_idea: str, request: Dict[str, Any]
+    ) -> "WorkflowCheckpoint":
+        """
+        Create the checkpoint of a new workflow run.
+
+        Args:
+            output_dir: Directory holding the saved projects
+            project_idea: Original project idea
+            request: Parameters needed to resume the workflow
+
+        Returns:
+            New checkpoint
+        """
+        project_dir = await asyncio.to_thread(
+            cls._new_folder, output_dir, project_folder_name(project_idea)
+        )
+
+        checkpoint = cls(
+            project_dir,
+            {
+                "project_idea": project_idea,
+                "generated_at": datetime.now().isoformat(),
+                "workflow_id": uuid.uuid4().hex,
+                "status": "running",
+                "request": request,
+                "completed_steps": {},
+                "output_path": str(project_dir),
+            },
+        )
+        await checkpoint.save()
+        return checkpoint
+
+    @staticmethod
+    def _new_folder(output_dir: Path, name: str) -> Path:
+        """Create a project folder, suffixed if a run started the same second."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        suffix = 1
+        while True:
+            project_dir = output_dir / (name if suffix == 1 else f"{name}_{suffix}")
+            try:
+                project_dir.mkdir()
+                return project_dir
+            except FileExistsError:
+                suffix += 1
+
+    @classmethod
+    async def load(
+        cls, output_dir: Path, workflow_id: str
+    ) -> Optional["WorkflowCheckpoint"]:
+        """
+        Find the checkpoint of a workflow.
+
+        Args:
+            output_dir: Directory holding the saved projects
+            workflow_id: Workflow identifier
+
+        Returns:
+            The checkpoint, or None if it does not exist
+        """
+        if not _WORKFLOW_ID.match(workflow_id):
+            return None
+        found = await asyncio.to_thread(cls._find, output_dir, workflow_id)
+        return cls(*found) if found else None
+
+    @staticmethod
+    def _find(
+        output_dir: Path, workflow_id: str
+    ) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """Look up a workflow's folder in the catalog and read its metadata."""
+        project = project_catalog.find_workflow(workflow_id)
+        if project is None:
+            return None
+        project_dir = Path(project["folder_path"])
+        if project_dir.parent.resolve() != output_dir.resolve():
+            return None
+        metadata_file = project_dir / "metadata.json"
+        try:
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read metadata for {metadata_file}: {e}")
+            return None
+        return project_dir, metadata
+
+    async def save(self) -> None:
+        """Persist the checkpoint metadata."""
+        async with self._lock:
+            # Serialized under the lock so the latest state always wins
+            await write_metadata(self.project_dir, self.metadata)
+
+    async def save_questions(self, questions: List[str]) -> None:
+        """Checkpoint the clarifying questions."""
+        self.metadata["questions"] = questions
+        await self.save()
+
+    @property
+    def fingerprints(self) -> Dict[str, Dict[str, Any]]:
+        """Input fingerprints of the checkpointed nodes, by node name."""
+        return self.metadata.get("fingerprints") or {}
+
+    async def save_step(
+        self,
+        name: str,
+        documents: Dict[str, str],
+        fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Checkpoint the documents of a completed graph node.
+
+        Args:
+            name: Node name
+            documents: Documents produced by the node
+            fingerprint: Fingerprint of the node's inputs and what producing
+                the documents cost, so a later regeneration can reuse them
+        """
+        manifest = await store_documents(self.project_dir, documents)
+        self.metadata.setdefault("documents", {}).update(manifest)
+        self.metadata["completed_steps"][name] = list(documents)
+        if fingerprint is not None:
+            self.metadata.setdefault("fingerprints", {})[name] = fingerprint
+        await self.save()
+
+    async def completed_steps(self) -> Dict[str, Dict[str, str]]:
+        """
+        Read the documents of every checkpointed node.
+
+        Nodes with a missing document file are left out so they are rerun.
+
+        Returns:
+            Documents by node name
+        """
+
+        async def read(name: str, doc_names: List[str]) -> Optional[Dict[str, str]]:
+            try:
+                documents = await asyncio.to_thread(
+                    read_documents, self.project_dir, self.metadata, doc_names
+                )
+            except FileNotFoundError:
+                logger.warning(f"Checkpoint of step {name} is incomplete, rerunning it")
+                return None
+            # Keep the node's own document names (read_documents adds .md)
+            return dict(zip(doc_names, documents.values()))
+
+        steps = self.metadata["completed_steps"]
+        results = await asyncio.gather(*(read(n, d) for n, d in steps.items()))
+        return {
+            name: documents
+            for name, documents in zip(steps, results)
+            if documents is not None
+        }
+
+    async def mark(
+        self,
+        status: str,
+        error_message: Optional[str] = None,
+        failed_step: Optional[str] = None,
+    ) -> None:
+        """
+        Update the workflow status.
+
+        Args:
+            status: New status
+            error_message: Error of a failed run
+            failed_step: Name of the step that failed, if known
+        """
+        self.metadata["status"] = status
+        for key, value in (
+            ("error_message", error_message),
+            ("failed_step", failed_step),
+        ):
+            if value is not None:
+                self.metadata[key] = value
+            else:
+                self.metadata.pop(key, None)
+        await self.save()
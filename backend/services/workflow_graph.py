@@ -0,0 +1,265 @@
+"""
+Workflow dependency graph for DAVAI POC.
+
+Declares which upstream documents each documentation agent consumes and
+schedules agents so that every step starts as soon as its inputs are ready.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class WorkflowNode:
+    """
+    A documentation step in the workflow graph.
+
+    Attributes:
+        name: Document category produced by the step (e.g. "architecture").
+        depends_on: Names of the upstream steps whose documents it consumes.
+    """
+
+    name: str
+    depends_on: Tuple[str, ...] = ()
+
+    @property
+    def step_name(self) -> str:
+        """Name used for the matching WorkflowStep."""
+        return f"generate_{self.name}"
+
+
+@dataclass
+class NodeRun:
+    """Outcome of a single scheduled node."""
+
+    documents: Dict[str, str]
+    started_at: float = 0.0
+    duration: float = 0.0
+    metadata: Dict = field(default_factory=dict)
+
+
+_CORE = ("context", "architecture", "tech_stack")
+
+# Each profile lists nodes in their canonical (topological) order
+DEPENDENCY_PROFILES: Dict[str, Tuple[WorkflowNode, ...]] = {
+    # Every agent consumes all previous outputs: a strict chain
+    "strict": (
+        WorkflowNode("context"),
+        WorkflowNode("architecture", ("context",)),
+        WorkflowNode("tech_stack", ("context", "architecture")),
+        WorkflowNode("task_breakdown", _CORE),
+        WorkflowNode("project_rules", _CORE + ("task_breakdown",)),
+        WorkflowNode("claude_guide", _CORE + ("task_breakdown", "project_rules")),
+        WorkflowNode(
+            "readme",
+            _CORE + ("task_breakdown", "project_rules", "claude_guide"),
+        ),
+    ),
+    # Late agents fan out in parallel from context + architecture + tech stack
+    "relaxed": (
+        WorkflowNode("context"),
+        WorkflowNode("architecture", ("context",)),
+        WorkflowNode("tech_stack", ("context", "architecture")),
+        WorkflowNode("task_breakdown", _CORE),
+        WorkflowNode("project_rules", _CORE),
+        WorkflowNode("claude_guide", _CORE),
+        WorkflowNode("readme", _CORE),
+    ),
+}
+
+# Optional stage distilling the core documents into a compact brief that
+# replaces them in the prompts of later agents
+BRIEF_NODE = WorkflowNode("project_brief", _CORE)
+
+# Nodes feeding later prompts that are not part of the documentation package
+INTERNAL_NODES = frozenset({BRIEF_NODE.name})
+
+NodeRunner = Callable[
+    [WorkflowNode, Dict[str, Dict[str, str]]], Awaitable[Union[NodeRun, Dict[str, str]]]
+]
+NodeCallback = Callable[[WorkflowNode, NodeRun], None]
+NodeErrorCallback = Callable[[WorkflowNode, BaseException, float], None]
+
+
+def get_workflow_graph(
+    profile: str = "strict", project_brief: bool = False
+) -> Tuple[WorkflowNode, ...]:
+    """
+    Get the workflow graph for a dependency profile.
+
+    Args:
+        profile: Name of the dependency profile
+        project_brief: Whether to insert the project brief stage
+
+    Returns:
+        Nodes of the graph in topological order
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile not in DEPENDENCY_PROFILES:
+        raise ValueError(
+            f"Unknown dependency profile: {profile}. "
+            f"Available profiles: {', '.join(DEPENDENCY_PROFILES)}"
+        )
+
+    nodes = DEPENDENCY_PROFILES[profile]
+    return with_project_brief(nodes) if project_brief else nodes
+
+
+def with_project_brief(nodes: Tuple[WorkflowNode, ...]) -> Tuple[WorkflowNode, ...]:
+    """
+    Insert the project brief stage into a graph.
+
+    Nodes consuming all of context, architecture and tech stack consume the
+    brief instead; their other dependencies are kept.
+
+    Args:
+        nodes: Workflow nodes in topological order
+
+    Returns:
+        Workflow nodes with the brief stage, in topological order
+    """
+    result = []
+    for node in nodes:
+        if set(_CORE) <= set(node.depends_on):
+            others = tuple(dep for dep in node.depends_on if dep not in _CORE)
+            node = WorkflowNode(node.name, (BRIEF_NODE.name,) + others)
+        result.append(node)
+        if node.name == _CORE[-1]:
+            result.append(BRIEF_NODE)
+    return tuple(result)
+
+
+class WorkflowScheduler:
+    """Runs a workflow graph, starting each node once its dependencies are done."""
+
+    def __init__(self, nodes: Tuple[WorkflowNode, ...]):
+        """
+        Initialize the scheduler.
+
+        Args:
+            nodes: Workflow nodes in topological order
+
+        Raises:
+            ValueError: If a node depends on an unknown or later node
+        """
+        seen = set()
+        for node in nodes:
+            missing = [dep for dep in node.depends_on if dep not in seen]
+            if missing:
+                raise ValueError(
+                    f"Node {node.name} depends on unknown or later nodes: {missing}"
+                )
+            seen.add(node.name)
+
+        self.nodes = nodes
+
+    async def run(
+        self,
+        run_node: NodeRunner,
+        completed: Optional[Dict[str, Dict[str, str]]] = None,
+        on_complete: Optional[NodeCallback] = None,
+        on_start: Optional[Callable[[WorkflowNode], Any]] = None,
+        on_error: Optional[NodeErrorCallback] = None,
+    ) -> Dict[str, NodeRun]:
+        """
+        Execute all nodes, running independent ones concurrently.
+
+        If any node fails, the remaining in-flight nodes are cancelled and the
+        error is re-raised.
+
+        Args:
+            run_node: Coroutine producing a node's documents (or a NodeRun)
+                from its upstream documents
+            completed: Documents of nodes that are already done and must be skipped
+            on_complete: Optional callback invoked as each node finishes
+            on_start: Optional callback invoked as each node starts
+            on_error: Optional callback invoked with the failing node, its
+                error and its duration before the error is re-raised
+
+        Returns:
+            Run results keyed by node name, for the nodes executed in this call
+        """
+        outputs: Dict[str, Dict[str, str]] = dict(completed or {})
+        pending: List[WorkflowNode] = [n for n in self.nodes if n.name not in outputs]
+        running: Dict["asyncio.Task[NodeRun]", WorkflowNode] = {}
+        results: Dict[str, NodeRun] = {}
+        started: Dict[str, float] = {}
+        origin = time.perf_counter()
+
+        async def _timed(
+            node: WorkflowNode, upstream: Dict[str, Dict[str, str]]
+        ) -> NodeRun:
+            started[node.name] = time.perf_counter()
+            run = await run_node(node, upstream)
+            if not isinstance(run, NodeRun):
+                run = NodeRun(documents=run)
+            run.started_at = started[node.name] - origin
+            run.duration = time.perf_counter() - started[node.name]
+            return run
+
+        try:
+            while pending or running:
+                for node in list(pending):
+                    if all(dep in outputs for dep in node.depends_on):
+                        upstream = {dep: outputs[dep] for dep in node.depends_on}
+                        if on_start:
+                            on_start(node)
+                        task = asyncio.create_task(_timed(node, upstream))
+                        running[task] = node
+                        pending.remove(node)
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    node = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        if on_error:
+                            duration = time.perf_counter() - started[node.name]
+                            on_error(node, error, duration)
+                        raise error
+                    run = task.result()
+                    outputs[node.name] = run.documents
+                    results[node.name] = run
+                    logger.debug(f"Node {node.name} finished in {run.duration:.2f}s")
+                    if on_complete:
+                        on_complete(node, run)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
+
+
+async def gather_or_cancel(*aws: Awaitable) -> List:
+    """
+    Run awaitables concurrently, cancelling the rest as soon as one fails.
+
+    Args:
+        *aws: Awaitables to run
+
+    Returns:
+        Results in the order the awaitables were given
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            error = task.exception()
+            if error is not None:
+                raise error
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
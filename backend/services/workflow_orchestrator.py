@@ -3,14 +3,61 @@ Workflow orchestrator for DAVAI POC.
 Manages the complete project documentation generation workflow.
 """
 
+import asyncio
 import time
-import json
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Dict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Generic,
+    Iterator,
+    List,
+    Dict,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 from datetime import datetime
 from config.llm_config import LlmConfig
 from config.settings import settings
 from services.llm_factory import get_json_config, get_text_config
+from services.context_builder import BuiltContext, ContextBuilder, estimate_tokens
+from services.metrics import (
+    LlmCall,
+    collect_llm_calls,
+    observe_step,
+    observe_workflow,
+    summarize_llm_calls,
+)
+from services.document_store import (
+    document_filename,
+    read_documents,
+    store_documents,
+)
+from services.project_catalog import project_catalog
+from services.response_cache import response_cache
+from services.token_stream import token_sink
+from services.workflow_checkpoint import (
+    WorkflowCheckpoint,
+    project_folder_name,
+    write_metadata,
+)
+from services.workflow_graph import (
+    BRIEF_NODE,
+    INTERNAL_NODES,
+    NodeRun,
+    WorkflowNode,
+    WorkflowScheduler,
+    gather_or_cancel,
+    get_workflow_graph,
+)
 
 # Import models for type annotations
 from models.project_idea import ProjectIdea
@@ -21,8 +68,10 @@ from models.project_data import ProjectData
 from models.documentation import Documentation
 from models.workflow_step import WorkflowStep
 from models.workflow_result import WorkflowResult
+from models.regeneration_report import RegenerationReport
 
 # Import agents
+from agents.base_agent import BaseAgent
 from agents.question_generator.question_generator_agent import QuestionGeneratorAgent
 from agents.suggestion_agent.suggestion_agent import SuggestionAgent
 from agents.context_agent.context_agent import ContextAgent
@@ -32,38 +81,163 @@ from agents.task_breakdown_agent.task_breakdown_agent import TaskBreakdownAgent
 from agents.project_rules_agent.project_rules_agent import ProjectRulesAgent
 from agents.claude_guide_agent.claude_guide_agent import ClaudeGuideAgent
 from agents.readme_agent.readme_agent import ReadmeAgent
+from agents.project_brief_agent.project_brief_agent import ProjectBriefAgent
 
+from utils.fingerprint import value_digest
 from utils.logger import logger
+from utils.tracing import Span, start_span
+
+_Agent = TypeVar("_Agent", bound=BaseAgent)
+
+
+class _LazyAgent(Generic[_Agent]):
+    """
+    Descriptor building an orchestrator agent on first access.
+
+    The built agent is stored on the instance, so later lookups are plain
+    attribute reads.
+    """
+
+    def __init__(self, agent_class: Type[_Agent], config_attr: str):
+        self.agent_class = agent_class
+        self.config_attr = config_attr
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> "_LazyAgent[_Agent]": ...
+
+    @overload
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> _Agent: ...
+
+    def __get__(
+        self, instance: Any, owner: Optional[type] = None
+    ) -> Union["_LazyAgent[_Agent]", _Agent]:
+        if instance is None:
+            return self
+        agent = self.agent_class(getattr(instance, self.config_attr))
+        instance.__dict__[self.name] = agent
+        return agent
+
+
+# Progress callback receiving an event type and its payload
+WorkflowEventCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class _StepRecorder:
+    """Collects the steps of a workflow run and reports progress events."""
+
+    def __init__(
+        self,
+        on_event: Optional[WorkflowEventCallback] = None,
+        stream_tokens: bool = False,
+    ):
+        self.start_time = time.time()
+        self.steps: List[WorkflowStep] = []
+        # Name of the first failed step, if any
+        self.failed_step: Optional[str] = None
+        self.on_event = on_event
+        self.stream_tokens = stream_tokens and on_event is not None
+
+    def elapsed(self) -> float:
+        """Seconds since the start of the workflow."""
+        return time.time() - self.start_time
+
+    def start(self, step_name: str) -> float:
+        """Report that a step started and return its start offset."""
+        started_at = self.elapsed()
+        self.emit("step_start", {"step_name": step_name, "started_at": started_at})
+        return started_at
+
+    def add(self, step: WorkflowStep) -> None:
+        """Record a finished (or failed) step."""
+        self.steps.append(step)
+        if not step.success and self.failed_step is None:
+            self.failed_step = step.step_name
+        if step.duration and not (
+            step.output_data.get("restored") or "reused_from" in step.output_data
+        ):
+            observe_step(step.step_name, step.duration, step.success)
+        self.emit("step_end", {"step": step})
+
+    @contextmanager
+    def instrument(self, step_name: str) -> Iterator[List[LlmCall]]:
+        """
+        Context running a step: traces it, collects its LLM calls (see
+        services.metrics) and reports its tokens as "token" events.
+        """
+        with start_span(step_name, {"workflow.step": step_name}):
+            with self.tokens(step_name), collect_llm_calls() as calls:
+                yield calls
+
+    def tokens(self, step_name: str) -> ContextManager:
+        """Context in which LLM tokens are reported as "token" events of a step."""
+        if not self.stream_tokens:
+            return nullcontext()
+        return token_sink(
+            lambda token: self.emit("token", {"step_name": step_name, "token": token})
+        )
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        """Forward an event to the progress callback, if any."""
+        if self.on_event is not None:
+            try:
+                self.on_event(event, data)
+            except Exception as e:
+                logger.warning(f"Workflow progress callback failed on {event}: {e}")
+
+
+# Step recorded for a workflow failure outside the documentation steps, and
+# its log label, by exception type (first match)
+_FAILURE_STEPS = (
+    (ValueError, "workflow_validation_failure", "validation"),
+    (RuntimeError, "workflow_runtime_failure", "runtime"),
+    (Exception, "workflow_step_failure", "step"),
+)
+
+
+def _trace_result(span: Span, result: WorkflowResult) -> None:
+    """Record the outcome of a workflow run on its span."""
+    span.set_attribute("workflow.id", result.workflow_id)
+    span.set_attribute("workflow.success", result.success)
+    if not result.success:
+        # Concurrent steps may finish after the failed one: find it
+        failed = next((step for step in result.steps if not step.success), None)
+        message = failed.error_message if failed is not None else None
+        span.set_error(message or "failed")
 
 
 class WorkflowOrchestrator:
     """Orchestrates the complete DAVAI workflow."""
 
+    # Agents are built lazily with the appropriate configuration
+    question_agent = _LazyAgent(QuestionGeneratorAgent, "json_config")  # Needs JSON
+    suggestion_agent = _LazyAgent(SuggestionAgent, "json_config")  # Needs JSON
+    context_agent = _LazyAgent(ContextAgent, "text_config")
+    architecture_agent = _LazyAgent(ArchitectureAgent, "text_config")
+    tech_stack_agent = _LazyAgent(TechStackAgent, "text_config")
+    task_breakdown_agent = _LazyAgent(TaskBreakdownAgent, "text_config")
+    project_rules_agent = _LazyAgent(ProjectRulesAgent, "text_config")
+    claude_guide_agent = _LazyAgent(ClaudeGuideAgent, "text_config")
+    readme_agent = _LazyAgent(ReadmeAgent, "text_config")
+    project_brief_agent = _LazyAgent(ProjectBriefAgent, "json_config")  # Needs JSON
+
     def __init__(self, llm_config: LlmConfig = None):
         """
         Initialize the workflow orchestrator.
 
+        Agents and their LLM clients are created on first use; clients are
+        shared between agents with the same configuration.
+
         Args:
             llm_config: Optional LLM configuration. Uses default if not provided.
         """
-        # Use different configurations for different purposes
-        self.json_config = get_json_config()  # GPT-4 for JSON responses
-        self.text_config = get_text_config()  # GPT-3.5-turbo for text generation
-
-        # Initialize agents with appropriate configurations
-        self.question_agent = QuestionGeneratorAgent(self.json_config)  # Needs JSON
-        self.suggestion_agent = SuggestionAgent(self.json_config)  # Needs JSON
-        self.context_agent = ContextAgent(self.text_config)  # Text generation
-        self.architecture_agent = ArchitectureAgent(self.text_config)  # Text generation
-        self.tech_stack_agent = TechStackAgent(self.text_config)  # Text generation
-        self.task_breakdown_agent = TaskBreakdownAgent(
-            self.text_config
-        )  # Text generation
-        self.project_rules_agent = ProjectRulesAgent(
-            self.text_config
-        )  # Text generation
-        self.claude_guide_agent = ClaudeGuideAgent(self.text_config)  # Text generation
-        self.readme_agent = ReadmeAgent(self.text_config)  # Text generation
+        # Use different configurations for different purposes: GPT-4 for JSON
+        # responses, GPT-3.5-turbo for text generation
+        provider = settings.llm_provider
+        self.json_config = get_json_config(provider)
+        self.text_config = get_text_config(provider)
 
         # Initialize output directory
         self.output_dir = settings.temp_storage_path / "generated_docs"
@@ -143,445 +317,783 @@ class WorkflowOrchestrator:
         logger.info("Generating README documentation")
         return await self.readme_agent.run(project_data)
 
+    async def generate_project_brief(self, project_data: ProjectData) -> Dict[str, str]:
+        """Generate the compact project brief."""
+        logger.info("Generating project brief")
+        return await self.project_brief_agent.run(project_data)
+
     async def generate_all_documentation(
-        self, project_idea: str, questions: List[str], answers: List[str]
+        self,
+        project_idea: str,
+        questions: List[str],
+        answers: List[str],
+        dependency_profile: Optional[str] = None,
+        use_project_brief: Optional[bool] = None,
     ) -> Documentation:
         """
-        Generate complete project documentation using all agents in proper dependency order.
+        Generate complete project documentation using all agents in dependency order.
 
-        Workflow Dependencies:
-        1. Context (standalone)
-        2. Architecture (depends on Context)
-        3. Tech Stack (depends on Context + Architecture)
-        4. Task Breakdown (depends on Context + Architecture + Tech Stack)
-        5. Project Rules (depends on all previous outputs)
-        6. Claude Guide (depends on all previous outputs)
-        7. README (depends on all previous outputs)
+        Agents are scheduled from the dependency graph of the selected profile
+        (see services.workflow_graph): each agent starts as soon as the documents
+        it consumes are available, so independent agents run concurrently.
 
         Args:
             project_idea: Original project idea
             questions: List of clarifying questions
             answers: User answers to the questions
+            dependency_profile: Dependency profile name. Uses the configured default
+                if not provided.
+            use_project_brief: Whether later agents receive a compact project brief
+                instead of the full core documents. Uses the configured default
+                if not provided.
 
         Returns:
             Generated documentation
         """
-        logger.info("Generating complete project documentation with dependency chain")
+        logger.info("Generating complete project documentation with dependency graph")
 
         if len(questions) != len(answers):
             raise ValueError("Number of questions and answers must match")
 
+        nodes = self.resolve_workflow_graph(dependency_profile, use_project_brief)
         project_data = ProjectData(
             project_idea=project_idea, questions=questions, answers=answers
         )
 
-        all_documents = {}
+        all_documents = await self.run_documentation_graph(project_data, nodes)
 
-        # Step 1: Generate context (no dependencies)
-        logger.info("Step 1: Generating context documentation")
-        context_docs = await self.generate_context(project_data)
-        all_documents.update(context_docs)
+        logger.info(f"Generated {len(all_documents)} documentation files")
+        return Documentation(documents=all_documents)
 
-        # Step 2: Generate architecture (depends on context)
-        logger.info("Step 2: Generating architecture documentation (with context)")
-        enhanced_project_data = self.enhance_project_data_with_context(
-            project_data, context_docs
-        )
-        architecture_docs = await self.generate_architecture(enhanced_project_data)
-        all_documents.update(architecture_docs)
+    def resolve_workflow_graph(
+        self,
+        dependency_profile: Optional[str] = None,
+        use_project_brief: Optional[bool] = None,
+    ) -> Tuple[WorkflowNode, ...]:
+        """
+        Get the workflow graph for the requested options, falling back to settings.
 
-        # Step 3: Generate tech stack (depends on context + architecture)
-        logger.info(
-            "Step 3: Generating tech stack documentation (with context + architecture)"
-        )
-        enhanced_project_data = self.enhance_project_data_with_docs(
-            project_data, {"context": context_docs, "architecture": architecture_docs}
-        )
-        tech_stack_docs = await self.generate_tech_stack(enhanced_project_data)
-        all_documents.update(tech_stack_docs)
+        Args:
+            dependency_profile: Dependency profile name
+            use_project_brief: Whether to insert the project brief stage
 
-        # Step 4: Generate task breakdown (depends on context + architecture + tech stack)
-        logger.info(
-            "Step 4: Generating task breakdown (with context + architecture + tech stack)"
-        )
-        enhanced_project_data = self.enhance_project_data_with_docs(
-            project_data,
-            {
-                "context": context_docs,
-                "architecture": architecture_docs,
-                "tech_stack": tech_stack_docs,
-            },
-        )
-        task_breakdown_docs = await self.generate_task_breakdown(enhanced_project_data)
-        all_documents.update(task_breakdown_docs)
-
-        # Step 5: Generate project rules (depends on all previous)
-        logger.info("Step 5: Generating project rules (with all previous outputs)")
-        enhanced_project_data = self.enhance_project_data_with_docs(
-            project_data,
-            {
-                "context": context_docs,
-                "architecture": architecture_docs,
-                "tech_stack": tech_stack_docs,
-                "task_breakdown": task_breakdown_docs,
-            },
+        Returns:
+            Workflow graph nodes in topological order
+        """
+        return get_workflow_graph(
+            dependency_profile or settings.workflow_dependency_profile,
+            (
+                settings.workflow_project_brief
+                if use_project_brief is None
+                else use_project_brief
+            ),
         )
-        project_rules_docs = await self.generate_project_rules(enhanced_project_data)
-        all_documents.update(project_rules_docs)
-
-        # Step 6: Generate Claude guide (depends on all previous)
-        logger.info("Step 6: Generating Claude guide (with all previous outputs)")
-        enhanced_project_data = self.enhance_project_data_with_docs(
-            project_data,
-            {
-                "context": context_docs,
-                "architecture": architecture_docs,
-                "tech_stack": tech_stack_docs,
-                "task_breakdown": task_breakdown_docs,
-                "project_rules": project_rules_docs,
-            },
+
+    async def run_documentation_graph(
+        self,
+        project_data: ProjectData,
+        nodes: Tuple[WorkflowNode, ...],
+        recorder: Optional["_StepRecorder"] = None,
+        checkpoint: Optional[WorkflowCheckpoint] = None,
+        previous: Optional[WorkflowCheckpoint] = None,
+        rerun: Sequence[str] = (),
+    ) -> Dict[str, str]:
+        """
+        Run the documentation agents of a workflow graph.
+
+        Every node's inputs are fingerprinted (see _fingerprint_node) and the
+        fingerprint is checkpointed with its documents.
+
+        Args:
+            project_data: Base project data (idea, questions and answers)
+            nodes: Workflow graph nodes in topological order
+            recorder: Optional step recorder of the enclosing workflow run
+            checkpoint: Optional checkpoint receiving every completed node's
+                documents. Nodes already checkpointed are restored instead of
+                being run again.
+            previous: Optional checkpoint of an earlier workflow whose
+                documents are reused by the nodes with the same fingerprint
+            rerun: Names of nodes never reused from the previous workflow
+
+        Returns:
+            All generated documents in graph order, excluding internal stages
+            such as the project brief
+        """
+        recorder = recorder or _StepRecorder()
+        graph_offset = recorder.elapsed()
+        produced: Dict[str, Dict[str, str]] = {}
+        llm_calls: Dict[str, List[LlmCall]] = {}
+        # Step input and output notes of a regeneration, by node name
+        notes: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        reusable: Dict[str, Dict[str, str]] = {}
+        if previous is not None:
+            reusable = await previous.completed_steps()
+
+        if checkpoint is not None:
+            node_names = {node.name for node in nodes}
+            produced = {
+                name: documents
+                for name, documents in (await checkpoint.completed_steps()).items()
+                if name in node_names
+            }
+            for node in nodes:
+                if node.name in produced:
+                    logger.info(
+                        f"Workflow step {node.step_name} restored from checkpoint"
+                    )
+                    recorder.add(
+                        WorkflowStep(
+                            step_name=node.step_name,
+                            input_data={"checkpoint": checkpoint.workflow_id},
+                            output_data={
+                                "documents": list(produced[node.name].keys()),
+                                "restored": True,
+                            },
+                            success=True,
+                            started_at=graph_offset,
+                            duration=0.0,
+                        )
+                    )
+
+        def record_step(node: WorkflowNode, run: NodeRun) -> None:
+            input_notes, output_notes = notes.pop(node.name, ({}, {}))
+            recorder.add(
+                WorkflowStep(
+                    step_name=node.step_name,
+                    input_data=(
+                        {"dependencies": list(node.depends_on), **run.metadata}
+                        if node.depends_on
+                        else {"project_data": "project_idea + questions + answers"}
+                    )
+                    | input_notes,
+                    output_data={"documents": list(run.documents.keys())}
+                    | output_notes,
+                    success=True,
+                    started_at=graph_offset + run.started_at,
+                    duration=run.duration,
+                    **summarize_llm_calls(llm_calls.pop(node.name, [])),
+                )
+            )
+
+        def record_failure(
+            node: WorkflowNode, error: BaseException, duration: float
+        ) -> None:
+            notes.pop(node.name, None)
+            recorder.add(
+                WorkflowStep(
+                    step_name=node.step_name,
+                    input_data={"dependencies": list(node.depends_on)},
+                    output_data={},
+                    success=False,
+                    error_message=str(error),
+                    started_at=recorder.elapsed() - duration,
+                    duration=duration,
+                    **summarize_llm_calls(llm_calls.pop(node.name, [])),
+                )
+            )
+
+        async def run_node(
+            node: WorkflowNode, upstream: Dict[str, Dict[str, str]]
+        ) -> NodeRun:
+            logger.info(
+                f"Workflow step {node.step_name} "
+                f"(dependencies: {', '.join(node.depends_on) or 'none'})"
+            )
+            generate = getattr(self, node.step_name)
+            agent = getattr(self, f"{node.name}_agent")
+            with recorder.instrument(node.step_name) as calls:
+                # Kept for the step report should the node fail
+                llm_calls[node.name] = calls
+                with start_span("workflow.build_input") as span:
+                    node_input, report = self.build_node_input(project_data, upstream)
+                    report["input_tokens"] = self._estimate_input_tokens(node_input)
+
+                    if BRIEF_NODE.name in upstream:
+                        # Size of the same prompt had the full core documents
+                        # been used
+                        full_upstream = {
+                            dep: produced[dep] for dep in BRIEF_NODE.depends_on
+                        } | {
+                            dep: docs
+                            for dep, docs in upstream.items()
+                            if dep != BRIEF_NODE.name
+                        }
+                        full_input, _ = self.build_node_input(
+                            project_data, full_upstream
+                        )
+                        report["input_tokens_without_brief"] = (
+                            self._estimate_input_tokens(full_input)
+                        )
+                    span.set_attribute("workflow.input_tokens", report["input_tokens"])
+                    fingerprint = self._fingerprint_node(
+                        agent, node_input, project_data, upstream
+                    )
+
+                prior = previous.fingerprints.get(node.name) if previous else None
+                if (
+                    previous is not None
+                    and prior is not None
+                    and node.name in reusable
+                    and node.name not in rerun
+                    and prior["fingerprint"] == fingerprint["fingerprint"]
+                ):
+                    logger.info(
+                        f"Workflow step {node.step_name} reused from "
+                        f"workflow {previous.workflow_id}"
+                    )
+                    documents = reusable[node.name]
+                    fingerprint["usage"] = prior.get("usage", {})
+                    notes[node.name] = (
+                        {"fingerprint": fingerprint["fingerprint"]},
+                        {
+                            "reused_from": previous.workflow_id,
+                            "saved": fingerprint["usage"],
+                        },
+                    )
+                else:
+                    started = time.perf_counter()
+                    # A forced rerun asks for new documents, not the cached ones
+                    with response_cache.bypass(node.name in rerun):
+                        documents = await generate(node_input)
+                    usage = summarize_llm_calls(calls)
+                    fingerprint["usage"] = {
+                        "duration": round(time.perf_counter() - started, 3),
+                        "prompt_tokens": usage.get("prompt_tokens", 0),
+                        "completion_tokens": usage.get("completion_tokens", 0),
+                        "cost": usage.get("cost", 0.0),
+                    }
+                    if previous is not None:
+                        changed = (
+                            ["rerun"]
+                            if node.name in rerun
+                            else self._changed_inputs(prior, fingerprint)
+                        )
+                        notes[node.name] = ({"changed": changed}, {})
+            produced[node.name] = documents
+            if checkpoint is not None:
+                await checkpoint.save_step(node.name, documents, fingerprint)
+            return NodeRun(documents=documents, metadata=report)
+
+        await WorkflowScheduler(nodes).run(
+            run_node,
+            completed=dict(produced),
+            on_complete=record_step,
+            on_start=lambda node: recorder.start(node.step_name),
+            on_error=record_failure,
         )
-        claude_guide_docs = await self.generate_claude_guide(enhanced_project_data)
-        all_documents.update(claude_guide_docs)
-
-        # Step 7: Generate README (depends on all previous)
-        logger.info("Step 7: Generating README (with all previous outputs)")
-        enhanced_project_data = self.enhance_project_data_with_docs(
-            project_data,
-            {
-                "context": context_docs,
-                "architecture": architecture_docs,
-                "tech_stack": tech_stack_docs,
-                "task_breakdown": task_breakdown_docs,
-                "project_rules": project_rules_docs,
-                "claude_guide": claude_guide_docs,
-            },
+
+        all_documents = {}
+        for node in nodes:
+            if node.name not in INTERNAL_NODES:
+                all_documents.update(produced[node.name])
+        return all_documents
+
+    @staticmethod
+    def _fingerprint_node(
+        agent: BaseAgent,
+        node_input: ProjectData,
+        project_data: ProjectData,
+        upstream: Dict[str, Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """
+        Fingerprint the inputs of a documentation node.
+
+        Args:
+            agent: Agent of the node
+            node_input: Agent input built from the project data and upstream
+            project_data: Base project data (idea, questions and answers)
+            upstream: Upstream documents by category
+
+        Returns:
+            The agent's prompt fingerprint, which decides whether the node's
+            documents can be reused, and digests of its parts, which tell what
+            changed when they cannot
+        """
+        return {
+            "fingerprint": agent.fingerprint(node_input),
+            "project_data": value_digest(project_data.model_dump()),
+            "upstream": {dep: value_digest(docs) for dep, docs in upstream.items()},
+            "prompt": value_digest(agent.get_system_prompt()),
+            "model": f"{agent.llm_config.provider.lower()}/{agent.llm_config.model}",
+        }
+
+    @staticmethod
+    def _changed_inputs(
+        prior: Optional[Dict[str, Any]], fingerprint: Dict[str, Any]
+    ) -> List[str]:
+        """List the inputs of a node that differ from its previous fingerprint."""
+        if prior is None:
+            return ["new"]
+        changed = [
+            part
+            for part in ("project_data", "prompt", "model")
+            if prior.get(part) != fingerprint[part]
+        ]
+        prior_upstream = prior.get("upstream") or {}
+        changed += [
+            f"upstream:{dep}"
+            for dep, digest in fingerprint["upstream"].items()
+            if prior_upstream.get(dep) != digest
+        ]
+        # Otherwise the prompt template or context budget changed
+        return changed or ["input"]
+
+    @staticmethod
+    def _estimate_input_tokens(project_data: ProjectData) -> int:
+        """Estimate the prompt tokens contributed by an agent's project data."""
+        return estimate_tokens(project_data.project_idea) + sum(
+            estimate_tokens(q) + estimate_tokens(a)
+            for q, a in zip(project_data.questions, project_data.answers)
         )
-        readme_docs = await self.generate_readme(enhanced_project_data)
-        all_documents.update(readme_docs)
 
-        logger.info(f"Generated {len(all_documents)} documentation files")
-        return Documentation(documents=all_documents)
+    def build_node_input(
+        self, project_data: ProjectData, upstream: Dict[str, Dict[str, str]]
+    ) -> Tuple[ProjectData, Dict]:
+        """
+        Build the input of a documentation agent from its upstream documents.
+
+        Args:
+            project_data: Base project data
+            upstream: Upstream documents by category
+
+        Returns:
+            Project data enhanced with the upstream documents, and a report of
+            the estimated tokens each upstream category contributed
+        """
+        if not upstream:
+            return project_data, {}
+        if list(upstream) == ["context"]:
+            enhanced = self.enhance_project_data_with_context(
+                project_data, upstream["context"]
+            )
+            tokens = sum(estimate_tokens(doc) for doc in upstream["context"].values())
+            return enhanced, {"context_tokens": {"context": tokens}}
+
+        built = self.build_docs_context(project_data, upstream)
+        enhanced = ProjectData(
+            project_idea=built.text,
+            questions=project_data.questions,
+            answers=project_data.answers,
+        )
+        return enhanced, {
+            "context_tokens": built.doc_tokens,
+            "context_trimmed": built.trimmed,
+        }
 
     async def run_complete_workflow(
-        self, project_idea: str, answers: List[str], include_suggestions: bool = False
+        self,
+        project_idea: str,
+        answers: List[str],
+        include_suggestions: bool = False,
+        dependency_profile: Optional[str] = None,
+        regenerate: bool = False,
+        use_project_brief: Optional[bool] = None,
+        on_event: Optional[WorkflowEventCallback] = None,
+        stream_tokens: bool = False,
     ) -> WorkflowResult:
         """
         Run the complete workflow with proper agent dependencies.
 
         Workflow Steps:
         1. Generate clarifying questions
-        2. [Optional] Generate suggestions (if include_suggestions=True)
-        3. Generate context (standalone)
-        4. Generate architecture (with context)
-        5. Generate tech stack (with context + architecture)
-        6. Generate task breakdown (with context + architecture + tech stack)
-        7. Generate project rules (with all previous)
-        8. Generate Claude guide (with all previous)
-        9. Generate README (with all previous)
+        2. [Optional] Generate suggestions (if include_suggestions=True),
+           concurrently with the documentation agents
+        3. Generate documentation following the dependency graph of the
+           selected profile. With the "strict" profile every agent consumes all
+           previous outputs; with "relaxed", task breakdown, project rules,
+           Claude guide and README run in parallel once context, architecture
+           and tech stack are done.
+
+        Every step records its start offset and wall-clock duration. The
+        output of every completed step is checkpointed under the workflow id
+        returned in the result, so a failed run can be resumed with
+        resume_workflow.
 
         Args:
             project_idea: Brief description of the project
             answers: User answers to clarifying questions
             include_suggestions: Whether to include suggestion generation step
+            dependency_profile: Dependency profile name. Uses the configured default
+                if not provided.
+            regenerate: Bypass the response cache for every LLM call
+            use_project_brief: Whether later agents receive a compact project brief
+                distilled from context, architecture and tech stack instead of
+                the full documents. Uses the configured default if not provided.
+            on_event: Optional progress callback receiving ("step_start",
+                {"step_name", "started_at"}) and ("step_end", {"step"}) events
+            stream_tokens: Also stream LLM tokens to on_event as ("token",
+                {"step_name", "token"}) events
 
         Returns:
             Complete workflow result with detailed steps
         """
-        start_time = time.time()
-        steps = []
-
-        try:
-            # Step 1: Generate questions
-            logger.info("Workflow Step 1: Generating clarifying questions")
-            questions = await self.generate_questions(project_idea)
-
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_questions",
-                    input_data={"project_idea": project_idea},
-                    output_data={"questions": questions.questions},
-                    success=True,
-                )
+        recorder = _StepRecorder(on_event, stream_tokens)
+        with start_span("workflow.run") as span, response_cache.bypass(regenerate):
+            result = await self._run_complete_workflow(
+                project_idea,
+                answers,
+                include_suggestions,
+                dependency_profile or settings.workflow_dependency_profile,
+                (
+                    settings.workflow_project_brief
+                    if use_project_brief is None
+                    else use_project_brief
+                ),
+                recorder,
             )
+            _trace_result(span, result)
+        observe_workflow(result.total_duration, result.success)
+        return result
 
-            # Step 2: Generate suggestions (optional)
-            suggestions = None
-            if include_suggestions:
-                logger.info("Workflow Step 2: Generating suggested answers")
-                suggestion_input = SuggestionInput(
-                    project_idea=project_idea, questions=questions.questions
-                )
-                suggestions = await self.generate_suggestions(suggestion_input)
+    async def get_checkpoint(self, workflow_id: str) -> Optional[WorkflowCheckpoint]:
+        """
+        Get the checkpoint of a workflow run.
 
-                steps.append(
-                    WorkflowStep(
-                        step_name="generate_suggestions",
-                        input_data={
-                            "project_idea": project_idea,
-                            "questions": questions.questions,
-                        },
-                        output_data={
-                            "suggested_answers": suggestions.suggested_answers,
-                            "reasoning": suggestions.reasoning,
-                        },
-                        success=True,
-                    )
-                )
+        Args:
+            workflow_id: Workflow identifier
 
-            # Create base project data
-            project_data = ProjectData(
-                project_idea=project_idea,
-                questions=questions.questions,
-                answers=answers,
-            )
+        Returns:
+            The checkpoint, or None if it does not exist
+        """
+        return await WorkflowCheckpoint.load(self.output_dir, workflow_id)
+
+    async def resume_workflow(
+        self,
+        checkpoint: WorkflowCheckpoint,
+        regenerate: bool = False,
+        on_event: Optional[WorkflowEventCallback] = None,
+        stream_tokens: bool = False,
+    ) -> WorkflowResult:
+        """
+        Resume a checkpointed workflow.
 
-            all_documents = {}
+        Completed steps are restored from the checkpoint; only the failed step,
+        the steps depending on it and the steps that never ran are executed.
 
-            # Step 3: Generate context (no dependencies)
-            step_num = 3 if include_suggestions else 2
-            logger.info(f"Workflow Step {step_num}: Generating context documentation")
-            context_docs = await self.generate_context(project_data)
-            all_documents.update(context_docs)
+        Args:
+            checkpoint: Checkpoint of the workflow to resume
+            regenerate: Bypass the response cache for every LLM call
+            on_event: Optional progress callback (see run_complete_workflow)
+            stream_tokens: Also stream LLM tokens to on_event
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_context",
-                    input_data={"project_data": "project_idea + questions + answers"},
-                    output_data={"documents": list(context_docs.keys())},
-                    success=True,
-                )
+        Returns:
+            Complete workflow result with detailed steps
+        """
+        logger.info(
+            f"Resuming workflow {checkpoint.workflow_id} "
+            f"(failed step: {checkpoint.metadata.get('failed_step') or 'unknown'})"
+        )
+        request = checkpoint.request
+        recorder = _StepRecorder(on_event, stream_tokens)
+        # A regeneration keeps reusing the documents of its previous workflow
+        previous = None
+        if request.get("regenerated_from"):
+            previous = await self.get_checkpoint(request["regenerated_from"])
+        await checkpoint.mark("running")
+        with start_span("workflow.resume") as span, response_cache.bypass(regenerate):
+            result = await self._run_complete_workflow(
+                checkpoint.metadata["project_idea"],
+                request["answers"],
+                request["include_suggestions"],
+                request["dependency_profile"],
+                request["use_project_brief"],
+                recorder,
+                checkpoint,
+                previous,
+                request.get("rerun", ()),
             )
+            _trace_result(span, result)
+        observe_workflow(result.total_duration, result.success)
+        if previous is not None:
+            result.regeneration = self._regeneration_report(previous, result)
+        return result
+
+    async def regenerate_workflow(
+        self,
+        previous: WorkflowCheckpoint,
+        project_idea: Optional[str] = None,
+        answers: Optional[List[str]] = None,
+        rerun: Sequence[str] = (),
+        regenerate: bool = False,
+        on_event: Optional[WorkflowEventCallback] = None,
+        stream_tokens: bool = False,
+    ) -> WorkflowResult:
+        """
+        Regenerate a workflow after some of its inputs changed.
 
-            # Step 3: Generate architecture (with context)
-            logger.info("Workflow Step 3: Generating architecture (with context)")
-            enhanced_project_data = self.enhance_project_data_with_context(
-                project_data, context_docs
-            )
-            architecture_docs = await self.generate_architecture(enhanced_project_data)
-            all_documents.update(architecture_docs)
+        The new run keeps the previous clarifying questions and options. Each
+        documentation step whose fingerprint (project idea, questions and
+        answers, upstream documents, system prompt and model) matches the
+        previous run reuses its documents; the others run again, and so do
+        their dependents whenever their upstream documents change. The
+        result reports the reused steps and the time, tokens and cost they
+        took in the previous run.
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_architecture",
-                    input_data={"dependencies": ["context"]},
-                    output_data={"documents": list(architecture_docs.keys())},
-                    success=True,
-                )
-            )
+        Args:
+            previous: Checkpoint of the workflow to regenerate
+            project_idea: New project idea; the previous one by default
+            answers: New answers to the previous questions; the previous
+                ones by default
+            rerun: Steps to run again even if their inputs did not change
+            regenerate: Bypass the response cache for the steps that run
+            on_event: Optional progress callback (see run_complete_workflow)
+            stream_tokens: Also stream LLM tokens to on_event
 
-            # Step 4: Generate tech stack (with context + architecture)
-            logger.info(
-                "Workflow Step 4: Generating tech stack (with context + architecture)"
-            )
-            enhanced_project_data = self.enhance_project_data_with_docs(
-                project_data,
-                {"context": context_docs, "architecture": architecture_docs},
-            )
-            tech_stack_docs = await self.generate_tech_stack(enhanced_project_data)
-            all_documents.update(tech_stack_docs)
+        Returns:
+            Complete workflow result of the new run, with its regeneration
+            report
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_tech_stack",
-                    input_data={"dependencies": ["context", "architecture"]},
-                    output_data={"documents": list(tech_stack_docs.keys())},
-                    success=True,
+        Raises:
+            ValueError: If a rerun step is not part of the workflow graph, or
+                the answers do not match the previous questions
+        """
+        request = dict(previous.request)
+        nodes = self.resolve_workflow_graph(
+            request["dependency_profile"], request["use_project_brief"]
+        )
+        unknown = set(rerun) - {node.name for node in nodes}
+        if unknown:
+            raise ValueError(f"Unknown workflow steps: {', '.join(sorted(unknown))}")
+        if answers is not None:
+            if previous.questions is not None and len(answers) != len(
+                previous.questions
+            ):
+                raise ValueError(
+                    f"Expected {len(previous.questions)} answers, got {len(answers)}"
                 )
+            request["answers"] = answers
+        request["regenerated_from"] = previous.workflow_id
+        request["rerun"] = list(rerun)
+        project_idea = project_idea or previous.metadata["project_idea"]
+
+        logger.info(f"Regenerating workflow {previous.workflow_id}")
+        recorder = _StepRecorder(on_event, stream_tokens)
+        with (
+            start_span("workflow.regenerate") as span,
+            response_cache.bypass(regenerate),
+        ):
+            span.set_attribute("workflow.regenerated_from", previous.workflow_id)
+            checkpoint = await WorkflowCheckpoint.create(
+                self.output_dir, project_idea, request
             )
-
-            # Step 5: Generate task breakdown (with context + architecture + tech stack)
-            logger.info(
-                "Workflow Step 5: Generating task breakdown (with context + architecture + tech stack)"
-            )
-            enhanced_project_data = self.enhance_project_data_with_docs(
-                project_data,
-                {
-                    "context": context_docs,
-                    "architecture": architecture_docs,
-                    "tech_stack": tech_stack_docs,
-                },
+            if previous.questions is not None:
+                await checkpoint.save_questions(previous.questions)
+            result = await self._run_complete_workflow(
+                project_idea,
+                request["answers"],
+                request["include_suggestions"],
+                request["dependency_profile"],
+                request["use_project_brief"],
+                recorder,
+                checkpoint,
+                previous,
+                rerun,
             )
-            task_breakdown_docs = await self.generate_task_breakdown(
-                enhanced_project_data
-            )
-            all_documents.update(task_breakdown_docs)
+            _trace_result(span, result)
+        observe_workflow(result.total_duration, result.success)
+        result.regeneration = self._regeneration_report(previous, result)
+        return result
+
+    @staticmethod
+    def _regeneration_report(
+        previous: WorkflowCheckpoint, result: WorkflowResult
+    ) -> RegenerationReport:
+        """Summarize the documentation steps a regeneration reused and reran."""
+        reused: List[str] = []
+        rerun: Dict[str, List[str]] = {}
+        saved_tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+        saved_seconds = saved_cost = 0.0
+        for step in result.steps:
+            if "reused_from" in step.output_data:
+                reused.append(step.step_name)
+                usage = step.output_data["saved"]
+                for key in saved_tokens:
+                    saved_tokens[key] += usage.get(key, 0)
+                saved_seconds += usage.get("duration", 0.0)
+                saved_cost += usage.get("cost", 0.0)
+            elif "changed" in step.input_data:
+                rerun[step.step_name] = step.input_data["changed"]
+        return RegenerationReport(
+            regenerated_from=previous.workflow_id,
+            reused_steps=reused,
+            rerun_steps=rerun,
+            saved_seconds=round(saved_seconds, 3),
+            saved_prompt_tokens=saved_tokens["prompt_tokens"],
+            saved_completion_tokens=saved_tokens["completion_tokens"],
+            saved_cost=round(saved_cost, 6),
+        )
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_task_breakdown",
-                    input_data={
-                        "dependencies": ["context", "architecture", "tech_stack"]
+    async def _run_complete_workflow(
+        self,
+        project_idea: str,
+        answers: List[str],
+        include_suggestions: bool,
+        dependency_profile: str,
+        use_project_brief: bool,
+        recorder: "_StepRecorder",
+        checkpoint: Optional[WorkflowCheckpoint] = None,
+        previous: Optional[WorkflowCheckpoint] = None,
+        rerun: Sequence[str] = (),
+    ) -> WorkflowResult:
+        """
+        Run the complete workflow (see run_complete_workflow), reusing the
+        unchanged steps of a previous workflow if given (see
+        regenerate_workflow).
+        """
+        try:
+            nodes = self.resolve_workflow_graph(dependency_profile, use_project_brief)
+            if checkpoint is None:
+                checkpoint = await WorkflowCheckpoint.create(
+                    self.output_dir,
+                    project_idea,
+                    {
+                        "answers": answers,
+                        "include_suggestions": include_suggestions,
+                        "dependency_profile": dependency_profile,
+                        "use_project_brief": use_project_brief,
                     },
-                    output_data={"documents": list(task_breakdown_docs.keys())},
-                    success=True,
                 )
-            )
-
-            # Step 6: Generate project rules (with all previous)
-            logger.info(
-                "Workflow Step 6: Generating project rules (with all previous outputs)"
-            )
-            enhanced_project_data = self.enhance_project_data_with_docs(
-                project_data,
-                {
-                    "context": context_docs,
-                    "architecture": architecture_docs,
-                    "tech_stack": tech_stack_docs,
-                    "task_breakdown": task_breakdown_docs,
-                },
-            )
-            project_rules_docs = await self.generate_project_rules(
-                enhanced_project_data
-            )
-            all_documents.update(project_rules_docs)
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_project_rules",
-                    input_data={
-                        "dependencies": [
-                            "context",
-                            "architecture",
-                            "tech_stack",
-                            "task_breakdown",
-                        ]
-                    },
-                    output_data={"documents": list(project_rules_docs.keys())},
-                    success=True,
+            # Step 1: Generate questions
+            if checkpoint.questions is not None:
+                questions = Questions(questions=checkpoint.questions)
+                recorder.add(
+                    WorkflowStep(
+                        step_name="generate_questions",
+                        input_data={"checkpoint": checkpoint.workflow_id},
+                        output_data={
+                            "questions": questions.questions,
+                            "restored": True,
+                        },
+                        success=True,
+                        started_at=recorder.elapsed(),
+                        duration=0.0,
+                    )
                 )
-            )
-
-            # Step 7: Generate Claude guide (with all previous)
-            logger.info(
-                "Workflow Step 7: Generating Claude guide (with all previous outputs)"
-            )
-            enhanced_project_data = self.enhance_project_data_with_docs(
-                project_data,
-                {
-                    "context": context_docs,
-                    "architecture": architecture_docs,
-                    "tech_stack": tech_stack_docs,
-                    "task_breakdown": task_breakdown_docs,
-                    "project_rules": project_rules_docs,
-                },
-            )
-            claude_guide_docs = await self.generate_claude_guide(enhanced_project_data)
-            all_documents.update(claude_guide_docs)
-
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_claude_guide",
-                    input_data={
-                        "dependencies": [
-                            "context",
-                            "architecture",
-                            "tech_stack",
-                            "task_breakdown",
-                            "project_rules",
-                        ]
-                    },
-                    output_data={"documents": list(claude_guide_docs.keys())},
-                    success=True,
+            else:
+                logger.info("Workflow Step 1: Generating clarifying questions")
+                step_start = recorder.start("generate_questions")
+                with recorder.instrument("generate_questions") as calls:
+                    questions = await self.generate_questions(project_idea)
+                await checkpoint.save_questions(questions.questions)
+
+                recorder.add(
+                    WorkflowStep(
+                        step_name="generate_questions",
+                        input_data={"project_idea": project_idea},
+                        output_data={"questions": questions.questions},
+                        success=True,
+                        started_at=step_start,
+                        duration=recorder.elapsed() - step_start,
+                        **summarize_llm_calls(calls),
+                    )
                 )
-            )
 
-            # Step 8: Generate README (with all previous)
-            logger.info(
-                "Workflow Step 8: Generating README (with all previous outputs)"
-            )
-            enhanced_project_data = self.enhance_project_data_with_docs(
-                project_data,
-                {
-                    "context": context_docs,
-                    "architecture": architecture_docs,
-                    "tech_stack": tech_stack_docs,
-                    "task_breakdown": task_breakdown_docs,
-                    "project_rules": project_rules_docs,
-                    "claude_guide": claude_guide_docs,
-                },
+            # Create base project data
+            project_data = ProjectData(
+                project_idea=project_idea,
+                questions=questions.questions,
+                answers=answers,
             )
-            readme_docs = await self.generate_readme(enhanced_project_data)
-            all_documents.update(readme_docs)
 
-            steps.append(
-                WorkflowStep(
-                    step_name="generate_readme",
-                    input_data={
-                        "dependencies": [
-                            "context",
-                            "architecture",
-                            "tech_stack",
-                            "task_breakdown",
-                            "project_rules",
-                            "claude_guide",
-                        ]
-                    },
-                    output_data={"documents": list(readme_docs.keys())},
-                    success=True,
+            # Step 2 (optional) runs alongside the documentation graph since no
+            # documentation agent consumes the suggestions
+            tasks: List[Awaitable[Any]] = [
+                self.run_documentation_graph(
+                    project_data, nodes, recorder, checkpoint, previous, rerun
                 )
-            )
+            ]
+            if include_suggestions:
+                tasks.append(
+                    self._run_suggestion_step(
+                        project_idea, questions.questions, recorder
+                    )
+                )
+
+            results = await gather_or_cancel(*tasks)
+            all_documents = results[0]
 
             # Save all generated documentation to disk
             logger.info("Saving all generated documentation to disk")
-            output_path = self.save_documentation_to_disk(all_documents, project_idea)
-
-            total_duration = time.time() - start_time
+            with start_span("workflow.save"):
+                output_path = await self.save_documentation_to_disk(
+                    all_documents, project_idea, checkpoint
+                )
 
             return WorkflowResult(
                 project_idea=project_idea,
-                steps=steps,
+                workflow_id=checkpoint.workflow_id,
+                steps=recorder.steps,
                 final_documentation=all_documents,
                 success=True,
-                total_duration=total_duration,
+                total_duration=recorder.elapsed(),
             )
 
-        except ValueError as e:
-            logger.error(f"Workflow validation error: {e}")
-
-            # Add failed step
-            steps.append(
-                WorkflowStep(
-                    step_name="workflow_validation_failure",
-                    input_data={"project_idea": project_idea},
-                    output_data={},
-                    success=False,
-                    error_message=str(e),
-                )
+        except Exception as e:
+            # Agent and provider errors too: the checkpoint stays resumable
+            step_name, label = next(
+                (step_name, label)
+                for error_type, step_name, label in _FAILURE_STEPS
+                if isinstance(e, error_type)
             )
+            logger.error(f"Workflow {label} error: {e}")
 
-            total_duration = time.time() - start_time
+            # Add failed step, unless a workflow step already recorded it
+            if recorder.failed_step is None:
+                recorder.add(
+                    WorkflowStep(
+                        step_name=step_name,
+                        input_data={"project_idea": project_idea},
+                        output_data={},
+                        success=False,
+                        error_message=str(e),
+                    )
+                )
+            if checkpoint is not None:
+                await checkpoint.mark("failed", str(e), recorder.failed_step)
 
             return WorkflowResult(
                 project_idea=project_idea,
-                steps=steps,
+                workflow_id=checkpoint.workflow_id if checkpoint else None,
+                steps=recorder.steps,
                 final_documentation=None,
                 success=False,
-                total_duration=total_duration,
-            )
-        except RuntimeError as e:
-            logger.error(f"Workflow runtime error: {e}")
-
-            # Add failed step
-            steps.append(
-                WorkflowStep(
-                    step_name="workflow_runtime_failure",
-                    input_data={"project_idea": project_idea},
-                    output_data={},
-                    success=False,
-                    error_message=str(e),
-                )
+                total_duration=recorder.elapsed(),
             )
 
-            total_duration = time.time() - start_time
-
-            return WorkflowResult(
-                project_idea=project_idea,
-                steps=steps,
-                final_documentation=None,
-                success=False,
-                total_duration=total_duration,
+    async def _run_suggestion_step(
+        self,
+        project_idea: str,
+        questions: List[str],
+        recorder: "_StepRecorder",
+    ) -> Suggestions:
+        """Generate suggested answers and record the workflow step."""
+        logger.info("Workflow Step 2: Generating suggested answers")
+        step_start = recorder.start("generate_suggestions")
+        suggestion_input = SuggestionInput(
+            project_idea=project_idea, questions=questions
+        )
+        with recorder.instrument("generate_suggestions") as calls:
+            suggestions = await self.generate_suggestions(suggestion_input)
+
+        recorder.add(
+            WorkflowStep(
+                step_name="generate_suggestions",
+                input_data={
+                    "project_idea": project_idea,
+                    "questions": questions,
+                },
+                output_data={
+                    "suggested_answers": suggestions.suggested_answers,
+                    "reasoning": suggestions.reasoning,
+                },
+                success=True,
+                started_at=step_start,
+                duration=recorder.elapsed() - step_start,
+                **summarize_llm_calls(calls),
             )
+        )
+        return suggestions
 
     def enhance_project_data_with_context(
         self, project_data: ProjectData, context_docs: Dict[str, str]
@@ -622,49 +1134,72 @@ class WorkflowOrchestrator:
         Returns:
             Enhanced project data with all previous outputs included
         """
-        # Combine all previous documentation into context
-        combined_context = f"{project_data.project_idea}\n\n"
-
-        for doc_type, docs in previous_docs.items():
-            combined_context += f"\n=== {doc_type.upper()} DOCUMENTATION ===\n"
-            for filename, content in docs.items():
-                combined_context += f"\n--- {filename} ---\n{content}\n"
+        built = self.build_docs_context(project_data, previous_docs)
 
         return ProjectData(
-            project_idea=combined_context,
+            project_idea=built.text,
             questions=project_data.questions,
             answers=project_data.answers,
         )
 
-    def save_documentation_to_disk(
-        self, all_documents: Dict[str, str], project_idea: str = "project"
-    ):
+    def build_docs_context(
+        self, project_data: ProjectData, previous_docs: Dict[str, Dict[str, str]]
+    ) -> BuiltContext:
+        """
+        Combine the project idea with previous agent outputs within the token
+        budget of the text generation model.
+
+        Args:
+            project_data: Original project data
+            previous_docs: Dictionary of previous agent outputs by category
+
+        Returns:
+            Built context with the number of tokens each document contributed
+        """
+        qa_tokens = sum(
+            estimate_tokens(q) + estimate_tokens(a)
+            for q, a in zip(project_data.questions, project_data.answers)
+        )
+        builder = ContextBuilder.for_model(
+            self.text_config, settings.context_reserved_tokens + qa_tokens
+        )
+        built = builder.build(project_data.project_idea, previous_docs)
+
+        if built.trimmed:
+            logger.info(
+                f"Trimmed upstream documentation to {built.total_tokens} tokens "
+                f"(budget {built.token_budget}): {built.doc_tokens}"
+            )
+        return built
+
+    async def save_documentation_to_disk(
+        self,
+        all_documents: Dict[str, str],
+        project_idea: str = "project",
+        checkpoint: Optional[WorkflowCheckpoint] = None,
+    ) -> str:
         """
         Save all generated documentation to disk.
 
+        Documents are written concurrently and atomically without blocking
+        the event loop, to the configured document store (see
+        document_store.store_documents).
+
         Args:
             all_documents: Dictionary of all generated documents
             project_idea: Original project idea for folder naming
+            checkpoint: Optional checkpoint of the workflow run; its folder is
+                reused and the run is marked as completed
         """
-        # Create a sanitized folder name from project idea
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_name = "".join(
-            c for c in project_idea[:50] if c.isalnum() or c in (" ", "-", "_")
-        ).rstrip()
-        safe_name = safe_name.replace(" ", "_").lower()
-
-        # Use the configured output directory
-        project_dir = self.output_dir / f"{safe_name}_{timestamp}"
-        project_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save each document as a separate markdown file
-        for doc_name, content in all_documents.items():
-            # Ensure .md extension
-            filename = f"{doc_name}.md" if not doc_name.endswith(".md") else doc_name
-            file_path = project_dir / filename
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            logger.info(f"Saved document: {file_path}")
+        if checkpoint is not None:
+            project_dir = checkpoint.project_dir
+        else:
+            # Use the configured output directory
+            project_dir = self.output_dir / project_folder_name(project_idea)
+            await asyncio.to_thread(project_dir.mkdir, parents=True, exist_ok=True)
+
+        # Store the documents concurrently (blobs or markdown files)
+        manifest = await store_documents(project_dir, all_documents)
 
         # Save metadata file with summary of all documents
         metadata = {
@@ -674,10 +1209,21 @@ class WorkflowOrchestrator:
             "document_list": list(all_documents.keys()),
             "output_path": str(project_dir),
         }
-
-        metadata_path = project_dir / "metadata.json"
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        if manifest:
+            metadata["documents"] = manifest
+
+        if checkpoint is not None:
+            checkpoint.metadata.update(metadata, status="completed")
+            checkpoint.metadata.pop("error_message", None)
+            await checkpoint.save()
+        else:
+            await write_metadata(project_dir, metadata)
+
+        # Index the documents for full-text search
+        await project_catalog.record_documents(
+            project_dir,
+            {document_filename(name): doc for name, doc in all_documents.items()},
+        )
 
         logger.info(f"📁 All documentation saved to: {project_dir}")
         logger.info(
@@ -686,33 +1232,106 @@ class WorkflowOrchestrator:
 
         return str(project_dir)
 
-    def list_saved_projects(self) -> List[Dict[str, str]]:
+    async def list_saved_projects(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        sort: str = "generated_at",
+        descending: bool = True,
+        status: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
         """
-        List all saved projects with metadata.
+        List a page of saved projects from the project catalog.
+
+        Args:
+            offset: Number of projects to skip
+            limit: Maximum number of projects returned
+            sort: Sort column (see project_catalog.SORT_COLUMNS)
+            descending: Sort newest/largest first
+            status: Only list projects with this status
+            query: Only list projects whose idea contains this text
 
         Returns:
-            List of project metadata dictionaries
-        """
-        projects = []
-
-        if not self.output_dir.exists():
-            return projects
-
-        for project_folder in self.output_dir.iterdir():
-            if project_folder.is_dir():
-                metadata_file = project_folder / "metadata.json"
-                if metadata_file.exists():
-                    try:
-                        with open(metadata_file, "r", encoding="utf-8") as f:
-                            metadata = json.load(f)
-                        metadata["folder_name"] = project_folder.name
-                        metadata["folder_path"] = str(project_folder)
-                        projects.append(metadata)
-                    except Exception as e:
-                        logger.warning(
-                            f"Could not read metadata for {project_folder}: {e}"
-                        )
+            Number of matching projects and the page of project metadata
+        """
+        return await asyncio.to_thread(
+            project_catalog.list, offset, limit, sort, descending, status, query
+        )
+
+    async def search_documents(
+        self,
+        query: str,
+        doc_name: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Full-text search of the saved documents.
 
-        # Sort by generation time (newest first)
-        projects.sort(key=lambda x: x.get("generated_at", ""), reverse=True)
-        return projects
+        Args:
+            query: Search string (terms, "quoted phrases", prefix*)
+            doc_name: Only search documents with this file name
+            offset: Number of results to skip
+            limit: Maximum number of results returned
+
+        Returns:
+            Number of matching documents and the page of ranked results
+        """
+        return await asyncio.to_thread(
+            project_catalog.search, query, doc_name, offset, limit
+        )
+
+    async def saved_project_dir(self, folder_name: str) -> Optional[Path]:
+        """
+        Get the folder of a saved project.
+
+        Args:
+            folder_name: Project folder name
+
+        Returns:
+            Project folder, or None if the project does not exist
+        """
+        project = await asyncio.to_thread(project_catalog.get, folder_name)
+        if project is None:
+            return None
+        project_dir = Path(project["folder_path"])
+        if not await asyncio.to_thread(project_dir.is_dir):
+            return None
+        await asyncio.to_thread(project_catalog.touch, folder_name)
+        return project_dir
+
+    async def get_saved_project(
+        self, folder_name: str
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
+        """
+        Get a saved project and its documents.
+
+        Args:
+            folder_name: Project folder name
+
+        Returns:
+            Project metadata and markdown documents by name, or None if the
+            project does not exist
+        """
+        project = await asyncio.to_thread(project_catalog.get, folder_name)
+        if project is None:
+            return None
+
+        def read_files() -> Optional[Dict[str, str]]:
+            project_path = Path(project["folder_path"])
+            if not project_path.is_dir():
+                return None
+            return {
+                Path(filename).stem: content
+                for filename, content in read_documents(project_path, project).items()
+            }
+
+        files = await asyncio.to_thread(read_files)
+        if files is None:
+            # Deleted from disk since it was indexed
+            logger.warning(f"Saved project {folder_name} is missing, unindexing it")
+            await asyncio.to_thread(project_catalog.remove, folder_name)
+            return None
+        await asyncio.to_thread(project_catalog.touch, folder_name)
+        return project, files
@@ -0,0 +1,424 @@
+"""
+Workflow scheduler for DAVAI POC.
+
+Admits complete workflow runs and decides when they start. Every run belongs
+to a tenant and a priority class: interactive runs, whose client waits for
+the result, start before batch jobs. Within a class, tenants share the
+running slots by weighted fair queuing, so a tenant submitting hundreds of
+workflows mostly delays its own runs. Work beyond the queue limits is
+rejected with a suggested retry delay.
+
+Only tenants with queued or running work are tracked, and tenants without a
+configured weight share one "other" metrics label, so arbitrary tenant
+headers cannot grow memory or metric cardinality.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.metrics import registry
+
+# Priority classes, served in this order
+PRIORITY_CLASSES = ("interactive", "batch")
+
+DEFAULT_TENANT = "default"
+
+# Metrics label of the tenants without a configured weight
+OTHER_TENANT = "other"
+
+# Assumed workflow duration until one has been measured, in seconds
+DEFAULT_RUN_SECONDS = 30.0
+
+# Bounds of the suggested retry delay, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 600
+
+QUEUE_WAIT = registry.histogram(
+    "davai_workflow_queue_wait_seconds",
+    "Time workflows waited for a running slot, by tenant and priority class.",
+    ("tenant", "priority"),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+REJECTED = registry.counter(
+    "davai_workflow_rejected_total",
+    "Workflows rejected because their queue was full.",
+    ("tenant", "priority"),
+)
+
+
+class SchedulerFullError(RuntimeError):
+    """Raised when a workflow is rejected because its queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _TenantState:
+    """Queue counters of one tenant in one priority class."""
+
+    def __init__(self) -> None:
+        self.queued = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.started = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Virtual finish time of the tenant's last queued run
+        self.finish = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "started": self.started,
+            "wait_seconds_avg": (
+                round(self.wait_total / self.started, 3) if self.started else 0.0
+            ),
+            "wait_seconds_max": round(self.wait_max, 3),
+        }
+
+
+class Admission:
+    """
+    A workflow run admitted by the scheduler.
+
+    Entering it (async with) waits for the run's turn; leaving it frees the
+    running slot. An admission that is never entered must be cancelled.
+    """
+
+    def __init__(
+        self,
+        scheduler: "WorkflowScheduler",
+        tenant: str,
+        priority: str,
+        future: asyncio.Future,
+    ):
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.priority = priority
+        self.future = future
+        self.admitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.released = False
+
+    async def __aenter__(self) -> "Admission":
+        try:
+            await asyncio.shield(self.future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.cancel()
+
+    def cancel(self) -> None:
+        """Withdraw the run from its queue, or free its slot once started."""
+        if self.released:
+            return
+        self.released = True
+        if self.future.done():
+            self.scheduler._release(self)
+        else:
+            self.future.cancel()
+            self.scheduler._withdraw(self)
+
+
+class WorkflowScheduler:
+    """Weighted fair queue of workflow runs with interactive and batch classes."""
+
+    def __init__(
+        self,
+        max_running: int = 8,
+        max_batch_running: int = 2,
+        max_queued: Optional[Dict[str, int]] = None,
+        max_tenant_queued: int = 20,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_running: Workflows running at once, all classes together
+            max_batch_running: Batch workflows running at once
+            max_queued: Workflows waiting per priority class
+            max_tenant_queued: Workflows waiting per tenant and priority class
+            weights: Share of the running slots per tenant (1.0 by default)
+        """
+        self.max_running = max(max_running, 1)
+        self.max_batch_running = max(min(max_batch_running, self.max_running), 1)
+        self.max_queued = {"interactive": 50, "batch": 100, **(max_queued or {})}
+        self.max_tenant_queued = max_tenant_queued
+        self.weights = weights or {}
+        self._queues: Dict[str, List[Tuple[float, int, Admission]]] = {
+            priority: [] for priority in PRIORITY_CLASSES
+        }
+        # Tenants with queued or running work, per priority class
+        self._tenants: Dict[Tuple[str, str], _TenantState] = {}
+        # Virtual time of each class: finish time of the last started run
+        self._virtual = {priority: 0.0 for priority in PRIORITY_CLASSES}
+        self._running = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._queued = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._sequence = itertools.count()
+        # Running mean of workflow durations, for the suggested retry delay
+        self._run_seconds = DEFAULT_RUN_SECONDS
+
+    def check(self, tenant: str, priority: str) -> None:
+        """
+        Check that a workflow would be admitted now.
+
+        Raises:
+            SchedulerFullError: If the tenant's or the class's queue is full
+            ValueError: If the priority class is unknown
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        # Not created here: rejected tenants must not be tracked
+        state = self._tenants.get((tenant, priority))
+        if self._queued[priority] >= self.max_queued[priority]:
+            reason = f"{priority} workflow queue is full"
+        elif state is not None and state.queued >= self.max_tenant_queued:
+            reason = f"Too many {priority} workflows waiting for tenant {tenant}"
+        else:
+            return
+        if state is not None:
+            state.rejected += 1
+        REJECTED.inc(tenant=self.label(tenant), priority=priority)
+        raise SchedulerFullError(reason, self.retry_after(priority))
+
+    def admit(self, tenant: str, priority: str, force: bool = False) -> Admission:
+        """
+        Admit a workflow run into its queue.
+
+        Args:
+            tenant: Tenant submitting the run
+            priority: "interactive" or "batch"
+            force: Skip the queue limits (e.g. jobs restored after a restart)
+
+        Returns:
+            The admission, to enter before running the workflow
+
+        Raises:
+            SchedulerFullError: If the tenant's or the class's queue is full
+        """
+        if not force:
+            self.check(tenant, priority)
+        elif priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        state = self._tenants.get((tenant, priority))
+        if state is None:
+            state = self._tenants[(tenant, priority)] = _TenantState()
+        state.admitted += 1
+        state.queued += 1
+        self._queued[priority] += 1
+
+        # Self-clocked fair queuing: a run finishes 1/weight after the later
+        # of the class's virtual time and the tenant's previous run
+        start = max(self._virtual[priority], state.finish)
+        state.finish = start + 1 / self.weight(tenant)
+        admission = Admission(
+            self, tenant, priority, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(
+            self._queues[priority], (state.finish, next(self._sequence), admission)
+        )
+        self._dispatch()
+        return admission
+
+    @asynccontextmanager
+    async def slot(
+        self, tenant: str, priority: str = "interactive", force: bool = False
+    ) -> AsyncIterator[Admission]:
+        """
+        Admit a workflow run and hold a running slot while it runs.
+
+        Args:
+            tenant: Tenant submitting the run
+            priority: "interactive" or "batch"
+            force: Skip the queue limits
+
+        Yields:
+            The admission, once the run may start
+
+        Raises:
+            SchedulerFullError: If the tenant's or the class's queue is full
+        """
+        async with self.admit(tenant, priority, force) as admission:
+            yield admission
+
+    def weight(self, tenant: str) -> float:
+        """Share of the running slots of a tenant."""
+        return max(float(self.weights.get(tenant, 1.0)), 0.01)
+
+    def label(self, tenant: str) -> str:
+        """Metrics label of a tenant: OTHER_TENANT unless it has a weight."""
+        if tenant == DEFAULT_TENANT or tenant in self.weights:
+            return tenant
+        return OTHER_TENANT
+
+    def retry_after(self, priority: str) -> int:
+        """
+        Suggest when to retry a rejected workflow.
+
+        Args:
+            priority: Priority class of the workflow
+
+        Returns:
+            Seconds until the class's queue has likely drained by one run
+            per running slot
+        """
+        slots = self.max_batch_running if priority == "batch" else self.max_running
+        rounds = self._queued[priority] // slots + 1
+        seconds = math.ceil(self._run_seconds * rounds)
+        return min(max(seconds, MIN_RETRY_AFTER), MAX_RETRY_AFTER)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depths and wait times per class and per tenant.
+
+        Returns:
+            Limits and running/queued counts per class, and per tenant with
+            queued or running work its weight and per-class queue counters
+            and wait times
+        """
+        tenants: Dict[str, Dict[str, Any]] = {}
+        for (tenant, priority), state in sorted(self._tenants.items()):
+            entry = tenants.setdefault(tenant, {"weight": self.weight(tenant)})
+            entry[priority] = state.stats()
+        return {
+            "max_running": self.max_running,
+            "running_seconds_avg": round(self._run_seconds, 3),
+            "classes": {
+                priority: {
+                    "running": self._running[priority],
+                    "queued": self._queued[priority],
+                    "max_running": (
+                        self.max_batch_running
+                        if priority == "batch"
+                        else self.max_running
+                    ),
+                    "max_queued": self.max_queued[priority],
+                }
+                for priority in PRIORITY_CLASSES
+            },
+            "tenants": tenants,
+        }
+
+    def depths(self) -> Dict[Tuple[str, ...], float]:
+        """Workflows waiting per (tenant label, priority class)."""
+        values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        for (tenant, priority), state in self._tenants.items():
+            values[(self.label(tenant), priority)] += state.queued
+        return dict(values)
+
+    def running(self) -> Dict[Tuple[str, ...], float]:
+        """Workflows running per (tenant label, priority class)."""
+        values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        for (tenant, priority), state in self._tenants.items():
+            values[(self.label(tenant), priority)] += state.running
+        return dict(values)
+
+    def _dispatch(self) -> None:
+        """Start queued runs while running slots are free."""
+        while sum(self._running.values()) < self.max_running:
+            admission = self._next("interactive")
+            if admission is None and self._running["batch"] < self.max_batch_running:
+                admission = self._next("batch")
+            if admission is None:
+                return
+            self._start(admission)
+
+    def _next(self, priority: str) -> Optional[Admission]:
+        """Pop the queued run of a class with the earliest virtual finish."""
+        queue = self._queues[priority]
+        while queue:
+            finish, _, admission = heapq.heappop(queue)
+            if admission.future.done():
+                continue  # Withdrawn
+            self._virtual[priority] = finish
+            return admission
+        return None
+
+    def _start(self, admission: Admission) -> None:
+        priority = admission.priority
+        state = self._tenants[(admission.tenant, priority)]
+        state.queued -= 1
+        state.running += 1
+        state.started += 1
+        self._queued[priority] -= 1
+        self._running[priority] += 1
+
+        admission.started_at = time.monotonic()
+        waited = admission.started_at - admission.admitted_at
+        state.wait_total += waited
+        state.wait_max = max(state.wait_max, waited)
+        QUEUE_WAIT.observe(
+            waited, tenant=self.label(admission.tenant), priority=priority
+        )
+        admission.future.set_result(None)
+
+    def _withdraw(self, admission: Admission) -> None:
+        """Remove a run that never started from the queue counters."""
+        key = (admission.tenant, admission.priority)
+        self._tenants[key].queued -= 1
+        self._queued[admission.priority] -= 1
+        self._forget_idle(key)
+
+    def _release(self, admission: Admission) -> None:
+        """Free the slot of a finished run and start the next ones."""
+        key = (admission.tenant, admission.priority)
+        self._tenants[key].running -= 1
+        self._running[admission.priority] -= 1
+        self._forget_idle(key)
+        if admission.started_at is not None:
+            duration = time.monotonic() - admission.started_at
+            self._run_seconds += 0.2 * (duration - self._run_seconds)
+        self._dispatch()
+
+    def _forget_idle(self, key: Tuple[str, str]) -> None:
+        """
+        Stop tracking a tenant without queued or running work.
+
+        Its virtual finish time is not needed any more: every run it queued
+        has started, so the class's virtual time is already past it.
+        """
+        state = self._tenants[key]
+        if state.queued == 0 and state.running == 0:
+            del self._tenants[key]
+
+
+# Global workflow scheduler instance
+workflow_scheduler = WorkflowScheduler(
+    max_running=settings.workflow_max_running,
+    max_batch_running=settings.job_workers,
+    max_queued={
+        "interactive": settings.workflow_queue_size,
+        "batch": settings.job_queue_size,
+    },
+    max_tenant_queued=settings.workflow_tenant_queue_size,
+    weights=settings.tenant_weights,
+)
+
+registry.gauge(
+    "davai_workflow_queued",
+    "Workflows waiting for a running slot, by tenant and priority class.",
+    ("tenant", "priority"),
+    workflow_scheduler.depths,
+)
+registry.gauge(
+    "davai_workflow_running",
+    "Workflows holding a running slot, by tenant and priority class.",
+    ("tenant", "priority"),
+    workflow_scheduler.running,
+)
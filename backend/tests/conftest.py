@@ -0,0 +1,89 @@
+"""
+Test fixtures for DAVAI POC.
+
+Tests run offline against the fake LLM provider; generated files go to a
+temporary folder instead of the working tree, and responses are not cached
+so that every call reaches the provider.
+"""
+
+import os
+import tempfile
+
+# Settings are read on import: configure them before any application module
+_storage = tempfile.mkdtemp(prefix="davai-tests-")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("TEMP_STORAGE_PATH", os.path.join(_storage, "temp"))
+os.environ.setdefault("CACHE_STORAGE_PATH", os.path.join(_storage, "cache"))
+os.environ.setdefault("CACHE_ENABLED", "false")
+
+from typing import AsyncIterator, Callable, List, Optional, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from langchain_core.messages import BaseMessage, HumanMessage  # noqa: E402
+
+from agents.base_agent import BaseAgent  # noqa: E402
+from app_factory import create_app  # noqa: E402
+from config.llm_config import LlmConfig  # noqa: E402
+from models.project_data import ProjectData  # noqa: E402
+from services.fake_llm import FakeChatModel  # noqa: E402
+from services.workflow_orchestrator import WorkflowOrchestrator  # noqa: E402
+
+FAKE_CONFIG = LlmConfig(model="fake-chat", provider="fake", temperature=0.0)
+
+
+class PromptAgent(BaseAgent[ProjectData, ProjectData]):
+    """Agent asking its model to document a project idea."""
+
+    async def process(self, input_data: ProjectData) -> ProjectData:
+        content = await self._invoke_llm(
+            self.get_user_prompt(input_data), self.get_system_prompt()
+        )
+        return input_data.model_copy(update={"project_idea": content})
+
+    def get_system_prompt(self) -> str:
+        return "You write project documentation."
+
+    def get_user_prompt(self, input_data: ProjectData) -> str:
+        return input_data.project_idea
+
+
+@pytest.fixture
+def prompt() -> List[BaseMessage]:
+    """Prompt sent to the fake chat models."""
+    return [HumanMessage(content="Write the architecture of a todo app")]
+
+
+@pytest.fixture
+def make_agent() -> Callable[..., PromptAgent]:
+    """
+    Build agents calling the given fake model, and optionally hedging with a
+    backup (config, model) pair.
+    """
+
+    def build(
+        llm: FakeChatModel,
+        backup: Optional[Tuple[LlmConfig, FakeChatModel]] = None,
+    ) -> PromptAgent:
+        agent = PromptAgent(FAKE_CONFIG)
+        agent._llm = llm
+        agent._backup = backup or ()
+        return agent
+
+    return build
+
+
+@pytest.fixture
+def orchestrator() -> WorkflowOrchestrator:
+    """Workflow orchestrator saving projects to the temporary folder."""
+    return WorkflowOrchestrator()
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP client calling the application in-process."""
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as client:
+        yield client
@@ -0,0 +1,47 @@
+"""
+Tests of LLM traffic cassettes.
+"""
+
+import time
+from typing import List
+
+import pytest
+
+from services.cassette import Cassette, CassetteEntry
+
+
+@pytest.mark.parametrize("filename", ["calls.jsonl", "calls.jsonl.gz"])
+def test_recorded_calls_load_back(tmp_path, filename):
+    recorder = Cassette(tmp_path / filename, "record")
+    recorder.record(CassetteEntry(agent="ContextAgent", response="# Context"))
+    recorder.record(
+        CassetteEntry(agent="ReadmeAgent", response="# Readme", fingerprint="f1")
+    )
+
+    cassette = Cassette.load(tmp_path / filename)
+
+    assert [entry.response for entry in cassette.entries] == ["# Context", "# Readme"]
+    assert cassette.entries[0].recorded_at is not None
+    # By fingerprint first, then by agent in call order
+    assert cassette.match("ContextAgent", "f1").response == "# Readme"
+    assert cassette.match("ContextAgent", "unknown").response == "# Context"
+
+
+async def test_replay_follows_the_recorded_timing():
+    entry = CassetteEntry(
+        agent="ContextAgent", response="one two three", latency=0.1, ttft=0.05
+    )
+    tokens: List[str] = []
+
+    started = time.perf_counter()
+    assert await Cassette(None).replay(entry, tokens.append) == "one two three"
+    assert time.perf_counter() - started >= 0.09
+    assert tokens == ["one ", "two ", "three"]
+
+    started = time.perf_counter()
+    await Cassette(None, timing="fast").replay(entry)
+    assert time.perf_counter() - started < 0.05
+
+    # Calls recorded without timing replay at once
+    untimed = CassetteEntry(agent="ContextAgent", response="done")
+    assert await Cassette(None).replay(untimed) == "done"
@@ -0,0 +1,93 @@
+"""
+Tests of LLM request coalescing, driven by the fake LLM provider.
+"""
+
+import asyncio
+
+import pytest
+
+from services.coalescing import RequestCoalescer
+from services.fake_llm import FakeChatModel
+from services.metrics import collect_llm_calls
+
+USER_PROMPT = "Document a coalesced todo app"
+
+
+@pytest.fixture
+def coalescer(monkeypatch) -> RequestCoalescer:
+    coalescer = RequestCoalescer()
+    monkeypatch.setattr("agents.base_agent.coalescer", coalescer)
+    return coalescer
+
+
+async def test_identical_calls_share_one_request(make_agent, coalescer):
+    agent = make_agent(FakeChatModel(latency="fixed:0.05"))
+
+    with collect_llm_calls() as calls:
+        responses = await asyncio.gather(
+            *(agent._invoke_llm(USER_PROMPT) for _ in range(3))
+        )
+
+    assert len(set(responses)) == 1
+    assert coalescer.stats()["PromptAgent"] == {
+        "requests": 1,
+        "coalesced": 2,
+        "cancelled": 0,
+        "abandoned": 0,
+    }
+    assert sorted(call.source for call in calls) == ["coalesced", "coalesced", "live"]
+    # Only the owner is charged for the request
+    tokens = {call.source: call.completion_tokens for call in calls}
+    assert tokens["live"] > 0
+    assert tokens["coalesced"] == 0
+    assert coalescer.in_flight() == 0
+
+
+async def test_waiter_owns_the_request_of_a_cancelled_leader(
+    make_agent, coalescer, monkeypatch
+):
+    # No backoff before the retry
+    monkeypatch.setattr("services.resilience.random.uniform", lambda low, high: low)
+    # Seeded so that the first attempt fails and the retry succeeds
+    model = FakeChatModel(latency="fixed:0.1", error_rate=0.5, seed=1)
+    agent = make_agent(model)
+
+    with collect_llm_calls() as calls:
+        leader = asyncio.create_task(agent._invoke_llm(USER_PROMPT))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(agent._invoke_llm(USER_PROMPT))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        response = await waiter
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert coalescer.stats()["PromptAgent"]["cancelled"] == 1
+    assert coalescer.stats()["PromptAgent"]["abandoned"] == 0
+
+    cancelled, owner = sorted(calls, key=lambda call: call.success)
+    assert not cancelled.success
+    assert cancelled.completion_tokens == 0
+    # The waiter records what the shared request consumed
+    assert owner.source == "live"
+    assert owner.retries == 1
+    assert owner.ttft is not None and owner.ttft >= 0.1
+    assert owner.prompt_tokens > 0
+    assert owner.completion_tokens > 0
+    assert response
+
+
+async def test_request_is_abandoned_when_every_waiter_is_cancelled(
+    make_agent, coalescer
+):
+    agent = make_agent(FakeChatModel(latency="fixed:5"))
+
+    tasks = [asyncio.create_task(agent._invoke_llm(USER_PROMPT)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert coalescer.stats()["PromptAgent"]["cancelled"] == 3
+    assert coalescer.stats()["PromptAgent"]["abandoned"] == 1
+    assert coalescer.in_flight() == 0
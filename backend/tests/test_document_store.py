@@ -0,0 +1,103 @@
+"""
+Tests of the document store.
+"""
+
+import gzip
+import os
+
+import pytest
+
+from services.document_store import (
+    BlobStore,
+    read_documents,
+    store_documents,
+    write_atomic,
+)
+
+
+@pytest.fixture
+def blobs(tmp_path, monkeypatch) -> BlobStore:
+    blobs = BlobStore(tmp_path / "blobs")
+    monkeypatch.setattr("services.document_store.blob_store", blobs)
+    return blobs
+
+
+def test_identical_content_is_stored_once(blobs):
+    digest, is_new = blobs.put(b"# Architecture")
+    path = blobs.path(digest)
+    assert is_new
+    os.utime(path, (0, 0))
+
+    assert blobs.put(b"# Architecture") == (digest, False)
+    assert list(blobs.root.glob("*/*.gz")) == [path]
+    # Reuse refreshes the mtime retention goes by
+    assert path.stat().st_mtime > 0
+    assert blobs.get(digest) == b"# Architecture"
+    with blobs.open(digest) as f:
+        assert f.read() == b"# Architecture"
+    # Compressed without a timestamp, so the bytes only depend on the content
+    assert path.read_bytes() == gzip.compress(b"# Architecture", 6, mtime=0)
+
+
+def test_write_atomic_leaves_no_temporary_file(tmp_path):
+    target = tmp_path / "notes.md"
+
+    assert write_atomic(target, "déjà vu", "all") == 7
+    assert write_atomic(tmp_path / "data.bin", b"\x00\x01", "files") == 2
+
+    assert target.read_text(encoding="utf-8") == "déjà vu"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "data.bin",
+        "notes.md",
+    ]
+
+
+async def test_documents_are_stored_as_blobs(blobs, tmp_path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+
+    manifest = await store_documents(
+        project_dir, {"context": "# Shared", "readme.md": "# Shared"}
+    )
+
+    assert manifest["context.md"] == manifest["readme.md"]
+    assert manifest["context.md"]["size"] == len("# Shared")
+    assert len(list(blobs.root.glob("*/*.gz"))) == 1
+    assert list(project_dir.iterdir()) == []
+    assert read_documents(project_dir, {"documents": manifest}) == {
+        "context.md": "# Shared",
+        "readme.md": "# Shared",
+    }
+
+
+async def test_files_store_writes_markdown(blobs, tmp_path, monkeypatch):
+    monkeypatch.setattr("services.document_store.settings.document_store", "files")
+
+    assert await store_documents(tmp_path, {"context": "# Context"}) == {}
+    assert (tmp_path / "context.md").read_text() == "# Context"
+    assert not blobs.root.exists()
+
+
+def test_read_documents_of_both_layouts(blobs, tmp_path):
+    digest, _ = blobs.put(b"# From the blob store")
+    missing, _ = blobs.put(b"# Deleted blob")
+    blobs.path(missing).unlink()
+    (tmp_path / "legacy.md").write_text("# Saved before blobs")
+    (tmp_path / "missing.md").write_text("# Markdown copy")
+    metadata = {
+        "documents": {
+            "stored.md": {"sha256": digest, "size": 21},
+            "missing.md": {"sha256": missing, "size": 14},
+        }
+    }
+
+    assert read_documents(tmp_path, metadata) == {
+        "legacy.md": "# Saved before blobs",
+        "missing.md": "# Markdown copy",
+        "stored.md": "# From the blob store",
+    }
+    assert read_documents(tmp_path, metadata, ["stored"]) == {
+        "stored.md": "# From the blob store"
+    }
+    with pytest.raises(FileNotFoundError):
+        read_documents(tmp_path, metadata, ["absent.md"])
@@ -0,0 +1,157 @@
+"""
+Tests of the fake LLM provider and of provider selection.
+"""
+
+import json
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from config.llm_config import LlmConfig
+from services import llm_factory
+from services.fake_llm import FakeChatModel, FakeLLMError, parse_latency
+
+
+@pytest.mark.parametrize(
+    "spec, low, high",
+    [
+        ("fixed:0.25", 0.25, 0.25),
+        ("uniform:0.1,0.3", 0.1, 0.3),
+        ("normal:0.2,0.05", 0.0, 1.0),
+        ("lognormal:0.2,0.4", 0.0, 5.0),
+    ],
+)
+def test_latency_distributions(spec, low, high):
+    draw = parse_latency(spec)
+    rng = random.Random(0)
+    samples = [draw(rng) for _ in range(500)]
+    assert all(low <= sample <= high for sample in samples)
+
+
+@pytest.mark.parametrize("spec", ["fixed", "uniform:1", "gamma:1,2", "fixed:fast"])
+def test_invalid_latency_distribution(spec):
+    with pytest.raises(ValueError):
+        parse_latency(spec)
+
+
+async def test_injected_latency(prompt):
+    model = FakeChatModel(latency="fixed:0.1")
+
+    started = time.monotonic()
+    await model.ainvoke(prompt)
+    assert time.monotonic() - started >= 0.1
+
+
+async def test_token_rate(prompt):
+    model = FakeChatModel(tokens_per_second=200, response_tokens=20)
+
+    started = time.monotonic()
+    tokens = [chunk.content async for chunk in model.astream(prompt) if chunk.content]
+    elapsed = time.monotonic() - started
+
+    assert elapsed >= len(tokens) / 200
+    assert "".join(tokens) == model.respond(prompt)
+
+
+async def test_error_injection(prompt):
+    model = FakeChatModel(error_rate=1.0, error_status=429)
+
+    with pytest.raises(FakeLLMError) as error:
+        await model.ainvoke(prompt)
+    assert error.value.status_code == 429
+
+
+def test_error_rate_is_seeded():
+    draws = []
+    for _ in range(2):
+        model = FakeChatModel(error_rate=0.3, seed=7)
+        outcomes = []
+        for _ in range(1000):
+            try:
+                model._next_call()
+                outcomes.append(False)
+            except FakeLLMError:
+                outcomes.append(True)
+        draws.append(outcomes)
+
+    assert draws[0] == draws[1]
+    assert 0.25 < sum(draws[0]) / 1000 < 0.35
+
+
+async def test_responses_are_deterministic(prompt):
+    first = await FakeChatModel().ainvoke(prompt)
+    second = await FakeChatModel(seed=3).ainvoke(prompt)
+
+    assert first.content == second.content
+    assert first.content.startswith("# ")
+    assert first.usage_metadata["output_tokens"] > 0
+
+
+async def test_json_mode_answers_every_json_agent(prompt):
+    response = await FakeChatModel(json_mode=True, question_count=3).ainvoke(prompt)
+
+    data = json.loads(response.content)
+    assert len(data["questions"]) == 3
+    assert len(data["suggested_answers"]) == 3
+    assert data["summary"]
+
+
+async def test_canned_responses(prompt, tmp_path):
+    path = tmp_path / "responses.json"
+    path.write_text(json.dumps([{"match": "todo app", "response": "Canned"}]))
+    model = FakeChatModel(responses=FakeChatModel.load_responses(path))
+
+    assert (await model.ainvoke(prompt)).content == "Canned"
+
+
+async def test_streamed_usage(prompt):
+    usage = [
+        chunk.usage_metadata
+        async for chunk in FakeChatModel().astream(prompt)
+        if chunk.usage_metadata
+    ]
+
+    assert len(usage) == 1
+    assert usage[0]["input_tokens"] > 0
+    assert usage[0]["output_tokens"] > 0
+
+
+def test_get_llm_builds_fake_models():
+    config = LlmConfig(
+        model="fake-chat",
+        provider="fake",
+        response_format="json_object",
+        model_kwargs={"latency": "fixed:0.5", "error_rate": 0.1},
+    )
+
+    model = llm_factory.get_llm(config)
+
+    assert isinstance(model, FakeChatModel)
+    assert model.json_mode
+    assert model.latency == "fixed:0.5"
+    assert model.error_rate == 0.1
+
+
+@pytest.mark.parametrize(
+    "provider, keys, valid",
+    [
+        ("fake", {}, True),
+        ("openai", {"openai_api_key": "sk-test"}, True),
+        ("openai", {"anthropic_api_key": "sk-ant-test"}, False),
+        ("claude", {"anthropic_api_key": "sk-ant-test"}, True),
+        ("claude", {"openai_api_key": "sk-test"}, False),
+        ("gemini", {"google_api_key": "key"}, False),
+    ],
+)
+def test_validate_api_keys_checks_the_configured_provider(
+    monkeypatch, provider, keys, valid
+):
+    api_keys = {"openai_api_key": None, "anthropic_api_key": None, **keys}
+    monkeypatch.setattr(llm_factory.settings, "llm_provider", provider)
+    monkeypatch.setattr(
+        llm_factory, "init_api_keys_config", lambda: SimpleNamespace(**api_keys)
+    )
+
+    assert llm_factory.validate_api_keys() is valid
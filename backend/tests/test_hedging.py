@@ -0,0 +1,118 @@
+"""
+Tests of hedged LLM requests, driven by the fake LLM provider.
+"""
+
+import pytest
+
+from config.llm_config import LlmConfig
+from services.fake_llm import FakeChatModel
+from services.hedging import Hedger, LatencyTracker
+from services.llm_factory import PROVIDERS, estimate_cost
+from services.metrics import collect_llm_calls
+
+
+def leg(name, model, prompt):
+    """Hedge leg streaming a fake model's response."""
+
+    async def run(forward):
+        parts = []
+        async for chunk in model.astream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                forward(chunk.content)
+        return "".join(parts)
+
+    return name, run
+
+
+async def test_fast_primary_is_not_hedged(prompt):
+    hedger = Hedger(initial_delay=1.0)
+    primary = FakeChatModel(latency="fixed:0.01")
+    backup = FakeChatModel(latency="fixed:0")
+
+    response = await hedger.run(
+        "Agent", leg("primary", primary, prompt), leg("backup", backup, prompt)
+    )
+
+    assert response == primary.respond(prompt)
+    assert hedger.stats()["Agent"] == {"calls": 1, "hedged": 0, "backup_wins": 0}
+    assert len(hedger.tracker._samples["primary"]) == 1
+
+
+async def test_backup_wins_over_slow_primary(prompt):
+    hedger = Hedger(initial_delay=0.05)
+    primary = FakeChatModel(latency="fixed:5", response_tokens=50)
+    backup = FakeChatModel(latency="fixed:0", response_tokens=80)
+
+    response = await hedger.run(
+        "Agent", leg("primary", primary, prompt), leg("backup", backup, prompt)
+    )
+
+    assert response == backup.respond(prompt)
+    assert hedger.stats()["Agent"] == {"calls": 1, "hedged": 1, "backup_wins": 1}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_cancelled_primary_records_censored_sample(prompt, streaming):
+    hedger = Hedger(initial_delay=0.05)
+    primary = FakeChatModel(latency="fixed:5")
+    backup = FakeChatModel(latency="fixed:0")
+    tokens = []
+
+    await hedger.run(
+        "Agent",
+        leg("primary", primary, prompt),
+        leg("backup", backup, prompt),
+        tokens.append if streaming else None,
+    )
+
+    # The primary was cancelled after the hedge delay without any token
+    samples = list(hedger.tracker._samples["primary"])
+    assert len(samples) == 1
+    assert samples[0] >= 0.05
+    assert "".join(tokens) == (backup.respond(prompt) if streaming else "")
+
+
+async def test_censored_samples_keep_the_hedge_delay_up(prompt):
+    tracker = LatencyTracker(min_samples=4)
+    hedger = Hedger(percentile=0.5, initial_delay=0.05, tracker=tracker)
+    slow = FakeChatModel(latency="fixed:5")
+    fast = FakeChatModel(latency="fixed:0")
+    for _ in range(4):
+        await hedger.run("Agent", leg("primary", slow, prompt), leg("b", fast, prompt))
+
+    # Slow primaries are not ignored: the delay reflects their latency
+    assert hedger.hedge_delay("primary") >= 0.05
+
+
+def test_hedge_delay_uses_the_percentile_once_sampled():
+    tracker = LatencyTracker(min_samples=10)
+    hedger = Hedger(percentile=0.9, initial_delay=7.0, tracker=tracker)
+    for sample in range(9):
+        tracker.record("primary", sample / 10)
+    assert hedger.hedge_delay("primary") == 7.0
+
+    tracker.record("primary", 0.9)
+    assert hedger.hedge_delay("primary") == pytest.approx(0.9)
+
+
+async def test_winning_backup_is_charged(make_agent, monkeypatch):
+    monkeypatch.setattr("agents.base_agent.hedger", Hedger(initial_delay=0.05))
+    monkeypatch.setitem(PROVIDERS["fake"]["pricing"], "fake-backup", (1.0, 2.0))
+    backup_config = LlmConfig(model="fake-backup", provider="fake", temperature=0.0)
+    agent = make_agent(
+        FakeChatModel(latency="fixed:5", response_tokens=50),
+        backup=(backup_config, FakeChatModel(response_tokens=400)),
+    )
+
+    with collect_llm_calls() as calls:
+        await agent._invoke_llm("Document a hedged todo app")
+
+    call = calls[0]
+    # Charged for the backup's response: its model, its tokens and its price
+    assert call.model == "fake/fake-backup"
+    assert call.completion_tokens >= 400
+    assert call.cost == pytest.approx(
+        estimate_cost(backup_config, call.prompt_tokens, call.completion_tokens)
+    )
+    assert call.cost > 0
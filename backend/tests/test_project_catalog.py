@@ -0,0 +1,138 @@
+"""
+Tests of the saved projects catalog.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from services.project_catalog import ProjectCatalog, fts_query
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ProjectCatalog(tmp_path / "projects.sqlite3", tmp_path / "projects")
+    yield catalog
+    catalog.close()
+
+
+def save_project(catalog: ProjectCatalog, name: str, **metadata: Any) -> Path:
+    """Write a project folder as the orchestrator saves it."""
+    project_dir = catalog.projects_dir / name
+    project_dir.mkdir(parents=True)
+    metadata = {"project_idea": name, "status": "completed", **metadata}
+    (project_dir / "metadata.json").write_text(json.dumps(metadata))
+    return project_dir
+
+
+def test_new_catalog_indexes_the_saved_projects(catalog):
+    save_project(catalog, "crm", workflow_id="wf-1", generated_at="2025-07-01")
+    save_project(catalog, "todo", generated_at="2025-07-02")
+    (catalog.projects_dir / "broken").mkdir()
+    (catalog.projects_dir / "broken" / "metadata.json").write_text("{")
+
+    catalog.open()
+
+    total, projects = catalog.list()
+    assert total == 2
+    assert [p["folder_name"] for p in projects] == ["todo", "crm"]
+    assert catalog.get("crm")["folder_path"] == str(catalog.projects_dir / "crm")
+    assert catalog.find_workflow("wf-1")["folder_name"] == "crm"
+    assert catalog.get("broken") is None
+
+
+def test_list_filters_sorts_and_pages(catalog):
+    for name, status in (("Blog", "completed"), ("Shop", "failed"), ("Shop 2", "")):
+        catalog.upsert(
+            save_project(catalog, name), {"project_idea": name, "status": status}
+        )
+
+    total, projects = catalog.list(sort="project_idea", descending=False, limit=2)
+    assert total == 3
+    assert [p["project_idea"] for p in projects] == ["Blog", "Shop"]
+
+    total, projects = catalog.list(status="failed")
+    assert (total, projects[0]["folder_name"]) == (1, "Shop")
+
+    assert catalog.list(query="shop")[0] == 2
+    # LIKE wildcards in the query are matched literally
+    assert catalog.list(query="%")[0] == 0
+
+    with pytest.raises(ValueError, match="Unknown sort column"):
+        catalog.list(sort="metadata")
+
+
+def test_rebuild_drops_removed_folders_and_keeps_access_times(catalog):
+    save_project(catalog, "kept")
+    removed = save_project(catalog, "removed")
+    catalog.open()
+    catalog.touch("kept")
+
+    (removed / "metadata.json").unlink()
+    removed.rmdir()
+
+    assert catalog.rebuild() == 1
+    assert catalog.get("removed") is None
+    assert list(catalog.access_times()) == ["kept"]
+
+
+@pytest.mark.parametrize(
+    "text, query",
+    [
+        ("kafka", '"kafka"'),
+        ("kafka deploy*", '"kafka" "deploy"*'),
+        ('"event sourcing" cqrs', '"event sourcing" "cqrs"'),
+        # Operators, punctuation and stray quotes have no special meaning
+        ("kafka OR NOT redis", '"kafka" "OR" "NOT" "redis"'),
+        ('c++ "unclosed', '"c++" "unclosed"'),
+        ('* "" ', ""),
+    ],
+)
+def test_fts_query_matches_terms_literally(text, query):
+    assert fts_query(text) == query
+
+
+def test_search_ranks_documents_and_filters_by_name(catalog):
+    save_project(catalog, "events", project_idea="Event platform")
+    (catalog.projects_dir / "events" / "architecture.md").write_text(
+        "Services communicate through Kafka topics. Kafka keeps the events."
+    )
+    (catalog.projects_dir / "events" / "readme.md").write_text(
+        "Deploying the platform: build the images, push them, then start Kafka."
+    )
+    save_project(catalog, "shop")
+    (catalog.projects_dir / "shop" / "architecture.md").write_text("A Redis cache")
+    catalog.open()
+
+    total, results = catalog.search("kafka")
+    assert total == 2
+    assert results[0]["document"] == "architecture.md"
+    assert results[0]["project_idea"] == "Event platform"
+    assert "**Kafka**" in results[0]["snippet"]
+
+    assert catalog.search("kafka", doc_name="readme.md")[0] == 1
+    # Stemmed terms and prefixes
+    assert catalog.search("deploy")[0] == 1
+    assert catalog.search("red*")[1][0]["folder_name"] == "shop"
+    assert catalog.search("kafka AND")[0] == 0
+    assert catalog.search('"')[0] == 0
+
+
+def test_rebuild_reindexes_documents(catalog):
+    events = save_project(catalog, "events")
+    (events / "architecture.md").write_text("Kafka topics")
+    removed = save_project(catalog, "removed")
+    (removed / "architecture.md").write_text("Kafka streams")
+    catalog.open()
+    assert catalog.search("kafka")[0] == 2
+
+    (events / "architecture.md").write_text("RabbitMQ queues")
+    for path in removed.iterdir():
+        path.unlink()
+    removed.rmdir()
+
+    assert catalog.rebuild() == 1
+    assert catalog.search("kafka")[0] == 0
+    assert catalog.search("rabbitmq")[1][0]["folder_name"] == "events"
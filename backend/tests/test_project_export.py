@@ -0,0 +1,84 @@
+"""
+Tests of saved project exports.
+"""
+
+import base64
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from services.project_export import ProjectExporter
+
+DOCUMENTS = {
+    "context.md": "# Context\n\nA todo app for teams.",
+    "architecture.md": "# Architecture\n\nOne service and one database.",
+}
+
+
+async def test_export_supports_range_and_conditional_requests(orchestrator, client):
+    project_dir = Path(
+        await orchestrator.save_documentation_to_disk(DOCUMENTS, "export range")
+    )
+    url = f"/api/workflow/saved-projects/{project_dir.name}/export"
+
+    response = await client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert f"{project_dir.name}/context.md" in archive.namelist()
+
+    partial = await client.get(url, headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == response.content[:10]
+    assert partial.headers["content-range"].startswith("bytes 0-9/")
+
+    cached = await client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar.gz"])
+async def test_bulk_export_streams_every_project(orchestrator, client, fmt):
+    names = [
+        Path(await orchestrator.save_documentation_to_disk(DOCUMENTS, idea)).name
+        for idea in ("bulk export one", "bulk export two")
+    ]
+
+    response = await client.post(
+        "/api/workflow/saved-projects/export", json={"projects": names, "format": fmt}
+    )
+
+    assert response.status_code == 200
+    if fmt == "zip":
+        members = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    else:
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz") as tar:
+            members = tar.getnames()
+    for name in names:
+        assert f"{name}/context.md" in members
+        assert f"{name}/architecture.md" in members
+
+
+async def test_abandoned_bulk_export_stops_its_writer(orchestrator, tmp_path):
+    # Incompressible enough to need many more chunks than the buffer holds
+    large = base64.b64encode(os.urandom(3 * 1024 * 1024)).decode()
+    project_dir = Path(
+        await orchestrator.save_documentation_to_disk(
+            {"readme.md": large}, "abandoned export"
+        )
+    )
+    exporter = ProjectExporter(tmp_path)
+
+    stream = exporter.stream([project_dir], "tar.gz")
+    assert await stream.__anext__()
+    (writer,) = [t for t in threading.enumerate() if t.name == "project-export"]
+    await stream.aclose()
+
+    # The writer gave up instead of blocking on the full buffer
+    writer.join(timeout=1)
+    assert not writer.is_alive()
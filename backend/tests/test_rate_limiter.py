@@ -0,0 +1,167 @@
+"""
+Tests of the per-model LLM rate limiter.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from services.rate_limiter import (
+    ModelLimiter,
+    RateLimits,
+    TokenBucket,
+    llm_priority,
+    resolve_limits,
+)
+
+
+class RateLimitError(Exception):
+    """Provider error with a 429 status and response headers."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: str):
+        super().__init__("Too many requests")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(90)
+    # 30 overdrawn plus one: 31 seconds at one per second
+    assert bucket.wait_time(1, now) == pytest.approx(31)
+    assert bucket.wait_time(1, now + 30) == pytest.approx(1)
+    # Requests larger than the bucket wait for a full bucket
+    assert bucket.wait_time(600, now + 30) == pytest.approx(60)
+
+    bucket.give(1000)
+    assert bucket.level == 60
+    bucket.cap(10)
+    assert bucket.level == pytest.approx(10, abs=0.1)
+
+
+def test_empty_rate_is_unlimited():
+    bucket = TokenBucket(per_minute=0)
+    bucket.take(1000)
+    assert bucket.wait_time(1000, time.monotonic()) == 0
+
+
+async def test_concurrency_limit_queues_requests():
+    limiter = ModelLimiter("fake/chat", RateLimits(max_concurrency=1))
+    order: List[str] = []
+
+    async def call(name: str) -> None:
+        async with limiter.slot(10):
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    await asyncio.gather(call("first"), call("second"))
+
+    assert order == ["first start", "first end", "second start", "second end"]
+    assert limiter.stats()["queued"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+async def test_interactive_requests_go_before_background_ones():
+    limiter = ModelLimiter("fake/chat", RateLimits(max_concurrency=1))
+    order: List[str] = []
+
+    async def call(priority: str) -> None:
+        with llm_priority(priority):
+            async with limiter.slot(10):
+                order.append(priority)
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(call("background"), call("background"), call("interactive"))
+
+    assert order == ["background", "interactive", "background"]
+
+
+async def test_rate_limit_halves_concurrency_and_successes_raise_it():
+    limiter = ModelLimiter("fake/chat", RateLimits(max_concurrency=8))
+    release = asyncio.Event()
+
+    async def call(fail: bool) -> None:
+        async with limiter.slot(10):
+            await release.wait()
+            if fail:
+                raise RateLimitError(retry_after="0.05")
+
+    calls = [asyncio.create_task(call(fail=i == 0)) for i in range(4)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert isinstance(results[0], RateLimitError)
+    # Four requests in flight when the 429 came: halved to two, then the
+    # three successes each add 1 / ceiling
+    assert limiter.ceiling == pytest.approx(2 + 1 / 2 + 1 / 2.5 + 1 / 2.9, abs=0.01)
+    assert limiter.stats()["rate_limited"] == 1
+    assert 0 < limiter.stats()["paused_for"] <= 0.05
+
+    # Additive increase, one slot per ceiling successes, up to the limit
+    for _ in range(100):
+        async with limiter.slot(10):
+            pass
+    assert limiter.ceiling == 8
+    assert limiter.stats()["max_concurrency"] == 8
+
+
+async def test_pause_after_rate_limit_delays_the_queue():
+    limiter = ModelLimiter("fake/chat", RateLimits())
+    limiter.throttle(RateLimitError(retry_after="0.1"))
+
+    started = time.monotonic()
+    async with limiter.slot(10):
+        pass
+
+    assert time.monotonic() - started >= 0.09
+
+
+def test_provider_headers_lower_the_limits():
+    limiter = ModelLimiter("fake/chat", RateLimits(rpm=100, tpm=0))
+
+    limiter.observe_headers(
+        {
+            "X-RateLimit-Limit-Requests": "50",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "1m30s",
+            "anthropic-ratelimit-tokens-limit": "40000",
+            "anthropic-ratelimit-tokens-remaining": "1000",
+        }
+    )
+
+    assert limiter.requests.rate == 50
+    assert limiter.tokens.rate == 40000
+    assert limiter.tokens.level == pytest.approx(1000, abs=1)
+    assert limiter.stats()["paused_for"] == pytest.approx(90, abs=1)
+
+    # Higher provider limits do not override the configured ones
+    limiter.observe_headers({"x-ratelimit-limit-requests": "500"})
+    assert limiter.requests.rate == 50
+
+
+def test_limits_resolve_from_settings_and_overrides(monkeypatch):
+    monkeypatch.setattr("services.rate_limiter.settings.llm_rpm", 100)
+    monkeypatch.setattr(
+        "services.rate_limiter.settings.llm_limit_overrides",
+        {"fake": {"tpm": 5000}, "fake/fake-chat": {"rpm": 10, "unknown": 1}},
+    )
+
+    assert resolve_limits("fake", "fake-chat") == RateLimits(
+        max_concurrency=0, rpm=10, tpm=5000
+    )
+    assert resolve_limits("fake", "other") == RateLimits(rpm=100, tpm=5000)
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError, match="Unknown LLM priority"):
+        with llm_priority("urgent"):
+            pass
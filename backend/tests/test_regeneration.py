@@ -0,0 +1,98 @@
+"""
+Tests of fingerprint-based workflow regeneration, driven by the fake LLM
+provider (deterministic: the same prompt gets the same document).
+"""
+
+import pytest
+
+from services.workflow_checkpoint import WorkflowCheckpoint
+from services.workflow_orchestrator import WorkflowOrchestrator
+
+DOCUMENT_STEPS = [
+    "generate_context",
+    "generate_architecture",
+    "generate_tech_stack",
+    "generate_task_breakdown",
+    "generate_project_rules",
+    "generate_claude_guide",
+    "generate_readme",
+]
+
+
+async def run_workflow(
+    orchestrator: WorkflowOrchestrator, project_idea: str
+) -> WorkflowCheckpoint:
+    result = await orchestrator.run_complete_workflow(project_idea, answers=[])
+    assert result.success and result.workflow_id is not None
+    checkpoint = await orchestrator.get_checkpoint(result.workflow_id)
+    assert checkpoint is not None
+    return checkpoint
+
+
+async def test_unchanged_inputs_reuse_every_step(orchestrator):
+    previous = await run_workflow(orchestrator, "A regenerated todo app")
+
+    result = await orchestrator.regenerate_workflow(previous)
+
+    assert result.success
+    assert result.workflow_id != previous.workflow_id
+    assert all(
+        step.output_data["reused_from"] == previous.workflow_id
+        for step in result.steps
+        if step.step_name in DOCUMENT_STEPS
+    )
+    report = result.regeneration
+    assert report.regenerated_from == previous.workflow_id
+    assert report.reused_steps == DOCUMENT_STEPS
+    assert report.rerun_steps == {}
+    assert report.saved_prompt_tokens > 0
+    assert report.saved_completion_tokens > 0
+
+
+async def test_rerun_step_keeps_dependents_with_identical_documents(orchestrator):
+    previous = await run_workflow(orchestrator, "A rerun todo app")
+
+    result = await orchestrator.regenerate_workflow(previous, rerun=["architecture"])
+
+    assert result.regeneration.rerun_steps == {"generate_architecture": ["rerun"]}
+    # The new architecture document is the same, so its dependents are reused
+    assert "generate_tech_stack" in result.regeneration.reused_steps
+
+
+async def test_changed_answers_rerun_the_steps_that_read_them(orchestrator):
+    previous = await run_workflow(orchestrator, "A todo app with new answers")
+
+    result = await orchestrator.regenerate_workflow(
+        previous, answers=["Teams of ten"] * len(previous.questions)
+    )
+
+    report = result.regeneration
+    assert report.reused_steps == []
+    assert list(report.rerun_steps) == DOCUMENT_STEPS
+    assert report.rerun_steps["generate_context"] == ["project_data"]
+    assert "upstream:context" in report.rerun_steps["generate_architecture"]
+    assert report.saved_prompt_tokens == 0
+
+
+async def test_invalid_regeneration_is_rejected(orchestrator):
+    previous = await run_workflow(orchestrator, "An invalid regeneration")
+
+    with pytest.raises(ValueError, match="Unknown workflow steps: database"):
+        await orchestrator.regenerate_workflow(previous, rerun=["database"])
+    with pytest.raises(ValueError, match="answers, got 1"):
+        await orchestrator.regenerate_workflow(previous, answers=["Only one"])
+
+
+async def test_regenerate_route(orchestrator, client, monkeypatch):
+    previous = await run_workflow(orchestrator, "A todo app regenerated over HTTP")
+    url = f"/api/workflow/{previous.workflow_id}/regenerate"
+
+    response = await client.post(url, json={})
+    assert response.status_code == 200
+    assert response.json()["regeneration"]["reused_steps"] == DOCUMENT_STEPS
+
+    response = await client.post(url, json={"rerun": ["database"]})
+    assert response.status_code == 422
+
+    response = await client.post("/api/workflow/unknown/regenerate", json={})
+    assert response.status_code == 404
@@ -0,0 +1,209 @@
+"""
+Tests of the LLM call resilience layer, driven by the fake LLM provider.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.fake_llm import FakeChatModel, FakeLLMError
+from services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ModelResilience,
+    ResiliencePolicy,
+    is_retryable,
+)
+
+
+def make_layer(**policy) -> ModelResilience:
+    defaults = {"timeout": 5.0, "backoff_base": 0.01, "backoff_max": 0.05}
+    return ModelResilience("fake/fake-chat", ResiliencePolicy(**{**defaults, **policy}))
+
+
+def flaky(failures: int, **kwargs):
+    """Operation failing with injected provider errors, then succeeding."""
+    failing = FakeChatModel(error_rate=1.0, **kwargs)
+    healthy = FakeChatModel(**kwargs)
+    attempts = []
+
+    def operation(messages):
+        attempts.append(time.monotonic())
+        model = failing if len(attempts) <= failures else healthy
+        return model.ainvoke(messages)
+
+    return operation, attempts
+
+
+async def test_retries_transient_errors_with_backoff(prompt, monkeypatch):
+    # Draw the largest delay of every full-jitter interval
+    monkeypatch.setattr("services.resilience.random.uniform", lambda low, high: high)
+    layer = make_layer(max_retries=3)
+    operation, attempts = flaky(2)
+
+    response = await layer.call(lambda: operation(prompt))
+
+    assert response.content
+    assert len(attempts) == 3
+    # Delays of 0.01s then 0.02s between the attempts
+    assert attempts[1] - attempts[0] >= 0.01
+    assert attempts[2] - attempts[1] >= 0.02
+    stats = layer.stats()
+    assert stats["retries"] == 2
+    assert stats["successes"] == 1
+    assert stats["circuit_state"] == CircuitBreaker.CLOSED
+    assert stats["consecutive_failures"] == 0
+
+
+async def test_gives_up_after_max_retries(prompt):
+    layer = make_layer(max_retries=2)
+    operation, attempts = flaky(10)
+
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: operation(prompt))
+
+    assert len(attempts) == 3
+    assert layer.stats()["failures"] == 1
+
+
+async def test_does_not_retry_client_errors(prompt):
+    layer = make_layer(max_retries=3)
+    model = FakeChatModel(error_rate=1.0, error_status=400)
+
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: model.ainvoke(prompt))
+
+    stats = layer.stats()
+    assert stats["retries"] == 0
+    # Bad requests say nothing about provider health
+    assert stats["consecutive_failures"] == 0
+
+
+async def test_can_retry_vetoes_retries(prompt):
+    layer = make_layer(max_retries=3)
+    operation, attempts = flaky(1)
+
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: operation(prompt), can_retry=lambda: False)
+
+    assert len(attempts) == 1
+
+
+async def test_backoff_doubles_up_to_the_cap_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr("services.resilience.random.uniform", lambda low, high: high)
+    layer = make_layer(backoff_base=1.0, backoff_max=5.0)
+
+    assert [layer._backoff(attempt, None) for attempt in range(4)] == [1, 2, 4, 5]
+    monkeypatch.setattr("services.resilience.random.uniform", lambda low, high: low)
+    assert layer._backoff(0, 3.0) == 3.0
+    # Retry-After is capped too
+    assert layer._backoff(0, 60.0) == 5.0
+
+
+async def test_deadline_bounds_every_attempt(prompt):
+    layer = make_layer(timeout=0.05, max_retries=1)
+    model = FakeChatModel(latency="fixed:5")
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError, match="exceeded 0.05s"):
+        await layer.call(lambda: model.ainvoke(prompt))
+    elapsed = time.monotonic() - started
+
+    # Two attempts of 0.05s and one backoff of at most 0.01s
+    assert elapsed < 0.5
+    stats = layer.stats()
+    assert stats["timeouts"] == 2
+    assert stats["retries"] == 1
+
+
+async def test_timeouts_are_retried(prompt):
+    layer = make_layer(timeout=0.05, max_retries=2)
+    slow = FakeChatModel(latency="fixed:5")
+    fast = FakeChatModel(latency="fixed:0.01")
+    attempts = []
+
+    def operation():
+        attempts.append(None)
+        return (slow if len(attempts) == 1 else fast).ainvoke(prompt)
+
+    response = await layer.call(operation)
+
+    assert response.content
+    assert len(attempts) == 2
+    assert layer.stats()["timeouts"] == 1
+
+
+async def test_breaker_opens_then_half_opens_then_closes(prompt):
+    layer = make_layer(max_retries=0, failure_threshold=2, reset_timeout=0.1)
+    failing = FakeChatModel(error_rate=1.0)
+    healthy = FakeChatModel()
+
+    for _ in range(2):
+        with pytest.raises(FakeLLMError):
+            await layer.call(lambda: failing.ainvoke(prompt))
+    assert layer.breaker.state == CircuitBreaker.OPEN
+    assert layer.stats()["circuit_opens"] == 1
+
+    # Open: calls fail fast without reaching the provider
+    attempts = []
+
+    async def trial():
+        attempts.append(layer.breaker.state)
+        return await healthy.ainvoke(prompt)
+
+    with pytest.raises(CircuitOpenError):
+        await layer.call(trial)
+    assert attempts == []
+    assert layer.stats()["short_circuits"] == 1
+
+    # Half open after the reset timeout: a single trial call goes through
+    await asyncio.sleep(0.11)
+    response = await layer.call(trial)
+    assert response.content
+    assert attempts == [CircuitBreaker.HALF_OPEN]
+    assert layer.breaker.state == CircuitBreaker.CLOSED
+    assert layer.stats()["consecutive_failures"] == 0
+
+
+async def test_half_open_lets_one_trial_through(prompt):
+    layer = make_layer(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+    failing = FakeChatModel(error_rate=1.0)
+    slow = FakeChatModel(latency="fixed:0.1")
+
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: failing.ainvoke(prompt))
+    await asyncio.sleep(0.06)
+
+    trial = asyncio.create_task(layer.call(lambda: slow.ainvoke(prompt)))
+    await asyncio.sleep(0.01)
+    assert layer.breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        await layer.call(lambda: slow.ainvoke(prompt))
+
+    await trial
+    assert layer.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_failed_trial_reopens_the_circuit(prompt):
+    layer = make_layer(max_retries=0, failure_threshold=1, reset_timeout=0.05)
+    failing = FakeChatModel(error_rate=1.0)
+
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: failing.ainvoke(prompt))
+    await asyncio.sleep(0.06)
+    with pytest.raises(FakeLLMError):
+        await layer.call(lambda: failing.ainvoke(prompt))
+
+    assert layer.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await layer.call(lambda: failing.ainvoke(prompt))
+
+
+def test_is_retryable():
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(ConnectionError())
+    assert is_retryable(FakeLLMError("overloaded", 503))
+    assert is_retryable(FakeLLMError("rate limited", 429))
+    assert not is_retryable(FakeLLMError("bad request", 400))
+    assert not is_retryable(ValueError("invalid JSON"))
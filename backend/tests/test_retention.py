@@ -0,0 +1,152 @@
+"""
+Tests of storage retention.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import pytest
+
+from services.document_store import BlobStore
+from services.project_catalog import ProjectCatalog
+from services.response_cache import ResponseCache
+from services.retention import BLOB_GRACE_PERIOD, RetentionService
+
+DAY = 86400
+
+Storage = Tuple[ProjectCatalog, BlobStore]
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> Iterator[Storage]:
+    catalog = ProjectCatalog(tmp_path / "projects.sqlite3", tmp_path / "projects")
+    blobs = BlobStore(tmp_path / "blobs")
+    yield catalog, blobs
+    catalog.close()
+
+
+def make_service(storage: Storage, tmp_path: Path, **limits: Any) -> RetentionService:
+    catalog, blobs = storage
+    return RetentionService(
+        catalog=catalog,
+        blobs=blobs,
+        cache=ResponseCache(tmp_path / "cache"),
+        exports_dir=tmp_path / "exports",
+        jobs_dir=tmp_path / "jobs",
+        **limits,
+    )
+
+
+def save_project(
+    storage: Storage,
+    name: str,
+    age_days: float = 0,
+    status: str = "completed",
+    documents: Optional[Dict[str, str]] = None,
+) -> Path:
+    """Save a project folder with its documents in the blob store."""
+    catalog, blobs = storage
+    project_dir = catalog.projects_dir / name
+    project_dir.mkdir(parents=True)
+    manifest: Dict[str, Dict[str, Any]] = {}
+    for filename, content in (documents or {"context.md": f"# {name}"}).items():
+        digest, _ = blobs.put(content.encode())
+        manifest[filename] = {"sha256": digest, "size": len(content)}
+    metadata_file = project_dir / "metadata.json"
+    metadata_file.write_text(
+        json.dumps({"project_idea": name, "status": status, "documents": manifest})
+    )
+    modified_at = time.time() - age_days * DAY
+    os.utime(metadata_file, (modified_at, modified_at))
+    return project_dir
+
+
+def age_blobs(blobs: BlobStore, seconds: float) -> None:
+    for path in blobs.root.glob("*/*.gz"):
+        modified_at = time.time() - seconds
+        os.utime(path, (modified_at, modified_at))
+
+
+async def test_dry_run_reports_without_deleting(storage, tmp_path):
+    old = save_project(storage, "old", age_days=10)
+    recent = save_project(storage, "recent", age_days=1)
+    age_blobs(storage[1], 2 * BLOB_GRACE_PERIOD)
+    service = make_service(storage, tmp_path, max_age_days=7)
+
+    report = await service.run(dry_run=True)
+
+    assert report["deleted_projects"] == ["old"]
+    assert report["reclaimed"]["projects"]["count"] == 1
+    assert report["reclaimed"]["blobs"]["count"] == 1
+    assert old.exists()
+    assert len(list(storage[1].root.glob("*/*.gz"))) == 2
+
+    report = await service.run()
+
+    assert report["deleted_projects"] == ["old"]
+    assert not old.exists()
+    assert recent.exists()
+    # The deleted project's blob went with it, the other one is referenced
+    assert len(list(storage[1].root.glob("*/*.gz"))) == 1
+
+
+async def test_shared_blobs_are_kept(storage, tmp_path):
+    shared = {"context.md": "# Shared context"}
+    save_project(storage, "old", age_days=10, documents=shared)
+    save_project(storage, "recent", documents=shared)
+    age_blobs(storage[1], 2 * BLOB_GRACE_PERIOD)
+    service = make_service(storage, tmp_path, max_age_days=7)
+
+    report = await service.run()
+
+    assert report["deleted_projects"] == ["old"]
+    assert report["reclaimed"]["blobs"]["count"] == 0
+    assert len(list(storage[1].root.glob("*/*.gz"))) == 1
+
+
+async def test_count_limit_deletes_the_oldest_projects(storage, tmp_path):
+    for name, age in (("a", 3), ("b", 2), ("c", 1)):
+        save_project(storage, name, age_days=age)
+    service = make_service(storage, tmp_path, max_projects=1)
+
+    report = await service.run()
+
+    assert sorted(report["deleted_projects"]) == ["a", "b"]
+    assert [path.name for path in storage[0].projects_dir.iterdir()] == ["c"]
+
+
+async def test_running_projects_are_never_deleted(storage, tmp_path):
+    running = save_project(storage, "running", age_days=30, status="running")
+    save_project(storage, "done", age_days=30)
+    service = make_service(storage, tmp_path, max_age_days=7, max_projects=0)
+
+    report = await service.run()
+
+    assert report["deleted_projects"] == ["done"]
+    assert running.exists()
+
+
+async def test_blob_stored_again_after_the_plan_is_kept(storage, tmp_path):
+    catalog, blobs = storage
+    content = "# Reused document"
+    save_project(storage, "old", age_days=10, documents={"readme.md": content})
+    age_blobs(blobs, 2 * BLOB_GRACE_PERIOD)
+    service = make_service(storage, tmp_path, max_age_days=7)
+
+    plan = service._plan
+
+    def plan_then_save(now: float):
+        planned = plan(now)
+        # A project saved meanwhile stores the same document again
+        blobs.put(content.encode())
+        return planned
+
+    service._plan = plan_then_save
+    report = await service.run()
+
+    assert report["deleted_projects"] == ["old"]
+    assert report["reclaimed"]["blobs"]["count"] == 0
+    assert len(list(blobs.root.glob("*/*.gz"))) == 1
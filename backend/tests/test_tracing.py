@@ -0,0 +1,41 @@
+"""
+Tests of request and workflow tracing.
+"""
+
+from models.workflow_result import WorkflowResult
+from models.workflow_step import WorkflowStep
+from services.workflow_orchestrator import _trace_result
+from utils.tracing import start_span
+
+
+def test_span_attributes_take_dotted_names():
+    with start_span("file.write", {"file.path": "a.md", "file.size": None}) as span:
+        pass
+
+    assert span.attributes == {"file.path": "a.md"}
+
+
+def test_failed_workflow_span_names_the_failed_step():
+    steps = [
+        WorkflowStep(step_name=name, input_data={}, output_data={}, success=success)
+        for name, success in (
+            ("generate_context", True),
+            ("generate_architecture", False),
+            # A concurrent sibling finishing after the failure
+            ("generate_tech_stack", True),
+        )
+    ]
+    steps[1].error_message = "boom"
+    result = WorkflowResult(
+        project_idea="A todo app",
+        workflow_id="wf",
+        steps=steps,
+        success=False,
+        total_duration=1.0,
+    )
+
+    with start_span("workflow.run") as span:
+        _trace_result(span, result)
+
+    assert span.status == "error"
+    assert span.status_message == "boom"
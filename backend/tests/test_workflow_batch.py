@@ -0,0 +1,101 @@
+"""
+Tests of batch workflow runs, driven by the fake LLM provider.
+"""
+
+import asyncio
+import json
+from typing import Any, List
+
+from models.batch_workflow_request import BatchWorkflowRequest
+from models.batch_workflow_summary import BatchWorkflowSummary
+from models.complete_workflow_request import CompleteWorkflowRequest
+from services.workflow_batch import item_key, run_batch
+from services.workflow_scheduler import WorkflowScheduler
+
+
+def batch(*ideas: str, **options: Any) -> BatchWorkflowRequest:
+    return BatchWorkflowRequest(
+        items=[
+            CompleteWorkflowRequest(project_idea=idea, answers=[]) for idea in ideas
+        ],
+        **options,
+    )
+
+
+def test_items_differing_in_whitespace_are_identical():
+    first, spaced, other = batch(
+        "A batch todo app", "  A batch\ttodo   app ", "A batch shop"
+    ).items
+
+    assert item_key(first) == item_key(spaced)
+    assert item_key(first) != item_key(other)
+
+
+async def test_identical_items_run_once(orchestrator):
+    request = batch(
+        "A deduplicated todo app",
+        "A deduplicated shop",
+        "A deduplicated  todo app",
+        include_results=False,
+    )
+
+    lines = [line async for line in run_batch(orchestrator, request)]
+
+    *items, summary = lines
+    assert isinstance(summary, BatchWorkflowSummary)
+    assert (summary.items, summary.workflows, summary.duplicates) == (3, 2, 1)
+    assert (summary.succeeded, summary.failed) == (3, 0)
+    assert summary.prompt_tokens > 0
+    by_index = {item.index: item for item in items}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[2].duplicate_of == 0
+    assert by_index[2].workflow_id == by_index[0].workflow_id
+    assert by_index[1].workflow_id != by_index[0].workflow_id
+    assert all(item.result is None for item in items)
+
+
+async def test_closing_the_stream_cancels_the_remaining_runs(orchestrator, monkeypatch):
+    cancelled: List[str] = []
+    run_complete_workflow = orchestrator.run_complete_workflow
+
+    async def run(project_idea: str, *args: Any, **kwargs: Any) -> Any:
+        if project_idea != "A quick app":
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(project_idea)
+                raise
+        return await run_complete_workflow(project_idea, *args, **kwargs)
+
+    monkeypatch.setattr(orchestrator, "run_complete_workflow", run)
+    scheduler = WorkflowScheduler(max_running=4, max_batch_running=4)
+    request = batch("A quick app", "A slow app", "A stalled app", concurrency=3)
+
+    stream = run_batch(orchestrator, request, scheduler=scheduler)
+    first = await anext(stream)
+    assert first.success and first.project_idea == "A quick app"
+    # The client disconnects
+    await stream.aclose()
+
+    assert sorted(cancelled) == ["A slow app", "A stalled app"]
+    assert scheduler.stats()["classes"]["batch"]["running"] == 0
+
+
+async def test_batch_route_streams_ndjson(client):
+    response = await client.post(
+        "/api/workflow/batch",
+        json={
+            "items": [
+                {"project_idea": "An NDJSON todo app", "answers": []},
+                {"project_idea": "An NDJSON todo app", "answers": []},
+            ],
+            "include_results": False,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["item", "item", "summary"]
+    assert lines[-1]["workflows"] == 1
+    assert {line["duplicate_of"] for line in lines[:2]} == {None, 0}
@@ -0,0 +1,146 @@
+"""
+Tests of the workflow scheduler.
+"""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from services.workflow_scheduler import (
+    OTHER_TENANT,
+    Admission,
+    SchedulerFullError,
+    WorkflowScheduler,
+)
+
+
+def started(admissions: List[Admission]) -> List[Admission]:
+    return [admission for admission in admissions if admission.future.done()]
+
+
+async def test_tenants_take_turns_within_a_class():
+    scheduler = WorkflowScheduler(max_running=1)
+    running = scheduler.admit("acme", "interactive")
+    queued = [scheduler.admit("acme", "interactive") for _ in range(3)]
+    queued.append(scheduler.admit("globex", "interactive"))
+
+    order = []
+    for _ in range(len(queued)):
+        running.cancel()
+        (running,) = [a for a in started(queued) if not a.released]
+        order.append(running.tenant)
+    running.cancel()
+
+    # Globex waits for one run of acme, not for all three
+    assert order == ["acme", "globex", "acme", "acme"]
+
+
+async def test_weights_give_a_tenant_a_larger_share():
+    scheduler = WorkflowScheduler(max_running=1, weights={"acme": 2})
+    running = scheduler.admit("default", "interactive")
+    queued = [scheduler.admit("default", "interactive") for _ in range(2)]
+    queued += [scheduler.admit("acme", "interactive") for _ in range(4)]
+
+    order = []
+    for _ in range(len(queued)):
+        running.cancel()
+        (running,) = [a for a in started(queued) if not a.released]
+        order.append(running.tenant)
+
+    assert order[:3].count("acme") == 2
+
+
+async def test_batch_runs_are_capped_and_interactive_runs_go_first():
+    scheduler = WorkflowScheduler(max_running=3, max_batch_running=1)
+    batch = [scheduler.admit("acme", "batch") for _ in range(3)]
+    interactive = [scheduler.admit("acme", "interactive") for _ in range(3)]
+
+    assert len(started(batch)) == 1
+    assert len(started(interactive)) == 2
+    batch_class = scheduler.stats()["classes"]["batch"]
+    assert (batch_class["running"], batch_class["queued"]) == (1, 2)
+
+    # A freed slot goes to the waiting interactive run, not to a batch run
+    started(batch)[0].cancel()
+    assert len(started(interactive)) == 3
+    assert len(started(batch)) == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = WorkflowScheduler(max_running=1)
+    running = scheduler.admit("acme", "interactive")
+
+    async def run() -> None:
+        async with scheduler.slot("globex"):
+            pass
+
+    waiter = asyncio.create_task(run())
+    await asyncio.sleep(0)
+    assert scheduler.stats()["classes"]["interactive"]["queued"] == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.stats()["classes"]["interactive"]["queued"] == 0
+    assert "globex" not in scheduler.stats()["tenants"]
+    running.cancel()
+    assert scheduler.stats()["classes"]["interactive"]["running"] == 0
+    assert scheduler.stats()["tenants"] == {}
+
+
+async def test_full_queue_is_rejected_with_retry_after():
+    scheduler = WorkflowScheduler(
+        max_running=2, max_queued={"interactive": 4}, max_tenant_queued=2
+    )
+    for _ in range(4):
+        scheduler.admit("acme", "interactive")
+
+    with pytest.raises(SchedulerFullError, match="tenant acme") as tenant_full:
+        scheduler.admit("acme", "interactive")
+    # Two runs queued for two slots: one round, then this run's
+    assert tenant_full.value.retry_after == 60
+
+    for _ in range(2):
+        scheduler.admit("globex", "interactive")
+    with pytest.raises(SchedulerFullError, match="queue is full") as class_full:
+        scheduler.check("initech", "interactive")
+    assert class_full.value.retry_after == 90
+
+
+async def test_rejected_and_unknown_tenants_are_not_tracked():
+    scheduler = WorkflowScheduler(
+        max_running=1, max_queued={"interactive": 0}, weights={"acme": 2}
+    )
+    for tenant in ("t1", "t2", "t3"):
+        with pytest.raises(SchedulerFullError):
+            scheduler.check(tenant, "interactive")
+    assert scheduler._tenants == {}
+
+    scheduler.admit("t1", "interactive", force=True)
+    scheduler.admit("t2", "interactive", force=True)
+    scheduler.admit("acme", "interactive", force=True)
+    # t1 runs while t2 and acme wait; t1 and t2 share one label
+    assert scheduler.running() == {
+        (OTHER_TENANT, "interactive"): 1.0,
+        ("acme", "interactive"): 0.0,
+    }
+    assert scheduler.depths() == {
+        (OTHER_TENANT, "interactive"): 1.0,
+        ("acme", "interactive"): 1.0,
+    }
+
+
+async def test_queue_full_response(client, monkeypatch):
+    scheduler = WorkflowScheduler(max_queued={"interactive": 0})
+    monkeypatch.setattr("routes.workflow_routes.workflow_scheduler", scheduler)
+
+    response = await client.post(
+        "/api/workflow/complete",
+        json={"project_idea": "A todo app", "answers": []},
+        headers={"X-Tenant-ID": "acme"},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "30"
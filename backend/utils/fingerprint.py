@@ -0,0 +1,52 @@
+"""
+Prompt fingerprinting for DAVAI POC.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from config.llm_config import LlmConfig
+
+
+def prompt_fingerprint(
+    llm_config: LlmConfig, system_prompt: Optional[str], user_prompt: str
+) -> str:
+    """
+    Compute a stable fingerprint of an LLM call.
+
+    Args:
+        llm_config: Configuration of the model receiving the prompts
+        system_prompt: Optional system prompt
+        user_prompt: User prompt
+
+    Returns:
+        Hex SHA-256 digest of the model settings and prompts
+    """
+    payload = json.dumps(
+        {
+            "provider": llm_config.provider.lower(),
+            "model": llm_config.model,
+            "temperature": llm_config.temperature,
+            "response_format": llm_config.response_format,
+            "system": system_prompt or "",
+            "user": user_prompt,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def value_digest(value: Any) -> str:
+    """
+    Compute a short, stable digest of a JSON-serializable value.
+
+    Args:
+        value: Value to digest (dict keys are sorted)
+
+    Returns:
+        First 16 hex characters of the SHA-256 digest of its JSON encoding
+    """
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
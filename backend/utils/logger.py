@@ -8,6 +8,8 @@ from typing import Optional
 
 from colorama import Fore, Style, init
 
+from utils.tracing import current_span
+
 # Initialize colorama
 init(autoreset=True)
 
@@ -28,10 +30,23 @@ class _ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
+class _TraceContextFilter(logging.Filter):
+    """Adds the ids of the current trace span to log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = current_span()
+        record.trace_id = span.trace_id if span else ""
+        record.span_id = span.span_id if span else ""
+        record.trace_context = f"[{span.trace_id}:{span.span_id}] " if span else ""
+        return True
+
+
 def setup_logging(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
-    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    log_format: str = (
+        "%(asctime)s - %(name)s - %(levelname)s - %(trace_context)s%(message)s"
+    )
 ) -> logging.Logger:
     """
     Setup logging configuration for DAVAI POC.
@@ -39,7 +54,9 @@ def setup_logging(
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file path to write logs
-        log_format: Log message format
+        log_format: Log message format. Records also carry the trace_id,
+            span_id and trace_context ("[trace_id:span_id] " or "") of the
+            current trace span.
 
     Returns:
         Configured logger instance
@@ -56,6 +73,7 @@ def setup_logging(
     console_handler.setLevel(log_level.upper())
     console_formatter = _ColoredFormatter(log_format)
     console_handler.setFormatter(console_formatter)
+    console_handler.addFilter(_TraceContextFilter())
     logger.addHandler(console_handler)
 
     # File handler if specified
@@ -64,6 +82,7 @@ def setup_logging(
         file_handler.setLevel(log_level.upper())
         file_formatter = logging.Formatter(log_format)
         file_handler.setFormatter(file_formatter)
+        file_handler.addFilter(_TraceContextFilter())
         logger.addHandler(file_handler)
 
     return logger
@@ -0,0 +1,380 @@
+"""
+Tracing for DAVAI POC.
+
+OpenTelemetry-style spans for requests, workflow steps, LLM calls and file
+writes. The current span is carried in a context variable, so spans nest
+across awaits, tasks and worker threads, and its ids are added to log
+records. Finished spans are exported in batches as OTLP/JSON, either to a
+local file or to an OTLP/HTTP collector.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import httpx
+
+# Not utils.logger: the logger reads the current span from this module
+_log = logging.getLogger("davai")
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+_STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    status: str = "unset"  # "unset", "ok" or "error"
+    status_message: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value continuing this span's trace."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a span attribute, ignoring None values."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set span attributes, ignoring None values."""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.status = "error"
+        self.status_message = message
+
+    def record_exception(self, error: BaseException) -> None:
+        """Record an exception event and mark the span as failed."""
+        self.events.append(
+            {
+                "name": "exception",
+                "time_ns": time.time_ns(),
+                "attributes": {
+                    "exception.type": type(error).__name__,
+                    "exception.message": str(error),
+                },
+            }
+        )
+        self.set_error(str(error) or type(error).__name__)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Encode the span in the OTLP/JSON format."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": _STATUS_CODES[self.status]},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(event["time_ns"]),
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in self.events
+            ]
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """
+    Build an OTLP/JSON trace export request.
+
+    Args:
+        spans: Finished spans
+        service_name: Value of the service.name resource attribute
+
+    Returns:
+        ExportTraceServiceRequest as a JSON-compatible dict
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": service_name})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "davai"},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class FileSpanExporter:
+    """Appends span batches to a JSON Lines file, one OTLP request per line."""
+
+    def __init__(self, path: Path, service_name: str):
+        self.path = path
+        self.service_name = service_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        """Write a batch of spans."""
+        line = json.dumps(otlp_payload(spans, self.service_name), ensure_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self) -> None:
+        """Release resources (nothing to do for files)."""
+
+
+class OtlpHttpSpanExporter:
+    """Posts span batches to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: List[Span]) -> None:
+        """Send a batch of spans."""
+        response = self._client.post(
+            self.url, json=otlp_payload(spans, self.service_name)
+        )
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        """Close the HTTP client."""
+        self._client.close()
+
+
+class BatchSpanProcessor:
+    """Exports finished spans in batches from a background thread."""
+
+    def __init__(
+        self,
+        exporter: Union[FileSpanExporter, OtlpHttpSpanExporter],
+        max_batch: int = 256,
+        interval: float = 2.0,
+        max_queue: int = 4096,
+    ):
+        """
+        Initialize the processor and start its export thread.
+
+        Args:
+            exporter: Exporter with export(spans) and shutdown() methods
+            max_batch: Maximum number of spans per export
+            interval: Seconds between exports of partial batches
+            max_queue: Spans buffered before new ones are dropped
+        """
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(max_queue)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        """Queue a finished span for export (never blocks the caller)."""
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and stop the export thread."""
+        self._stopped.set()
+        self._thread.join(timeout=10)
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                _log.warning(f"Could not export {len(batch)} spans: {e}")
+
+    def _next_batch(self) -> List[Span]:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stopped.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+            except queue.Empty:
+                continue
+        return batch
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_processor: Optional[BatchSpanProcessor] = None
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header: Header value
+
+    Returns:
+        (trace id, parent span id), or None if the header is missing or invalid
+    """
+    match = _TRACEPARENT.match(header or "")
+    if match is None or set(match.group(1)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+def current_span() -> Optional[Span]:
+    """Get the span of the current context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    kind: str = "internal",
+    traceparent: Optional[str] = None,
+) -> Iterator[Span]:
+    """
+    Run the enclosed code in a new span, child of the current span.
+
+    Exceptions (cancellations included) are recorded on the span and
+    re-raised. The span is exported when the block exits.
+
+    Args:
+        name: Span name
+        attributes: Span attributes, keyed by their dotted OpenTelemetry
+            names (None values are ignored)
+        kind: Span kind ("internal", "server", "client", ...)
+        traceparent: W3C traceparent continuing a remote trace; takes
+            precedence over the current span
+
+    Yields:
+        The started span
+    """
+    parent = current_span()
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id = remote
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+
+    span = Span(name, trace_id, secrets.token_hex(8), parent_id, kind)
+    span.set_attributes(**(attributes or {}))
+    token = _current.set(span)
+    try:
+        yield span
+    except asyncio.CancelledError:
+        span.set_error("cancelled")
+        raise
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        if _processor is not None:
+            _processor.on_end(span)
+
+
+def configure_tracing(
+    exporter: str,
+    service_name: str = "davai",
+    file_path: Optional[Path] = None,
+    endpoint: Optional[str] = None,
+) -> None:
+    """
+    Configure span export.
+
+    Args:
+        exporter: "none", "file" or "otlp"
+        service_name: Value of the service.name resource attribute
+        file_path: JSON Lines file of the "file" exporter
+        endpoint: Base URL of the OTLP/HTTP collector of the "otlp" exporter
+
+    Raises:
+        ValueError: If the exporter is unknown or misconfigured
+    """
+    global _processor
+    shutdown_tracing()
+    if exporter == "none":
+        return
+    if exporter == "file":
+        if file_path is None:
+            raise ValueError("A file path is required by the file span exporter")
+        _processor = BatchSpanProcessor(FileSpanExporter(file_path, service_name))
+        _log.info(f"Exporting traces to {file_path}")
+    elif exporter == "otlp":
+        if not endpoint:
+            raise ValueError("An endpoint is required by the OTLP span exporter")
+        _processor = BatchSpanProcessor(OtlpHttpSpanExporter(endpoint, service_name))
+        _log.info(f"Exporting traces to {endpoint}")
+    else:
+        raise ValueError(f"Unknown span exporter: {exporter}")
+
+
+def shutdown_tracing() -> None:
+    """Flush the pending spans and stop exporting."""
+    global _processor
+    if _processor is not None:
+        _processor.shutdown()
+        _processor = None